@@ -1,7 +1,7 @@
 # app/__init__.py
 import os
 
-from flask import Flask, jsonify, redirect, request
+from flask import Flask, g, jsonify, redirect, request
 from flask_migrate import Migrate
 from flask_socketio import SocketIO
 from flask_sqlalchemy import SQLAlchemy
@@ -15,7 +15,7 @@ migrate = Migrate()
 socketio = SocketIO()
 
 
-def create_app(testing=False):
+def create_app(testing=False, test_config=None):
     """
     Create and configure the Flask application instance.
 
@@ -25,6 +25,9 @@ def create_app(testing=False):
         If True, configure the application for testing. This enables
         Flask's testing mode, uses an in-memory SQLite database, disables
         CSRF protection, and sets a deterministic secret key.
+    test_config : mapping, optional
+        Extra configuration applied after the defaults and before extensions
+        are initialized, e.g. a file-backed SQLite URI for multi-threaded tests.
 
     Returns
     -------
@@ -49,6 +52,8 @@ def create_app(testing=False):
         app.config["ENABLE_HSTS"] = False
         app.config["PREFERRED_URL_SCHEME"] = "http"
         app.config["EMAIL_ENABLED"] = False
+        app.config["QUEUE_BROADCAST_WINDOW_MS"] = 0
+        app.config["ARCHIVE_JOB_RUNNER"] = "inline"
     elif (
         os.environ.get("REQUIRE_DATABASE_URL") == "1"
         and not os.environ.get("DATABASE_URL")
@@ -59,11 +64,20 @@ def create_app(testing=False):
             "Set ALLOW_SQLITE_FALLBACK=1 only for local development."
         )
 
+    if test_config:
+        app.config.update(test_config)
+
+    # Registered before the other request hooks so every request is timed,
+    # including ones answered by a redirect below.
+    from app.metrics import init_metrics
+
+    init_metrics(app)
+
     @app.before_request
     def enforce_https():
         if not app.config.get("FORCE_HTTPS", False):
             return None
-        if request.path == "/health":
+        if request.path in ("/health", "/metrics"):
             return None
         if request.is_secure:
             return None
@@ -71,6 +85,12 @@ def create_app(testing=False):
             return None
         return redirect(request.url.replace("http://", "https://", 1), code=308)
 
+    @app.before_request
+    def reset_current_user():
+        # flask.g lives on the app context, which tests may share across
+        # requests; drop the cached user so every request starts clean.
+        g.pop("_current_user", None)
+
     @app.after_request
     def add_security_headers(response):
         if app.config.get("ENABLE_HSTS", False) and request.is_secure:
@@ -84,11 +104,21 @@ def create_app(testing=False):
     # ---------------------------------------------------
     db.init_app(app)
     migrate.init_app(app, db)
-    socketio.init_app(app, cors_allowed_origins="*")
+    from app.socket_bridge import socketio_options
+
+    socketio.init_app(app, cors_allowed_origins="*", **socketio_options(app))
 
+    from app.page_cache import init_page_cache
+    from app.queue_snapshot import init_queue_snapshot
+    from app.site_content import init_site_content_cache
     from app.time_utils import format_pacific
+    from app.wait_estimator import init_wait_estimator
 
     app.add_template_filter(format_pacific, "datetime_pacific")
+    init_queue_snapshot(app)
+    init_site_content_cache(app)
+    init_page_cache(app)
+    init_wait_estimator(app)
 
     # ---------------------------------------------------
     # Internal Imports & Registration
@@ -97,20 +127,28 @@ def create_app(testing=False):
     # The '# noqa: F401' tells Ruff that although the import isn't used directly
     # in this file, it is intentional (for registering models and events).
     from app import models  # noqa: F401
+    from app.archive_jobs import register_archive_job_cli
+    from app.archive_store import register_archive_store_cli
     from app.archive_utils import register_archive_cli
+    from app.queue_broadcaster import init_queue_broadcaster
     from app.queue_maintenance import register_queue_maintenance_cli
-    from app.routes import queue_events  # noqa: F401
+    from app.routes import queue_events
     from app.routes.auth import auth_bp
     from app.routes.error import error_bp
     from app.routes.tickets import tickets_bp
     from app.routes.views import views_bp
+    from app.ticket_rollup import register_ticket_rollup_cli
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(views_bp)
     app.register_blueprint(tickets_bp)
     app.register_blueprint(error_bp)
     register_archive_cli(app)
+    register_archive_job_cli(app)
+    register_archive_store_cli(app)
     register_queue_maintenance_cli(app)
+    register_ticket_rollup_cli(app)
+    init_queue_broadcaster(app, queue_events.QUEUE_NAMESPACE)
 
     # ---------------------------------------------------
     # Health Check Route
@@ -126,21 +164,18 @@ def create_app(testing=False):
 
     @app.context_processor
     def inject_current_user():
-        from flask import session
+        from app.auth_utils import get_current_user
 
         try:
-            if "user_id" in session:
-                from app.models import User
-
-                u = db.session.get(User, session["user_id"])
-                if u:
-                    return {
-                        "current_user": SimpleNamespace(
-                            is_admin=bool(u.is_admin),
-                            is_anonymous=False,
-                            username=u.username,
-                        )
-                    }
+            u = get_current_user()
+            if u:
+                return {
+                    "current_user": SimpleNamespace(
+                        is_admin=bool(u.is_admin),
+                        is_anonymous=False,
+                        username=u.username,
+                    )
+                }
         except Exception:
             # keep silent on DB errors; fall back to anonymous
             pass
@@ -0,0 +1,262 @@
+"""Background archive exports.
+
+Exporting a long date range can take a while, and inside a request it would
+block the eventlet worker, and with it every Socket.IO client. The archive
+page therefore only records an ``ArchiveJob`` row and starts a runner:
+
+* In production the runner is a separate ``flask run-archive-jobs`` process,
+  so the export never shares the web worker's event loop. It claims queued
+  jobs one at a time and exits when none are left.
+* At most ``ARCHIVE_EXPORT_MAX_JOBS`` jobs run at once; extra jobs wait in
+  the queue and are picked up by a runner as earlier jobs finish.
+* Completed months are copied from the month-partitioned archive store
+  (``app.archive_store``); only the rest is queried from the database.
+* Progress is written to the job row every ``ARCHIVE_PROGRESS_INTERVAL``
+  rows, which also serves as the runner's heartbeat. A running job whose
+  heartbeat is older than ``ARCHIVE_JOB_STALE_SECONDS`` is marked failed.
+
+Typical usage example:
+    job = submit_export_job(start_utc, end_utc, filename, requested_by_id=1)
+"""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from pathlib import Path
+from typing import Optional, cast
+
+import click
+import sqlalchemy as sa
+from flask import Flask, current_app
+
+from app import db, socketio
+from app.archive_store import count_range_rows, export_range
+from app.models import ArchiveJob
+from app.time_utils import ensure_aware_utc
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+RUNNER_PROCESS = "process"
+RUNNER_INLINE = "inline"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def submit_export_job(
+    start_utc: datetime,
+    end_utc: datetime,
+    filename: str,
+    requested_by_id: Optional[int] = None,
+) -> ArchiveJob:
+    """Queue an archive export and make sure a runner will pick it up."""
+    job = ArchiveJob(
+        filename=filename,
+        start_utc=start_utc,
+        end_utc=end_utc,
+        status=JOB_QUEUED,
+        requested_by_id=requested_by_id,
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    if current_app.config.get("ARCHIVE_JOB_RUNNER", RUNNER_PROCESS) == RUNNER_INLINE:
+        run_pending_jobs()
+    else:
+        _spawn_runner()
+
+    db.session.refresh(job)
+    return job
+
+
+def _spawn_runner() -> None:
+    """Start a runner process; it exits at once if the cap is already reached."""
+    command = [
+        sys.executable,
+        "-m",
+        "flask",
+        "--app",
+        current_app.config.get("ARCHIVE_JOB_APP", "application:application"),
+        "run-archive-jobs",
+    ]
+    process = subprocess.Popen(
+        command, cwd=Path(current_app.root_path).parent, start_new_session=True
+    )
+    # Reap the child when it exits so finished runners do not linger.
+    socketio.start_background_task(process.wait)
+
+
+def recent_jobs(limit: int = 10) -> list[ArchiveJob]:
+    """Return the newest archive jobs, newest first."""
+    return list(
+        db.session.scalars(
+            sa.select(ArchiveJob).order_by(ArchiveJob.id.desc()).limit(limit)
+        )
+    )
+
+
+def _running_count() -> int:
+    return (
+        db.session.scalar(
+            sa.select(sa.func.count(ArchiveJob.id)).where(
+                ArchiveJob.status == JOB_RUNNING
+            )
+        )
+        or 0
+    )
+
+
+def _first_running_ids(limit: int) -> list[int]:
+    """Return the ids of the ``limit`` earliest-started running jobs."""
+    return list(
+        db.session.scalars(
+            sa.select(ArchiveJob.id)
+            .where(ArchiveJob.status == JOB_RUNNING)
+            .order_by(ArchiveJob.started_at, ArchiveJob.id)
+            .limit(limit)
+        )
+    )
+
+
+def fail_stale_jobs() -> int:
+    """Mark running jobs whose runner stopped sending heartbeats as failed."""
+    stale_seconds = current_app.config.get("ARCHIVE_JOB_STALE_SECONDS", 600)
+    cutoff = _now() - timedelta(seconds=stale_seconds)
+    failed = 0
+    for job in db.session.scalars(
+        sa.select(ArchiveJob).where(ArchiveJob.status == JOB_RUNNING)
+    ):
+        heartbeat = ensure_aware_utc(job.heartbeat_at or job.started_at)
+        if heartbeat is None or heartbeat < cutoff:
+            job.status = JOB_FAILED
+            job.error = "The export stopped responding."
+            job.finished_at = _now()
+            failed += 1
+    db.session.commit()
+    return failed
+
+
+def _claim_next_job() -> Optional[ArchiveJob]:
+    """
+    Move the oldest queued job to running, respecting the concurrency cap.
+
+    The conditional UPDATE lets only one runner claim a given job. Two
+    runners may still claim different jobs at the same moment, so the cap is
+    re-checked afterwards. Running jobs are ranked by start time, and only a
+    claim ranked past the cap is handed back; every runner sees the same
+    ranking, so the claims within the cap go ahead.
+    """
+    max_jobs = current_app.config.get("ARCHIVE_EXPORT_MAX_JOBS", 1)
+    while _running_count() < max_jobs:
+        job_id = db.session.scalar(
+            sa.select(ArchiveJob.id)
+            .where(ArchiveJob.status == JOB_QUEUED)
+            .order_by(ArchiveJob.id)
+            .limit(1)
+        )
+        if job_id is None:
+            return None
+
+        now = _now()
+        result = cast(
+            sa.CursorResult,
+            db.session.execute(
+                sa.update(ArchiveJob)
+                .where(ArchiveJob.id == job_id, ArchiveJob.status == JOB_QUEUED)
+                .values(status=JOB_RUNNING, started_at=now, heartbeat_at=now)
+                .execution_options(synchronize_session=False)
+            ),
+        )
+        claimed = result.rowcount
+        db.session.commit()
+        if not claimed:
+            continue  # another runner took it; try the next one
+
+        if job_id not in _first_running_ids(max_jobs):
+            db.session.execute(
+                sa.update(ArchiveJob)
+                .where(ArchiveJob.id == job_id)
+                .values(status=JOB_QUEUED, started_at=None, heartbeat_at=None)
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            return None
+        return db.session.get(ArchiveJob, job_id, populate_existing=True)
+    return None
+
+
+def _record_progress(job_id: int, rows_written: int) -> None:
+    """
+    Write a running job's progress and heartbeat without ending the export's read.
+
+    Committing the session would close the export's streaming cursor on
+    PostgreSQL, so the row is updated on a connection of its own. A SQLite
+    file allows no write beside an open read, and its cursors survive a
+    commit, so there the session commits instead.
+    """
+    progress = (
+        sa.update(ArchiveJob)
+        .where(ArchiveJob.id == job_id)
+        .values(rows_written=rows_written, heartbeat_at=_now())
+    )
+    if db.engine.dialect.name == "sqlite":
+        db.session.execute(progress.execution_options(synchronize_session=False))
+        db.session.commit()
+        return
+    with db.engine.begin() as connection:
+        connection.execute(progress)
+
+
+def run_job(job: ArchiveJob) -> None:
+    """Export one claimed job, recording progress and the outcome on its row."""
+    job_id = job.id
+    try:
+        start_utc = ensure_aware_utc(job.start_utc)
+        end_utc = ensure_aware_utc(job.end_utc)
+        job.rows_total = count_range_rows(current_app.root_path, start_utc, end_utc)
+        db.session.commit()
+
+        result = export_range(
+            current_app.root_path,
+            start_utc,
+            end_utc,
+            job.filename,
+            progress=partial(_record_progress, job_id),
+        )
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception("Archive job %s failed", job_id)
+        job.status = JOB_FAILED
+        job.error = str(e)[:255] or type(e).__name__
+    else:
+        job.status = JOB_DONE
+        job.rows_written = result.rows_written
+    job.finished_at = _now()
+    db.session.commit()
+
+
+def run_pending_jobs() -> int:
+    """Run queued jobs until none are left or the cap is reached."""
+    fail_stale_jobs()
+    completed = 0
+    while (job := _claim_next_job()) is not None:
+        run_job(job)
+        completed += 1
+    return completed
+
+
+def register_archive_job_cli(app: Flask) -> None:
+    """Register the archive job runner command on the Flask app."""
+
+    @app.cli.command("run-archive-jobs")
+    def run_archive_jobs_command() -> None:
+        """Run queued archive export jobs, then exit."""
+        completed = run_pending_jobs()
+        click.echo(f"Archive jobs complete: {completed} job(s) run")
@@ -0,0 +1,464 @@
+"""Month-partitioned archive store.
+
+Closed tickets never change once their month is over, yet every range export
+re-queries them. The store keeps one archive CSV per completed Pacific month
+under ``data/archives/partitions`` plus ``manifest.json``, which records each
+partition's UTC range, row count, size and SHA-256 checksum.
+
+A range export is planned against the manifest:
+
+* months wholly inside the range are copied from their partition once its
+  checksum is verified;
+* months the range only clips are read from their partition and filtered;
+* months without a partition (the current month, or ones not built yet) are
+  queried from the database as before.
+
+Partitions are built by ``flask archive-partitions``, typically from cron
+shortly after each month ends. Rows in a partition follow the archive
+format of ``archive_utils`` and, like other archives, are newest first.
+Each row carries one extra column, the UTC time it is archived under, which
+range filters compare against; the Pacific wall-clock times in the row are
+ambiguous for the hour repeated when daylight saving time ends. The column
+is dropped again before a row is exported.
+
+Typical usage example:
+    result = export_range(root_path, start_utc, end_utc, "spring.csv")
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+
+import click
+import sqlalchemy as sa
+from flask import Flask
+
+from app import db
+from app.archive_utils import (
+    ARCHIVE_HEADERS,
+    ARCHIVE_PROGRESS_INTERVAL,
+    ArchiveWriteResult,
+    _parse_iso_datetime,
+    archive_dir,
+    archive_ticket_query,
+    compress_archive,
+    safe_archive_filename,
+    ticket_archive_row,
+)
+from app.models import Ticket
+from app.time_utils import PACIFIC_TZ, ensure_aware_utc
+
+PARTITION_DIRNAME = "partitions"
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_FORMAT = 2
+ARCHIVED_AT_HEADER = "Archived At (UTC)"
+
+
+class ArchivePartitionError(Exception):
+    """Raised when a partition on disk does not match its manifest entry."""
+
+
+@dataclass(frozen=True)
+class Partition:
+    """One month of archived tickets as described by the manifest."""
+
+    month: str
+    start_utc: datetime
+    end_utc: datetime
+    rows: int
+    sha256: str
+    bytes: int
+
+    def to_dict(self) -> dict:
+        return {
+            "month": self.month,
+            "start_utc": self.start_utc.isoformat(),
+            "end_utc": self.end_utc.isoformat(),
+            "rows": self.rows,
+            "sha256": self.sha256,
+            "bytes": self.bytes,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Partition":
+        return cls(
+            month=data["month"],
+            start_utc=datetime.fromisoformat(data["start_utc"]),
+            end_utc=datetime.fromisoformat(data["end_utc"]),
+            rows=data["rows"],
+            sha256=data["sha256"],
+            bytes=data["bytes"],
+        )
+
+
+@dataclass(frozen=True)
+class ExportPiece:
+    """One step of a range export: a partition to read, or a range to query."""
+
+    start_utc: datetime
+    end_utc: datetime
+    include_end: bool
+    partition: Optional[Partition] = None
+    whole: bool = False
+
+    def covers(self, moment: datetime) -> bool:
+        if moment < self.start_utc:
+            return False
+        return moment <= self.end_utc if self.include_end else moment < self.end_utc
+
+
+def partition_dir(root_path: str | Path) -> Path:
+    """Return the partition directory, creating it when needed."""
+    path = archive_dir(root_path) / PARTITION_DIRNAME
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def month_bounds(month: date) -> tuple[datetime, datetime]:
+    """Return the UTC range [start, end) of the Pacific month containing ``month``."""
+    start_local = datetime(month.year, month.month, 1, tzinfo=PACIFIC_TZ)
+    if month.month == 12:
+        end_local = datetime(month.year + 1, 1, 1, tzinfo=PACIFIC_TZ)
+    else:
+        end_local = datetime(month.year, month.month + 1, 1, tzinfo=PACIFIC_TZ)
+    return start_local.astimezone(timezone.utc), end_local.astimezone(timezone.utc)
+
+
+def _month_key(month: date) -> str:
+    return f"{month.year:04d}-{month.month:02d}"
+
+
+def _next_month(month: date) -> date:
+    if month.month == 12:
+        return date(month.year + 1, 1, 1)
+    return date(month.year, month.month + 1, 1)
+
+
+def load_manifest(root_path: str | Path) -> dict[str, Partition]:
+    """Return the partitions recorded in the manifest, keyed by ``YYYY-MM``."""
+    path = archive_dir(root_path) / PARTITION_DIRNAME / MANIFEST_FILENAME
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    if data.get("format") != MANIFEST_FORMAT:
+        return {}
+    return {entry["month"]: Partition.from_dict(entry) for entry in data["partitions"]}
+
+
+def _save_manifest(root_path: str | Path, partitions: dict[str, Partition]) -> None:
+    path = partition_dir(root_path) / MANIFEST_FILENAME
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    data = {
+        "format": MANIFEST_FORMAT,
+        "partitions": [partitions[key].to_dict() for key in sorted(partitions)],
+    }
+    with tmp_path.open("w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_partition(root_path: str | Path, month: date) -> Partition:
+    """Write (or rewrite) one month's partition and record it in the manifest."""
+    start_utc, end_utc = month_bounds(month)
+    key = _month_key(month)
+    path = partition_dir(root_path) / f"{key}.csv"
+    partial_path = path.with_name(f".{path.name}.part")
+    tickets = archive_ticket_query(start_utc, end_utc, include_end=False).yield_per(
+        1000
+    )
+    rows = 0
+    try:
+        with partial_path.open("w", encoding="utf-8", newline="") as partition_file:
+            writer = csv.writer(partition_file)
+            writer.writerow(ARCHIVE_HEADERS + [ARCHIVED_AT_HEADER])
+            for ticket in tickets:
+                archived_at = ensure_aware_utc(ticket.closed_at or ticket.created_at)
+                writer.writerow(ticket_archive_row(ticket) + [archived_at.isoformat()])
+                rows += 1
+        os.replace(partial_path, path)
+    finally:
+        partial_path.unlink(missing_ok=True)
+
+    partition = Partition(
+        month=key,
+        start_utc=start_utc,
+        end_utc=end_utc,
+        rows=rows,
+        sha256=_file_sha256(path),
+        bytes=path.stat().st_size,
+    )
+    partitions = load_manifest(root_path)
+    partitions[key] = partition
+    _save_manifest(root_path, partitions)
+    return partition
+
+
+def archived_month(ticket: Ticket) -> Optional[str]:
+    """Return the ``YYYY-MM`` partition that holds a ticket's archive row, if any."""
+    if ticket.status not in ("closed", "resolved"):
+        return None
+    archived_at = ticket.closed_at
+    if archived_at is None and ticket.status == "resolved":
+        archived_at = ticket.created_at
+    if archived_at is None:
+        return None
+    return _month_key(ensure_aware_utc(archived_at).astimezone(PACIFIC_TZ).date())
+
+
+def invalidate_partitions(
+    root_path: str | Path, months: Iterable[Optional[str]]
+) -> list[str]:
+    """
+    Drop the partitions of months whose tickets changed in the database.
+
+    Call this after committing a change to an archived ticket (re-closing or
+    requeueing it, or deleting tickets) with ``archived_month`` of the ticket
+    before and after. The months are exported from the database again until
+    ``flask archive-partitions`` rebuilds them. Returns the months dropped.
+    """
+    wanted = {month for month in months if month}
+    if not wanted:
+        return []
+    partitions = load_manifest(root_path)
+    dropped = sorted(wanted & partitions.keys())
+    if not dropped:
+        return []
+    for month in dropped:
+        del partitions[month]
+    # Update the manifest first, so no export plans to read a removed file.
+    _save_manifest(root_path, partitions)
+    for month in dropped:
+        (partition_dir(root_path) / f"{month}.csv").unlink(missing_ok=True)
+    return dropped
+
+
+def completed_months(now: Optional[datetime] = None) -> list[date]:
+    """Return every month from the first archived ticket to last month."""
+    archived_at = sa.func.coalesce(Ticket.closed_at, Ticket.created_at)
+    first = ensure_aware_utc(
+        db.session.scalar(
+            sa.select(sa.func.min(archived_at)).where(
+                Ticket.status.in_(["closed", "resolved"])
+            )
+        )
+    )
+    if first is None:
+        return []
+
+    now_local = (ensure_aware_utc(now) or datetime.now(timezone.utc)).astimezone(
+        PACIFIC_TZ
+    )
+    current = date(now_local.year, now_local.month, 1)
+    first_local = first.astimezone(PACIFIC_TZ)
+    month = date(first_local.year, first_local.month, 1)
+    months = []
+    while month < current:
+        months.append(month)
+        month = _next_month(month)
+    return months
+
+
+def plan_range_export(
+    root_path: str | Path, start_utc: datetime, end_utc: datetime
+) -> list[ExportPiece]:
+    """
+    Split the inclusive range [start, end] into per-month export pieces.
+
+    Pieces are ordered newest first, matching archive row order. Only
+    partitions overlapping the range appear in the plan. Each piece but the
+    last ends where the next month begins, exclusively, so a ticket closed
+    exactly at midnight on the 1st is exported once.
+    """
+    start_utc = ensure_aware_utc(start_utc)
+    end_utc = ensure_aware_utc(end_utc)
+    partitions = load_manifest(root_path)
+    start_local = start_utc.astimezone(PACIFIC_TZ)
+    month = date(start_local.year, start_local.month, 1)
+
+    pieces = []
+    while True:
+        month_start, month_end = month_bounds(month)
+        if month_start > end_utc:
+            break
+        piece_start = max(start_utc, month_start)
+        include_end = end_utc < month_end
+        piece_end = end_utc if include_end else month_end
+        partition = partitions.get(_month_key(month))
+        whole = start_utc <= month_start and not include_end
+        pieces.append(
+            ExportPiece(piece_start, piece_end, include_end, partition, whole)
+        )
+        month = _next_month(month)
+    return pieces[::-1]
+
+
+def _partition_rows(
+    root_path: str | Path, piece: ExportPiece, partition: Partition
+) -> Iterator[list]:
+    """Yield a piece's rows from its partition after verifying the checksum."""
+    path = partition_dir(root_path) / f"{partition.month}.csv"
+    if _file_sha256(path) != partition.sha256:
+        raise ArchivePartitionError(
+            f"Archive partition {partition.month} does not match its checksum; "
+            "rebuild it with flask archive-partitions --rebuild"
+        )
+    with path.open("r", encoding="utf-8", newline="") as partition_file:
+        reader = csv.reader(partition_file)
+        next(reader)  # header
+        for row in reader:
+            *archive_row, archived_at = row
+            if piece.whole or piece.covers(datetime.fromisoformat(archived_at)):
+                yield archive_row
+
+
+def _query_rows(piece: ExportPiece) -> Iterator[list]:
+    tickets = archive_ticket_query(
+        piece.start_utc, piece.end_utc, include_end=piece.include_end
+    ).yield_per(1000)
+    for ticket in tickets:
+        yield ticket_archive_row(ticket)
+
+
+def iter_range_rows(
+    root_path: str | Path, start_utc: datetime, end_utc: datetime
+) -> Iterator[list]:
+    """Yield archive rows for [start, end], reading partitions where possible."""
+    for piece in plan_range_export(root_path, start_utc, end_utc):
+        if piece.partition is not None:
+            yield from _partition_rows(root_path, piece, piece.partition)
+        else:
+            yield from _query_rows(piece)
+
+
+def search_archive(
+    root_path: str | Path, start_utc: datetime, end_utc: datetime, text: str
+) -> Iterator[dict[str, str]]:
+    """Yield archived rows in [start, end] whose student, course or assistant match."""
+    needle = text.casefold()
+    searched = [
+        ARCHIVE_HEADERS.index(header)
+        for header in ("Student Name", "Course", "Assistant Name")
+    ]
+    for row in iter_range_rows(root_path, start_utc, end_utc):
+        if any(needle in str(row[i]).casefold() for i in searched):
+            yield dict(zip(ARCHIVE_HEADERS, map(str, row)))
+
+
+def count_range_rows(
+    root_path: str | Path, start_utc: datetime, end_utc: datetime
+) -> Optional[int]:
+    """
+    Return the number of rows an export of [start, end] will write, if known.
+
+    Whole partitions are counted from the manifest and unpartitioned months
+    with a COUNT query. A range that clips a partition returns None, since
+    counting it would mean reading the partition twice.
+    """
+    total = 0
+    for piece in plan_range_export(root_path, start_utc, end_utc):
+        if piece.partition is None:
+            total += archive_ticket_query(
+                piece.start_utc, piece.end_utc, include_end=piece.include_end
+            ).count()
+        elif piece.whole:
+            total += piece.partition.rows
+        else:
+            return None
+    return total
+
+
+def export_range(
+    root_path: str | Path,
+    start_utc: datetime,
+    end_utc: datetime,
+    filename: str,
+    progress: Optional[Callable[[int], None]] = None,
+) -> ArchiveWriteResult:
+    """
+    Write the archive for [start, end] to ``filename`` from the partition store.
+
+    Completed months come from their partitions and the rest from the
+    database. Rows go to a hidden partial file that replaces the archive only
+    once complete, so the archive list never offers a half-written export;
+    a gzip copy is then written alongside it for downloads.
+    """
+    path = archive_dir(root_path) / safe_archive_filename(filename)
+    partial_path = path.with_name(f".{path.name}.part")
+    rows_written = 0
+    try:
+        with partial_path.open("w", encoding="utf-8", newline="") as archive_file:
+            writer = csv.writer(archive_file)
+            writer.writerow(ARCHIVE_HEADERS)
+            for row in iter_range_rows(root_path, start_utc, end_utc):
+                writer.writerow(row)
+                rows_written += 1
+                if progress is not None and (
+                    rows_written % ARCHIVE_PROGRESS_INTERVAL == 0
+                ):
+                    progress(rows_written)
+        os.replace(partial_path, path)
+    finally:
+        partial_path.unlink(missing_ok=True)
+    compress_archive(path)
+
+    return ArchiveWriteResult(
+        path=path,
+        rows_written=rows_written,
+        rows_skipped=0,
+        start_utc=start_utc,
+        end_utc=end_utc,
+    )
+
+
+def register_archive_store_cli(app: Flask) -> None:
+    """Register the partition build command on the Flask app."""
+
+    @app.cli.command("archive-partitions")
+    @click.option("--month", help="Build only this month (YYYY-MM).")
+    @click.option(
+        "--rebuild",
+        is_flag=True,
+        help="Rewrite partitions that already exist.",
+    )
+    @click.option(
+        "--now",
+        "now_value",
+        help="Optional ISO datetime used as the current time, mainly for testing.",
+    )
+    def archive_partitions_command(
+        month: Optional[str], rebuild: bool, now_value: Optional[str]
+    ) -> None:
+        """Build monthly archive partitions for completed months."""
+        if month:
+            months = [datetime.strptime(month, "%Y-%m").date()]
+        else:
+            months = completed_months(_parse_iso_datetime(now_value))
+        existing = load_manifest(app.root_path)
+
+        built = 0
+        for item in months:
+            if _month_key(item) in existing and not rebuild:
+                continue
+            partition = build_partition(app.root_path, item)
+            built += 1
+            click.echo(f"{partition.month}: {partition.rows} row(s)")
+        click.echo(f"Archive partitions complete: {built} partition(s) built")
@@ -3,11 +3,17 @@
 from __future__ import annotations
 
 import csv
+import gzip
+import hashlib
 import io
+import json
+import os
+import shutil
+import zlib
 from dataclasses import dataclass
 from datetime import datetime, time, timedelta, timezone
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Iterable, Iterator, Optional
 
 import click
 from flask import Flask
@@ -33,6 +39,23 @@ ARCHIVE_HEADERS = [
 
 CUMULATIVE_ARCHIVE_FILENAME = "wormhole_archive_all.csv"
 
+# Rows written between progress callbacks during long exports.
+ARCHIVE_PROGRESS_INTERVAL = 1000
+
+# Archives are served from a gzip copy stored next to the CSV; CSV text
+# compresses about tenfold.
+ARCHIVE_GZIP_SUFFIX = ".gz"
+ARCHIVE_GZIP_LEVEL = 6
+# Uncompressed bytes buffered between chunks of a streamed export.
+ARCHIVE_STREAM_CHUNK_BYTES = 64 * 1024
+
+# Sidecar index kept next to a cumulative archive; see append_weekly_archive.
+ARCHIVE_INDEX_SUFFIX = ".index.json"
+ARCHIVE_INDEX_FORMAT = 1
+# Weeks whose dedupe digests the index keeps. Re-running an older week than
+# this falls back to scanning the whole archive once.
+ARCHIVE_INDEX_RETAINED_WEEKS = 12
+
 
 def safe_archive_filename(filename: str) -> str:
     """Return a safe CSV filename for files stored in the archive directory."""
@@ -70,6 +93,73 @@ def list_archive_files(root_path: str | Path) -> list[str]:
     )
 
 
+def compressed_archive_path(archive_path: Path) -> Path:
+    """Return the path of the gzip copy kept next to an archive CSV."""
+    return archive_path.with_name(archive_path.name + ARCHIVE_GZIP_SUFFIX)
+
+
+def compress_archive(archive_path: Path) -> Path:
+    """
+    Write or refresh the gzip copy of an archive, streaming it in blocks.
+
+    The copy is built in a temporary file and renamed into place, so a
+    download never sees a partial copy.
+    """
+    gz_path = compressed_archive_path(archive_path)
+    tmp_path = gz_path.with_name(f".{gz_path.name}.{os.getpid()}.tmp")
+    try:
+        with archive_path.open("rb") as source, gzip.open(
+            tmp_path, "wb", compresslevel=ARCHIVE_GZIP_LEVEL
+        ) as target:
+            shutil.copyfileobj(source, target)
+        os.replace(tmp_path, gz_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return gz_path
+
+
+def append_compressed_archive(archive_path: Path, offset: int) -> Path:
+    """
+    Extend a current gzip copy with the bytes appended to the CSV after ``offset``.
+
+    The new bytes become one more gzip member; gzip readers, browsers
+    decoding ``Content-Encoding: gzip`` included, read consecutive members
+    as one stream. The existing members are copied as they are, without
+    recompressing them, and the result is renamed into place.
+    """
+    gz_path = compressed_archive_path(archive_path)
+    tmp_path = gz_path.with_name(f".{gz_path.name}.{os.getpid()}.tmp")
+    try:
+        shutil.copyfile(gz_path, tmp_path)
+        with archive_path.open("rb") as source, gzip.open(
+            tmp_path, "ab", compresslevel=ARCHIVE_GZIP_LEVEL
+        ) as target:
+            source.seek(offset)
+            shutil.copyfileobj(source, target)
+        os.replace(tmp_path, gz_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return gz_path
+
+
+def current_compressed_archive(archive_path: Path) -> Optional[Path]:
+    """Return the archive's gzip copy if it exists and is not older than the CSV."""
+    gz_path = compressed_archive_path(archive_path)
+    try:
+        if gz_path.stat().st_mtime_ns >= archive_path.stat().st_mtime_ns:
+            return gz_path
+    except FileNotFoundError:
+        pass
+    return None
+
+
+def remove_archive(archive_path: Path) -> None:
+    """Delete an archive CSV together with its gzip copy and sidecar index."""
+    archive_path.unlink()
+    compressed_archive_path(archive_path).unlink(missing_ok=True)
+    archive_index_path(archive_path).unlink(missing_ok=True)
+
+
 def sanitize_csv_value(value):
     """Prevent spreadsheet formula execution when archive CSVs are opened."""
     if value and isinstance(value, str):
@@ -128,6 +218,11 @@ def archive_ticket_query(
     )
 
 
+def ticket_type(table: Optional[str]) -> str:
+    """Return where a ticket was helped: a Zoom or Teams call, or a table box."""
+    return table if table in ("Zoom", "Teams") else "Box"
+
+
 def ticket_archive_row(ticket: Ticket) -> list[object]:
     """Convert one ticket to the shared CSV row format."""
     return [
@@ -144,11 +239,7 @@ def ticket_archive_row(ticket: Ticket) -> list[object]:
             if ticket.wormhole_assistant and ticket.wormhole_assistant.name
             else "N/A"
         ),
-        "Zoom"
-        if ticket.table == "Zoom"
-        else "Teams"
-        if ticket.table == "Teams"
-        else "Box",
+        ticket_type(ticket.table),
     ]
 
 
@@ -164,6 +255,44 @@ def render_archive_csv(tickets: Iterable[Ticket]) -> str:
     return output.getvalue()
 
 
+def iter_archive_csv(
+    tickets: Iterable[Ticket], compress: bool = False
+) -> Iterator[bytes]:
+    """
+    Yield an archive CSV in chunks of about ``ARCHIVE_STREAM_CHUNK_BYTES``.
+
+    With ``compress`` the chunks form one gzip stream, compressed on the fly,
+    so a large export is never held in memory or sent uncompressed.
+    """
+    compressor = (
+        zlib.compressobj(ARCHIVE_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        if compress
+        else None
+    )
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(ARCHIVE_HEADERS)
+
+    def drain() -> bytes:
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(data) if compressor else data
+
+    for ticket in tickets:
+        writer.writerow(ticket_archive_row(ticket))
+        if buffer.tell() >= ARCHIVE_STREAM_CHUNK_BYTES:
+            chunk = drain()
+            if chunk:
+                yield chunk
+
+    chunk = drain()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
+
+
 def write_archive_file(path: Path, tickets: Iterable[Ticket]) -> ArchiveWriteResult:
     """Write a standalone archive CSV, replacing any existing file."""
     path.parent.mkdir(parents=True, exist_ok=True)
@@ -177,7 +306,7 @@ def write_archive_file(path: Path, tickets: Iterable[Ticket]) -> ArchiveWriteRes
             rows_written += 1
 
     # start/end are not meaningful for this low-level helper; callers that need
-    # those values should use create_archive_file or append_weekly_archive.
+    # those values should use archive_store.export_range or append_weekly_archive.
     return ArchiveWriteResult(
         path=path,
         rows_written=rows_written,
@@ -187,26 +316,6 @@ def write_archive_file(path: Path, tickets: Iterable[Ticket]) -> ArchiveWriteRes
     )
 
 
-def create_archive_file(
-    *,
-    root_path: str | Path,
-    start_utc: datetime,
-    end_utc: datetime,
-    filename: str,
-) -> ArchiveWriteResult:
-    """Create or replace a manual archive file for an explicit date range."""
-    tickets = archive_ticket_query(start_utc, end_utc, include_end=True).yield_per(1000)
-    path = archive_dir(root_path) / safe_archive_filename(filename)
-    write_result = write_archive_file(path, tickets)
-    return ArchiveWriteResult(
-        path=path,
-        rows_written=write_result.rows_written,
-        rows_skipped=write_result.rows_skipped,
-        start_utc=start_utc,
-        end_utc=end_utc,
-    )
-
-
 def _row_dedupe_key(row: list[object]) -> tuple[str, str, str]:
     """
     Build a stable key for duplicate prevention in cumulative archives.
@@ -218,6 +327,63 @@ def _row_dedupe_key(row: list[object]) -> tuple[str, str, str]:
     return (str(row[0]), str(row[5]), str(row[6]))
 
 
+def _key_digest(key: tuple[str, str, str]) -> str:
+    """Return a compact, stable digest of one dedupe key for the sidecar index."""
+    return hashlib.blake2b("\x1f".join(key).encode(), digest_size=8).hexdigest()
+
+
+def archive_index_path(archive_path: Path) -> Path:
+    """Return the sidecar index path for a cumulative archive file."""
+    return archive_path.with_name(archive_path.name + ARCHIVE_INDEX_SUFFIX)
+
+
+def _file_signature(path: Path) -> Optional[list[int]]:
+    if not path.exists():
+        return None
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _load_archive_index(archive_path: Path) -> Optional[dict]:
+    """
+    Return the sidecar index if it describes the archive as it is on disk.
+
+    The index records the archive's size and mtime after the append that
+    wrote it. Any other change to the CSV (a crash mid-append, a manual
+    edit, a replacement) makes the index stale, and it is ignored.
+    """
+    try:
+        with archive_index_path(archive_path).open("r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (
+        not isinstance(index, dict)
+        or index.get("format") != ARCHIVE_INDEX_FORMAT
+        or index.get("archive") != _file_signature(archive_path)
+    ):
+        return None
+    return index
+
+
+def _save_archive_index(archive_path: Path, watermark: str, weeks: dict) -> None:
+    """Atomically replace the sidecar index to describe the archive on disk."""
+    retained = dict(sorted(weeks.items())[-ARCHIVE_INDEX_RETAINED_WEEKS:])
+    index = {
+        "format": ARCHIVE_INDEX_FORMAT,
+        "archive": _file_signature(archive_path),
+        "watermark": watermark,
+        "weeks": retained,
+    }
+    index_path = archive_index_path(archive_path)
+    tmp_path = index_path.with_name(f".{index_path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, index_path)
+
+
 def _existing_archive_keys(path: Path) -> set[tuple[str, str, str]]:
     """Read existing cumulative archive rows so repeat jobs do not duplicate rows."""
     if not path.exists() or path.stat().st_size == 0:
@@ -271,19 +437,45 @@ def append_weekly_archive(
     now: Optional[datetime] = None,
     filename: str = CUMULATIVE_ARCHIVE_FILENAME,
 ) -> ArchiveWriteResult:
-    """Append the latest completed week of tickets to the cumulative archive CSV."""
+    """
+    Append the latest completed week of tickets to the cumulative archive CSV.
+
+    A ticket's row always falls in the week containing its closed (or, for
+    resolved tickets without one, created) time, so duplicates can only come
+    from an earlier run over the same week. The sidecar index records digests
+    of the rows written for recent weeks plus a watermark, the end of the
+    newest week appended; a run over a week after the watermark needs no
+    lookup at all. The whole CSV is scanned only when the index is missing or
+    stale, or when an older week than the index retains is re-run.
+    """
     start_utc, end_utc = previous_saturday_week_bounds(now)
     archive_path = archive_dir(root_path) / safe_archive_filename(filename)
     tickets = archive_ticket_query(start_utc, end_utc, include_end=False).yield_per(
         1000
     )
 
-    existing_keys = _existing_archive_keys(archive_path)
+    week = start_utc.isoformat()
+    watermark = end_utc.isoformat()
+    weeks: dict[str, list[str]] = {}
+    existing_keys: set[tuple[str, str, str]] = set()
+    week_digests: set[str] = set()
+
+    index = _load_archive_index(archive_path)
+    if index is not None:
+        watermark = max(index["watermark"], watermark)
+        weeks = index["weeks"]
+    if index is not None and (week in weeks or week >= index["watermark"]):
+        week_digests.update(weeks.get(week, ()))
+    else:
+        existing_keys = _existing_archive_keys(archive_path)
+
     rows_written = 0
     skipped = 0
 
     archive_path.parent.mkdir(parents=True, exist_ok=True)
-    needs_header = not archive_path.exists() or archive_path.stat().st_size == 0
+    offset = archive_path.stat().st_size if archive_path.exists() else 0
+    needs_header = offset == 0
+    gz_current = offset > 0 and current_compressed_archive(archive_path) is not None
 
     with archive_path.open("a", encoding="utf-8", newline="") as archive_file:
         writer = csv.writer(archive_file)
@@ -293,14 +485,29 @@ def append_weekly_archive(
         for ticket in tickets:
             row = ticket_archive_row(ticket)
             key = _row_dedupe_key(row)
-            if key in existing_keys:
+            digest = _key_digest(key)
+            if key in existing_keys or digest in week_digests:
+                week_digests.add(digest)
                 skipped += 1
                 continue
 
-            existing_keys.add(key)
+            week_digests.add(digest)
             writer.writerow(row)
             rows_written += 1
 
+        archive_file.flush()
+        os.fsync(archive_file.fileno())
+
+    weeks[week] = sorted(week_digests)
+    _save_archive_index(archive_path, watermark, weeks)
+    # The weekly job runs from cron, off the web workers, so keeping the gzip
+    # copy current here spares downloads from ever compressing. Only this
+    # week's rows are compressed unless the copy was already stale.
+    if not gz_current:
+        compress_archive(archive_path)
+    elif rows_written:
+        append_compressed_archive(archive_path, offset)
+
     return ArchiveWriteResult(
         path=archive_path,
         rows_written=rows_written,
@@ -20,15 +20,38 @@ They should be applied to any route that requires authentication, such as:
     - Ticket CRUD for WAs/Admins
     - Admin utilities
     - User management and system configuration pages
+
+The logged-in user is loaded at most once per request by get_current_user(),
+which the decorators, the template context processor, and views share.
 """
 
 from functools import wraps
+from typing import Optional
 
-from flask import jsonify, session
+from flask import g, jsonify, session
 
+from app import db
 from app.models import User
 
 
+def get_current_user() -> Optional[User]:
+    """
+    Return the User for the session's user_id, loading it once per request.
+
+    The result is cached on flask.g together with the user_id it was loaded
+    for, so a login or logout later in the same request is never served a
+    stale user.
+    """
+    user_id = session.get("user_id")
+    cached: Optional[tuple[Optional[int], Optional[User]]] = g.get("_current_user")
+    if cached is not None and cached[0] == user_id:
+        return cached[1]
+
+    user = db.session.get(User, user_id) if user_id is not None else None
+    g._current_user = (user_id, user)
+    return user
+
+
 def login_required(f):
     """
     Decorator: Ensure the user is authenticated before accessing the route.
@@ -58,7 +81,7 @@ def login_required(f):
             return jsonify({"error": "Authentication required"}), 401
 
         # check whether account still exists and is active
-        user = User.query.get(session.get("user_id"))
+        user = get_current_user()
         if user is None or not user.is_active:
             session.clear()
             return jsonify({"error": "Authentication required"}), 401
@@ -102,7 +125,7 @@ def admin_required(f):
         if "user_id" not in session:
             return jsonify({"error": "Authentication required"}), 401
 
-        user = User.query.get(session.get("user_id"))
+        user = get_current_user()
         if user is None or not user.is_active:
             session.clear()
             return jsonify({"error": "Authentication required"}), 401
@@ -0,0 +1,16 @@
+"""Database dialect checks shared by modules that issue bulk statements.
+
+Typical usage example:
+    from app.db_utils import supports_update_returning
+    if supports_update_returning():
+        rows = db.session.execute(stmt.returning(Ticket.id))
+"""
+
+from __future__ import annotations
+
+from app import db
+
+
+def supports_update_returning() -> bool:
+    """Return True when the session's dialect supports ``UPDATE ... RETURNING``."""
+    return bool(db.session.get_bind().dialect.update_returning)
@@ -159,6 +159,20 @@ class ExportArchiveForm(FlaskForm):
     submit = SubmitField("Download CSV")
 
 
+class SearchArchiveForm(FlaskForm):
+    start_date = DateField(
+        "Start Date",
+        validators=[DataRequired()],
+        default=lambda: _subtract_months(date.today(), 3),
+    )
+    end_date = DateField("End Date", validators=[DataRequired()], default=date.today)
+    query = StringField(
+        "Student, Course or Assistant",
+        validators=[DataRequired(), Length(max=100)],
+    )
+    submit = SubmitField("Search")
+
+
 class DeleteArchiveForm(FlaskForm):
     submit = SubmitField("Delete Selected")
 
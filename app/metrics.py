@@ -0,0 +1,362 @@
+"""Request and socket telemetry exposed in Prometheus text format.
+
+``init_metrics`` installs request hooks that record, for every Flask request:
+
+    wormhole_http_request_duration_seconds  latency histogram per endpoint
+    wormhole_http_responses_total           responses per endpoint and status
+    wormhole_http_requests_in_flight        requests currently being handled
+    wormhole_http_db_queries_total          SQL statements issued per endpoint
+    wormhole_http_db_seconds_total          time spent in those statements
+    wormhole_http_db_queries_per_request    histogram of statements per request
+
+and serves them, together with Socket.IO connection and emit counts and the
+stats of the in-process caches, on ``GET /metrics``. Endpoints are labelled
+by Flask endpoint name rather than path, so ticket ids never become label
+values. Each worker process keeps its own registry, as Prometheus expects of
+a multi-process server scraped per worker.
+
+``/metrics`` answers requests from the loopback interface, for a Prometheus
+agent on the same host, and logged-in admins; everyone else gets 403.
+
+Recording costs one lock acquisition and a handful of dict updates per
+request, and one ``perf_counter`` pair per SQL statement.
+
+Typical usage example:
+    get_metrics().socket_connected(QUEUE_NAMESPACE)
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Iterable, Optional, cast
+
+from flask import Flask, Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.auth_utils import get_current_user
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+LOCAL_ADDRESSES = frozenset({"127.0.0.1", "::1"})
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+UNMATCHED_ENDPOINT = "unmatched"
+
+# Per-request state kept on flask.g: [start time, statements, seconds in SQL].
+_REQUEST_STATE = "_metrics_request"
+_RESPONSE_STATUS = "_metrics_status"
+_QUERY_START = "_metrics_query_start"
+
+
+class Histogram:
+    """Cumulative-bucket histogram; not thread-safe on its own."""
+
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.bounds, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """Return ``(upper bound, observations <= bound)`` pairs."""
+        running = 0
+        pairs = []
+        for bound, count in zip(self.bounds, self.counts):
+            running += count
+            pairs.append((bound, running))
+        return pairs
+
+
+class MetricsRegistry:
+    """Thread-safe store for the counters behind ``/metrics``."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency: dict[str, Histogram] = {}
+        self.responses: defaultdict[tuple[str, int], int] = defaultdict(int)
+        self.db_queries: defaultdict[str, int] = defaultdict(int)
+        self.db_seconds: defaultdict[str, float] = defaultdict(float)
+        self.queries_per_request = Histogram(QUERY_COUNT_BUCKETS)
+        self.in_flight = 0
+        self.socket_clients: defaultdict[str, int] = defaultdict(int)
+        self.socket_connections: defaultdict[str, int] = defaultdict(int)
+
+    def request_started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def request_finished(
+        self,
+        endpoint: str,
+        status: int,
+        seconds: float,
+        queries: int,
+        query_seconds: float,
+    ) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            histogram = self.latency.get(endpoint)
+            if histogram is None:
+                histogram = self.latency[endpoint] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(seconds)
+            self.responses[(endpoint, status)] += 1
+            self.db_queries[endpoint] += queries
+            self.db_seconds[endpoint] += query_seconds
+            self.queries_per_request.observe(queries)
+
+    def socket_connected(self, namespace: str) -> None:
+        with self._lock:
+            self.socket_clients[namespace] += 1
+            self.socket_connections[namespace] += 1
+
+    def socket_disconnected(self, namespace: str) -> None:
+        with self._lock:
+            self.socket_clients[namespace] = max(0, self.socket_clients[namespace] - 1)
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        with self._lock:
+            lines: list[str] = []
+            _histogram(
+                lines,
+                "wormhole_http_request_duration_seconds",
+                "Time spent handling each request.",
+                (({"endpoint": e}, h) for e, h in sorted(self.latency.items())),
+            )
+            _family(
+                lines,
+                "wormhole_http_responses_total",
+                "counter",
+                "Responses sent, by endpoint and status code.",
+                (
+                    ({"endpoint": e, "status": str(s)}, n)
+                    for (e, s), n in sorted(self.responses.items())
+                ),
+            )
+            _family(
+                lines,
+                "wormhole_http_requests_in_flight",
+                "gauge",
+                "Requests currently being handled by this process.",
+                [({}, self.in_flight)],
+            )
+            _family(
+                lines,
+                "wormhole_http_db_queries_total",
+                "counter",
+                "SQL statements issued while handling requests.",
+                (({"endpoint": e}, n) for e, n in sorted(self.db_queries.items())),
+            )
+            _family(
+                lines,
+                "wormhole_http_db_seconds_total",
+                "counter",
+                "Seconds spent executing SQL while handling requests.",
+                (({"endpoint": e}, n) for e, n in sorted(self.db_seconds.items())),
+            )
+            _histogram(
+                lines,
+                "wormhole_http_db_queries_per_request",
+                "SQL statements issued by each request.",
+                [({}, self.queries_per_request)],
+            )
+            _family(
+                lines,
+                "wormhole_socketio_clients",
+                "gauge",
+                "Socket.IO clients connected to this process.",
+                (
+                    ({"namespace": ns}, n)
+                    for ns, n in sorted(self.socket_clients.items())
+                ),
+            )
+            _family(
+                lines,
+                "wormhole_socketio_connections_total",
+                "counter",
+                "Socket.IO connections accepted by this process.",
+                (
+                    ({"namespace": ns}, n)
+                    for ns, n in sorted(self.socket_connections.items())
+                ),
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+    return "{" + inner + "}"
+
+
+def _number(value: float) -> str:
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+def _family(
+    lines: list[str],
+    name: str,
+    kind: str,
+    help_text: str,
+    samples: Iterable[tuple[dict[str, str], float]],
+) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+
+def _histogram(
+    lines: list[str],
+    name: str,
+    help_text: str,
+    samples: Iterable[tuple[dict[str, str], Histogram]],
+) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for labels, histogram in samples:
+        for bound, count in histogram.cumulative():
+            bucket = _labels({**labels, "le": _number(float(bound))})
+            lines.append(f"{name}_bucket{bucket} {count}")
+        bucket = _labels({**labels, "le": "+Inf"})
+        lines.append(f"{name}_bucket{bucket} {histogram.count}")
+        lines.append(f"{name}_sum{_labels(labels)} {_number(histogram.total)}")
+        lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+
+def _component_stats() -> list[str]:
+    """Gauges for the in-process caches, broadcaster and wait estimator."""
+    from app.page_cache import get_page_cache
+    from app.queue_broadcaster import get_queue_broadcaster
+    from app.queue_snapshot import get_queue_snapshot
+    from app.wait_estimator import get_wait_estimator
+
+    lines: list[str] = []
+    broadcaster = get_queue_broadcaster()
+    _family(
+        lines,
+        "wormhole_socketio_emits_total",
+        "counter",
+        "Socket.IO events emitted by this process, by event name.",
+        (
+            ({"namespace": broadcaster.namespace, "event": name}, n)
+            for name, n in sorted(broadcaster.emit_counts().items())
+        ),
+    )
+    components: dict[str, dict] = {
+        "queue_broadcaster": broadcaster.stats(),
+        "queue_snapshot": get_queue_snapshot().stats(),
+        "page_cache": get_page_cache().stats(),
+        "wait_estimator": get_wait_estimator().stats(),
+    }
+    for component, stats in components.items():
+        for key, value in stats.items():
+            _family(
+                lines,
+                f"wormhole_{component}_{key}",
+                "untyped",
+                f"{component} stats(): {key}.",
+                [({}, value)],
+            )
+    return lines
+
+
+# -------------------------------
+# Hooks
+# -------------------------------
+def _before_request() -> None:
+    get_metrics().request_started()
+    setattr(g, _REQUEST_STATE, [time.perf_counter(), 0, 0.0])
+
+
+def _teardown_request(exc: Optional[BaseException]) -> None:
+    state = g.pop(_REQUEST_STATE, None)
+    if state is None:
+        return
+    started, queries, query_seconds = state
+    # after_request does not run when the view raised.
+    status = g.pop(_RESPONSE_STATUS, 500)
+    get_metrics().request_finished(
+        request.endpoint or UNMATCHED_ENDPOINT,
+        status,
+        time.perf_counter() - started,
+        queries,
+        query_seconds,
+    )
+
+
+def _after_request(response: Response) -> Response:
+    setattr(g, _RESPONSE_STATUS, response.status_code)
+    return response
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    conn.info[_QUERY_START] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    started = conn.info.pop(_QUERY_START, None)
+    if started is None or not has_request_context():
+        return
+    state = g.get(_REQUEST_STATE)
+    if state is not None:
+        state[1] += 1
+        state[2] += time.perf_counter() - started
+
+
+def _metrics_allowed() -> bool:
+    if request.remote_addr in LOCAL_ADDRESSES:
+        return True
+    user = get_current_user()
+    return user is not None and user.is_active and bool(user.is_admin)
+
+
+def metrics_view():
+    """Serve the registry and component stats in Prometheus text format."""
+    if not _metrics_allowed():
+        return Response("Forbidden\n", status=403, mimetype="text/plain")
+    body = get_metrics().render() + "\n".join(_component_stats()) + "\n"
+    return Response(body, content_type=CONTENT_TYPE)
+
+
+def init_metrics(app: Flask) -> MetricsRegistry:
+    """
+    Attach a registry, its request hooks and the ``/metrics`` route.
+
+    Call this before registering other ``before_request`` hooks so that
+    requests they answer early, such as HTTPS redirects, are still timed.
+    """
+    registry = MetricsRegistry()
+    app.extensions["metrics"] = registry
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.add_url_rule("/metrics", "metrics", metrics_view)
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    return registry
+
+
+def get_metrics() -> MetricsRegistry:
+    """Return the metrics registry for the current app."""
+    return cast(MetricsRegistry, current_app.extensions["metrics"])
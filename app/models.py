@@ -10,7 +10,7 @@ Typical usage example:
     from app import models
 """
 
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from typing import Optional
 
 import sqlalchemy as sa
@@ -120,6 +120,17 @@ class User(Base):
 
 class Ticket(Base):
     __tablename__ = "tickets"
+    # Supports keyset pagination of the closed-ticket history (newest first).
+    # PostgreSQL gets the history's own order; other dialects scan it backward,
+    # which already puts NULLs last.
+    __table_args__ = (
+        sa.Index(
+            "ix_tickets_closed_at_id",
+            "closed_at",
+            "id",
+            postgresql_ops={"closed_at": "DESC NULLS LAST", "id": "DESC"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     student_name: Mapped[str] = mapped_column(sa.String(100))
@@ -131,6 +142,8 @@ class Ticket(Base):
     )
     closed_at: Mapped[Optional[datetime]] = mapped_column(default=None)
     closed_reason: Mapped[Optional[str]] = mapped_column(sa.String(20), default=None)
+    # When an assistant last took the ticket; splits wait from handle time.
+    claimed_at: Mapped[Optional[datetime]] = mapped_column(default=None)
 
     number_of_students: Mapped[Optional[int]] = mapped_column(default=1)
 
@@ -169,16 +182,28 @@ class Ticket(Base):
         }
 
     def close_ticket(self, closed_reason, num_students: Optional[int] = 1):
+        from flask import current_app
+
+        from app.archive_store import archived_month, invalidate_partitions
+        from app.ticket_rollup import rollup_delta, update_rollup
+
+        before = rollup_delta(self)
+        archived_before = archived_month(self)
         self.status = "closed"
         self.number_of_students = num_students
         self.closed_reason = closed_reason
         self.closed_at = datetime.now(timezone.utc)
+        update_rollup(before, rollup_delta(self))
         db.session.commit()
+        invalidate_partitions(
+            current_app.root_path, [archived_before, archived_month(self)]
+        )
 
     def assign_to(self, user: "User"):
         """Assign ticket to a user."""
         self.wa_id = user.id
         self.status = "in_progress"
+        self.claimed_at = datetime.now(timezone.utc)
         db.session.commit()
 
 
@@ -229,3 +254,95 @@ class SiteContent(Base):
 
     def __repr__(self) -> str:
         return f"<SiteContent key={self.key}>"
+
+
+class VersionStamp(Base):
+    """A named counter bumped whenever a cached dataset changes.
+
+    In-process caches (such as the live-queue snapshot) compare their copy's
+    version with this row so a change made by another worker or a CLI job is
+    noticed without reloading the data itself.
+    """
+
+    __tablename__ = "version_stamps"
+
+    name: Mapped[str] = mapped_column(sa.String(50), primary_key=True)
+    version: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<VersionStamp {self.name}={self.version}>"
+
+
+class ArchiveJob(Base):
+    """A background export of tickets to an archive CSV.
+
+    Jobs are rows rather than in-memory state so that every gunicorn worker,
+    and the runner process that executes them, sees the same progress.
+    """
+
+    __tablename__ = "archive_jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    filename: Mapped[str] = mapped_column(sa.String(255))
+    start_utc: Mapped[datetime] = mapped_column()
+    end_utc: Mapped[datetime] = mapped_column()
+    status: Mapped[str] = mapped_column(sa.String(20), default="queued", index=True)
+    rows_written: Mapped[int] = mapped_column(default=0)
+    rows_total: Mapped[Optional[int]] = mapped_column(default=None)
+    error: Mapped[Optional[str]] = mapped_column(sa.String(255), default=None)
+    requested_by_id: Mapped[Optional[int]] = mapped_column(
+        sa.ForeignKey("users.id", ondelete="SET NULL"), default=None
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        default=lambda: datetime.now(timezone.utc)
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(default=None)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(default=None)
+    # Bumped with every progress update; a running job whose heartbeat stops
+    # belonged to a runner that died.
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(default=None)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "filename": self.filename,
+            "status": self.status,
+            "rows_written": self.rows_written,
+            "rows_total": self.rows_total,
+            "error": self.error,
+            "created_at": serialize_datetime(self.created_at),
+            "finished_at": serialize_datetime(self.finished_at),
+        }
+
+    def __repr__(self) -> str:
+        return f"<ArchiveJob {self.id} {self.filename} {self.status}>"
+
+
+class TicketDailyRollup(Base):
+    """Closed-ticket counts per Pacific day and hour, kept current on close.
+
+    One row per (day, hour, course, location, closed reason), keyed by when
+    the ticket was created. Statistics read these rows instead of scanning
+    ``tickets``; see app/ticket_rollup.py.
+    """
+
+    __tablename__ = "ticket_daily_rollup"
+
+    day: Mapped[date] = mapped_column(sa.Date, primary_key=True)
+    hour: Mapped[int] = mapped_column(sa.SmallInteger, primary_key=True)
+    course: Mapped[str] = mapped_column(sa.String(50), primary_key=True)
+    location: Mapped[str] = mapped_column(sa.String(10), primary_key=True)
+    closed_reason: Mapped[str] = mapped_column(sa.String(20), primary_key=True)
+
+    tickets: Mapped[int] = mapped_column(default=0)
+    students: Mapped[int] = mapped_column(default=0)
+    # Tickets an assistant claimed; the divisor for average handle time.
+    claimed: Mapped[int] = mapped_column(default=0)
+    wait_seconds: Mapped[int] = mapped_column(sa.BigInteger, default=0)
+    handle_seconds: Mapped[int] = mapped_column(sa.BigInteger, default=0)
+
+    def __repr__(self) -> str:
+        return (
+            f"<TicketDailyRollup {self.day} {self.hour}h {self.course} "
+            f"{self.location} {self.closed_reason}: {self.tickets}>"
+        )
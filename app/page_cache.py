@@ -0,0 +1,151 @@
+"""Whole-response cache for public pages seen by anonymous visitors.
+
+The homepage, wiki and live queue page render identically for every visitor
+who is not logged in, yet each hit re-renders a Jinja template. Views
+decorated with ``cache_anonymous_page`` keep the rendered body per path:
+
+* An entry is tagged with the version of the data the page shows, such as the
+  site content stamp; a request that sees a newer version re-renders it, so
+  edits invalidate cached pages without any explicit purge.
+* Only requests with an empty session are cached. Visitors who are logged in,
+  or who have a flashed message waiting, always get a freshly rendered page.
+* Responses carry ``Cache-Control`` and a strong ``ETag``, so browsers and
+  nginx can revalidate with If-None-Match and receive a 304.
+
+Typical usage example:
+    @views_bp.route("/wiki")
+    @cache_anonymous_page()
+    def wiki():
+        return render_template("wiki.html")
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional, cast
+
+from flask import Flask, Response, current_app, make_response, request, session
+
+DEFAULT_MAX_ENTRIES = 32
+DEFAULT_MAX_AGE_SECONDS = 30
+
+
+class CachedPage(NamedTuple):
+    version: str
+    body: bytes
+    mimetype: str
+    etag: str
+
+
+class PageCache:
+    """Thread-safe LRU map from request path to the latest rendered page."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._pages: OrderedDict[str, CachedPage] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, path: str, version: str) -> Optional[CachedPage]:
+        """Return the page cached for ``path`` if it was built from ``version``."""
+        with self._lock:
+            page = self._pages.get(path)
+            if page is None or page.version != version:
+                self.misses += 1
+                return None
+            self._pages.move_to_end(path)
+            self.hits += 1
+            return page
+
+    def put(self, path: str, page: CachedPage) -> None:
+        """Store ``page``, replacing any older version of the same path."""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._pages[path] = page
+            self._pages.move_to_end(path)
+            while len(self._pages) > self.max_entries:
+                self._pages.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every cached page."""
+        with self._lock:
+            self._pages.clear()
+
+    def stats(self) -> dict[str, float]:
+        """Return hit/miss counters, the hit ratio and the number of pages."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._pages),
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def init_page_cache(app: Flask) -> PageCache:
+    """Attach a fresh page cache to the app."""
+    cache = PageCache(
+        max_entries=app.config.get("PAGE_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+    )
+    app.extensions["page_cache"] = cache
+    return cache
+
+
+def get_page_cache() -> PageCache:
+    """Return the page cache for the current app."""
+    return cast(PageCache, current_app.extensions["page_cache"])
+
+
+def _finish(response: Response, etag: str) -> Response:
+    max_age = current_app.config.get("PAGE_CACHE_MAX_AGE", DEFAULT_MAX_AGE_SECONDS)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = f"public, max-age={max_age}"
+    # make_conditional updates the response in place (and returns it).
+    response.make_conditional(request)
+    return response
+
+
+def cache_anonymous_page(version: Callable[[], object] = lambda: ""):
+    """
+    Serve a view from the page cache for anonymous GET requests.
+
+    ``version`` returns a token for the data the page renders; the cached
+    body is reused only while the token is unchanged. It must be cheap,
+    typically a read of an in-memory cache's version.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            # Reading the session also makes Flask send Vary: Cookie, which
+            # keeps shared caches from mixing anonymous and personal pages.
+            if request.method != "GET" or session:
+                return view(*args, **kwargs)
+
+            cache = get_page_cache()
+            token = str(version())
+            page = cache.get(request.path, token)
+            if page is not None:
+                response = Response(page.body, mimetype=page.mimetype)
+                return _finish(response, page.etag)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed or session:
+                return response
+            body = response.get_data()
+            etag = hashlib.sha1(body).hexdigest()[:20]
+            cache.put(request.path, CachedPage(token, body, response.mimetype, etag))
+            return _finish(response, etag)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,214 @@
+"""Coalescing of queue socket events during ticket bursts.
+
+At the start of a lab dozens of students submit tickets within seconds, and
+every submission used to be one emit to every connected client. The
+broadcaster instead buffers ticket deltas for a short window (for example
+150 ms) and then sends one event per room for the whole window.
+
+Each delta gives every room an event body: the ticket payload under
+``"ticket"``, plus optional queue-wide fields such as the unskipped counts
+pushed to staff. A window holding a single delta is sent as its usual typed
+event (``ticket_created``, ``ticket_claimed``, ...) with that body. A window
+holding several is sent as one ``ticket_batch`` event::
+
+    {"first_version": 41, "version": 44,
+     "events": [{"type": "ticket_created", "ticket": {...}}, ...],
+     "unskipped": {...}}
+
+``events`` keeps only the last event per ticket, in version order, and the
+queue-wide fields come from the newest delta. Clients apply the batch when
+``first_version`` follows the last version they saw. A window of zero
+disables buffering, which is what tests use. Code that raises many deltas
+at once, such as bulk resolution, wraps them in ``hold()`` so they leave as
+one batch whatever the window. Events that are not ticket deltas, such as
+``queue_refresh``, go out through ``send()`` so every emit on the namespace
+is counted in one place.
+
+Typical usage example:
+    from app.queue_broadcaster import get_queue_broadcaster
+    get_queue_broadcaster().publish(event_type, version, ticket.id, bodies)
+"""
+
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, NamedTuple, Optional, Union, cast
+
+from flask import Flask, current_app
+
+from app import socketio
+
+TICKET_BATCH = "ticket_batch"
+DEFAULT_WINDOW_MS = 150
+
+# A room name, or several rooms that share one payload.
+Rooms = Union[str, tuple[str, ...]]
+
+
+class PendingEvent(NamedTuple):
+    """One ticket delta waiting for the end of the coalescing window."""
+
+    event_type: str
+    version: int
+    ticket_id: int
+    bodies: dict[Rooms, dict]
+
+
+def _batch_payload(events: list[PendingEvent], room: Rooms) -> dict:
+    latest: dict[int, PendingEvent] = {}
+    for event in events:
+        latest.pop(event.ticket_id, None)
+        latest[event.ticket_id] = event
+    newest = {k: v for k, v in events[-1].bodies[room].items() if k != "ticket"}
+    return {
+        "first_version": events[0].version,
+        "version": events[-1].version,
+        "events": [
+            {"type": event.event_type, "ticket": event.bodies[room]["ticket"]}
+            for event in latest.values()
+        ],
+        **newest,
+    }
+
+
+class CoalescingBroadcaster:
+    """Buffer ticket deltas and emit one event per room per window."""
+
+    def __init__(
+        self,
+        window_seconds: float,
+        namespace: str,
+        emit: Optional[Callable[..., None]] = None,
+    ):
+        self.window_seconds = window_seconds
+        self.namespace = namespace
+        self._emit = emit
+        self._lock = threading.Lock()
+        self._pending: list[PendingEvent] = []
+        self._flush_scheduled = False
+        self._holds = 0
+        self.events_published = 0
+        self.batches_sent = 0
+        self.emits = 0
+        self._emit_counts: dict[str, int] = {}
+
+    def publish(
+        self,
+        event_type: str,
+        version: int,
+        ticket_id: int,
+        bodies: dict[Rooms, dict],
+    ) -> None:
+        """
+        Queue one versioned delta.
+
+        ``bodies`` maps each room (or tuple of rooms) to the event body it may
+        see, holding at least the ticket payload under ``"ticket"``. The delta
+        is sent when the current window closes, or immediately when
+        the window is zero.
+        """
+        event = PendingEvent(event_type, version, ticket_id, bodies)
+        with self._lock:
+            self.events_published += 1
+            self._pending.append(event)
+            if self._holds:
+                pass  # sent when the outermost hold() exits
+            elif self.window_seconds <= 0:
+                self._flush_locked()
+            elif not self._flush_scheduled:
+                self._flush_scheduled = True
+                socketio.start_background_task(self._flush_after_window)
+
+    def flush(self) -> None:
+        """Send everything buffered so far, e.g. before a queue_refresh."""
+        with self._lock:
+            self._flush_locked()
+
+    def send(self, name: str, data: dict) -> None:
+        """Emit one event to every room now, after anything buffered."""
+        with self._lock:
+            self._flush_locked()
+            self._send_locked(name, data, None)
+
+    @contextmanager
+    def hold(self) -> Iterator[None]:
+        """Buffer every delta published inside the block and send them together."""
+        with self._lock:
+            self._holds += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._holds -= 1
+                if not self._holds:
+                    self._flush_locked()
+
+    def stats(self) -> dict[str, int]:
+        """Return counts of deltas published, coalesced away and emitted."""
+        with self._lock:
+            return {
+                "published": self.events_published,
+                "coalesced": self.events_published
+                - self.batches_sent
+                - len(self._pending),
+                "batches": self.batches_sent,
+                "emits": self.emits,
+                "pending": len(self._pending),
+            }
+
+    def emit_counts(self) -> dict[str, int]:
+        """Return how many emits were sent for each event name."""
+        with self._lock:
+            return dict(self._emit_counts)
+
+    def _flush_after_window(self) -> None:
+        socketio.sleep(self.window_seconds)
+        with self._lock:
+            if self._holds:
+                self._flush_scheduled = False  # the hold flushes on exit
+            else:
+                self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        # Emitting under the lock keeps batches in version order even when a
+        # timer flush races an explicit flush.
+        events, self._pending = self._pending, []
+        events.sort(key=lambda event: event.version)
+        self._flush_scheduled = False
+        if not events:
+            return
+
+        self.batches_sent += 1
+        for room in events[0].bodies:
+            if len(events) == 1:
+                name = events[0].event_type
+                data = {"version": events[0].version, **events[0].bodies[room]}
+            else:
+                name, data = TICKET_BATCH, _batch_payload(events, room)
+            self._send_locked(name, data, room)
+
+    def _send_locked(self, name: str, data: dict, room: Optional[Rooms]) -> None:
+        emit = self._emit or socketio.emit
+        try:
+            if room is None:
+                emit(name, data, namespace=self.namespace)
+            else:
+                emit(name, data, namespace=self.namespace, to=room)
+            self.emits += 1
+            self._emit_counts[name] = self._emit_counts.get(name, 0) + 1
+        except Exception as e:
+            print(f"Error broadcasting {name} to {room or 'all rooms'}: {e}")
+
+
+def init_queue_broadcaster(app: Flask, namespace: str) -> CoalescingBroadcaster:
+    """Attach a broadcaster using the app's QUEUE_BROADCAST_WINDOW_MS."""
+    window_ms = app.config.get("QUEUE_BROADCAST_WINDOW_MS", DEFAULT_WINDOW_MS)
+    broadcaster = CoalescingBroadcaster(window_ms / 1000, namespace)
+    app.extensions["queue_broadcaster"] = broadcaster
+    return broadcaster
+
+
+def get_queue_broadcaster() -> CoalescingBroadcaster:
+    """Return the broadcaster for the current app."""
+    return cast(CoalescingBroadcaster, current_app.extensions["queue_broadcaster"])
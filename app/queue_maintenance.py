@@ -6,35 +6,54 @@ from datetime import datetime, timezone
 from typing import cast
 
 import click
-from flask import Flask
+import sqlalchemy as sa
+from flask import Flask, current_app
 
 from app import db
+from app.archive_store import archived_month, invalidate_partitions
 from app.models import Ticket
+from app.queue_snapshot import get_queue_snapshot
+from app.ticket_rollup import add_to_rollup, rollup_delta
 
 
 def flush_open_tickets(reason: str = "Queue Flushed") -> int:
     """Close all active tickets and return how many were updated."""
     now = datetime.now(timezone.utc)
+    # Lock the tickets being flushed so the rollup counts exactly the rows
+    # the UPDATE closes, even if an assistant resolves one meanwhile.
+    open_tickets = db.session.scalars(
+        sa.select(Ticket)
+        .where(~Ticket.status.in_(["closed", "resolved"]))
+        .with_for_update()
+    ).all()
+    ids = [ticket.id for ticket in open_tickets]
+
     count = cast(
         int,
-        Ticket.query.filter(~Ticket.status.in_(["closed", "resolved"])).update(
+        Ticket.query.filter(Ticket.id.in_(ids)).update(
             {
                 Ticket.status: "closed",
                 Ticket.closed_reason: reason,
                 Ticket.closed_at: now,
                 Ticket.number_of_students: 0,
             },
-            synchronize_session=False,
+            synchronize_session="fetch",
         ),
     )
+    add_to_rollup(rollup_delta(ticket) for ticket in open_tickets)
+    archived = {archived_month(ticket) for ticket in open_tickets}
 
     db.session.commit()
+    invalidate_partitions(current_app.root_path, archived)
+    get_queue_snapshot().invalidate()
     return count
 
 
 def register_queue_maintenance_cli(app: Flask) -> None:
     """Register queue maintenance commands on the Flask app."""
 
+    from app.routes.queue_events import broadcast_queue_refresh
+
     @app.cli.command("flush-open-tickets")
     @click.option(
         "--reason",
@@ -45,4 +64,7 @@ def register_queue_maintenance_cli(app: Flask) -> None:
     def flush_open_tickets_command(reason: str) -> None:
         """Close all non-closed/resolved tickets."""
         count = flush_open_tickets(reason=reason)
+        # With SOCKETIO_MESSAGE_QUEUE set this reaches clients on every worker;
+        # either way the version bump tells workers their snapshots are stale.
+        broadcast_queue_refresh()
         click.echo(f"Nightly queue flush complete: {count} ticket(s) closed")
@@ -0,0 +1,301 @@
+"""In-memory snapshot of the active queue.
+
+The public live queue, the assistant dashboard and the queue JSON endpoints all
+read the same small set of rows: tickets that are ``live`` or ``in_progress``.
+After every broadcast, every connected kiosk and assistant asks for them at
+once. This module keeps those rows serialized in process memory so reads do not
+touch the database.
+
+The snapshot is write-through: every single-ticket mutation passes its
+serialized ticket to ``apply`` (via ``broadcast_ticket_event``) after it
+commits, and bulk operations such as flush and clear call ``invalidate()`` so
+the next read reloads from the database.
+
+Every queue event carries a version from the shared ``queue`` stamp (see
+``app.version_stamps``), and the snapshot remembers the version it reflects.
+An event that does not follow on directly means another process changed the
+queue in between, so the snapshot is dropped instead of patched. With several
+workers (``verify_version``), each read also compares the stamp with the
+snapshot's version, one primary-key lookup, so a change made by any worker or
+CLI job is seen on the next read. A single worker skips that check and relies
+on a short TTL to bound staleness from CLI jobs.
+
+Typical usage example:
+    from app.queue_snapshot import get_queue_snapshot
+    tickets = get_queue_snapshot().active_tickets()
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from typing import Optional, cast
+
+import sqlalchemy as sa
+from flask import Flask, current_app
+from sqlalchemy.orm import selectinload
+
+from app import db
+from app.models import Skipped, Ticket
+from app.time_utils import format_pacific
+from app.version_stamps import QUEUE_STAMP, read_version
+
+ACTIVE_STATUSES = ("live", "in_progress")
+DEFAULT_TTL_SECONDS = 30.0
+
+
+def ticket_payload(t: Ticket) -> dict:
+    """Serialize a ticket with the display fields the queue pages render."""
+    assistant = t.wormhole_assistant
+    data: dict = t.to_dict()
+    data["assistant_name"] = (
+        (assistant.name or assistant.username) if assistant else "Unassigned"
+    )
+    data["created_at_short"] = format_pacific(t.created_at, "%I:%M %p")
+    data["closed_at_short"] = format_pacific(t.closed_at, "%I:%M %p")
+    return data
+
+
+def _sort_key(data: dict) -> tuple[str, int]:
+    # serialize_datetime emits UTC ISO strings, which sort chronologically.
+    return (data["created_at"] or "", data["id"])
+
+
+class LiveQueueSnapshot:
+    """Thread-safe, lazily loaded snapshot of live and in-progress tickets."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        verify_version: bool = False,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.verify_version = verify_version
+        self._lock = threading.Lock()
+        self._tickets: Optional[dict[int, dict]] = None
+        self._skipped_by: dict[int, set[int]] = {}
+        self._ordered: list[dict] = []
+        self._loaded_at = 0.0
+        # Queue stamp version the contents reflect.
+        self._version = 0
+        # Bumped on every load and write; the content digest used in ETags is
+        # recomputed only when it changes.
+        self._generation = 0
+        self._digest: tuple[int, str] = (-1, "")
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    # -------------------------------
+    # Reads
+    # -------------------------------
+    def active_tickets(self) -> list[dict]:
+        """Return live and in-progress tickets in queue (created_at) order."""
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._ordered)
+
+    def live_tickets(
+        self,
+        *,
+        skipped_by: Optional[int] = None,
+        unassigned_only: bool = False,
+    ) -> list[dict]:
+        """Return live tickets, optionally excluding those a user skipped."""
+        with self._lock:
+            self._ensure_loaded()
+            return [
+                data
+                for data in self._ordered
+                if data["status"] == "live"
+                and not (unassigned_only and data["wa_id"] is not None)
+                and not (
+                    skipped_by is not None
+                    and skipped_by in self._skipped_by.get(data["id"], ())
+                )
+            ]
+
+    def in_progress_tickets(self) -> list[dict]:
+        """Return tickets currently being handled by an assistant."""
+        with self._lock:
+            self._ensure_loaded()
+            return [data for data in self._ordered if data["status"] == "in_progress"]
+
+    def live_position(self, ticket_id: int) -> Optional[int]:
+        """Return a live ticket's 1-based place in line, or None if not waiting."""
+        with self._lock:
+            self._ensure_loaded(record_hit=False)
+            waiting = (data for data in self._ordered if data["status"] == "live")
+            for position, data in enumerate(waiting, start=1):
+                if data["id"] == ticket_id:
+                    return position
+            return None
+
+    def unskipped_counts(self) -> dict:
+        """
+        Return how many live tickets each assistant has not skipped.
+
+        ``all`` applies to every assistant not listed in ``by_user``, which
+        only names users who skipped at least one live ticket (keyed by id as
+        a string, as it appears in JSON).
+        """
+        with self._lock:
+            self._ensure_loaded(record_hit=False)
+            live = [data["id"] for data in self._ordered if data["status"] == "live"]
+            skips: dict[int, int] = {}
+            for ticket_id in live:
+                for user_id in self._skipped_by.get(ticket_id, ()):
+                    skips[user_id] = skips.get(user_id, 0) + 1
+            return {
+                "all": len(live),
+                "by_user": {str(uid): len(live) - n for uid, n in skips.items()},
+            }
+
+    def version(self) -> int:
+        """Return the queue version the snapshot's contents reflect."""
+        with self._lock:
+            self._ensure_loaded(record_hit=False)
+            return self._version
+
+    def etag(self, scope: str = "") -> str:
+        """
+        Return a strong ETag for the snapshot's current contents.
+
+        The tag is built from the queue version and a digest of the data, so
+        every worker holding the same queue state returns the same tag.
+        ``scope`` distinguishes per-client views of the same snapshot, such
+        as one assistant's unskipped tickets. Warm snapshots answer without a
+        ticket query, so matching If-None-Match requests cost almost no I/O.
+        """
+        with self._lock:
+            self._ensure_loaded(record_hit=False)
+            if self._digest[0] != self._generation:
+                skipped = sorted(
+                    (ticket_id, sorted(users))
+                    for ticket_id, users in self._skipped_by.items()
+                )
+                content = json.dumps([self._ordered, skipped], sort_keys=True)
+                digest = hashlib.sha1(content.encode()).hexdigest()[:16]
+                self._digest = (self._generation, digest)
+            suffix = f"-{scope}" if scope else ""
+            return f"{self._version}-{self._digest[1]}{suffix}"
+
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss counters and the current snapshot size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "size": len(self._tickets or ()),
+            }
+
+    # -------------------------------
+    # Writes
+    # -------------------------------
+    def apply(self, data: dict, version: int) -> None:
+        """
+        Write one committed ticket, serialized by ticket_payload, through.
+
+        ``version`` is the queue version assigned to the change. If it does not
+        directly follow the snapshot's version, some other change was missed
+        and the snapshot is dropped so the next read reloads it.
+        """
+        with self._lock:
+            if self._tickets is None:
+                return  # not loaded yet; the next read will see the DB state
+            if version != self._version + 1:
+                self._drop()
+                return
+            self._version = version
+            if data["status"] in ACTIVE_STATUSES:
+                self._tickets[data["id"]] = data
+            else:
+                self._tickets.pop(data["id"], None)
+                self._skipped_by.pop(data["id"], None)
+            self._reorder()
+            self._generation += 1
+
+    def mark_skipped(self, ticket_id: int, user_id: int) -> None:
+        """Record that a user skipped (returned) a ticket."""
+        with self._lock:
+            if self._tickets is not None:
+                self._skipped_by.setdefault(ticket_id, set()).add(user_id)
+                self._generation += 1
+
+    def invalidate(self) -> None:
+        """Drop the snapshot so the next read reloads from the database."""
+        with self._lock:
+            self._drop()
+            self.invalidations += 1
+
+    # -------------------------------
+    # Internals (call with the lock held)
+    # -------------------------------
+    def _ensure_loaded(self, record_hit: bool = True) -> None:
+        expired = time.monotonic() - self._loaded_at > self.ttl_seconds
+        if self._tickets is not None and not expired:
+            current = not self.verify_version or (
+                read_version(QUEUE_STAMP) == self._version
+            )
+            if current:
+                if record_hit:
+                    self.hits += 1
+                return
+
+        self.misses += 1
+        # Read the version first: a change committed while the tickets load
+        # is then replayed by its event instead of being missed.
+        self._version = read_version(QUEUE_STAMP)
+        tickets = db.session.scalars(
+            sa.select(Ticket)
+            .options(selectinload(Ticket.wormhole_assistant))
+            .where(Ticket.status.in_(ACTIVE_STATUSES))
+            .order_by(Ticket.created_at, Ticket.id)
+        ).all()
+        self._tickets = {t.id: ticket_payload(t) for t in tickets}
+
+        self._skipped_by = {}
+        if self._tickets:
+            skipped_rows = db.session.execute(
+                sa.select(Skipped.tkt_id, Skipped.wa_id).where(
+                    Skipped.tkt_id.in_(list(self._tickets))
+                )
+            )
+            for tkt_id, wa_id in skipped_rows:
+                self._skipped_by.setdefault(tkt_id, set()).add(wa_id)
+
+        self._loaded_at = time.monotonic()
+        self._reorder()
+        self._generation += 1
+
+    def _drop(self) -> None:
+        self._tickets = None
+        self._skipped_by = {}
+        self._ordered = []
+        self._generation += 1
+
+    def _reorder(self) -> None:
+        self._ordered = sorted((self._tickets or {}).values(), key=_sort_key)
+
+
+def init_queue_snapshot(app: Flask) -> LiveQueueSnapshot:
+    """
+    Attach a fresh snapshot to the app.
+
+    Reads verify the shared queue version whenever a Socket.IO message queue
+    is configured, since that is when several workers serve the queue.
+    """
+    snapshot = LiveQueueSnapshot(
+        ttl_seconds=app.config.get("QUEUE_SNAPSHOT_TTL_SECONDS", DEFAULT_TTL_SECONDS),
+        verify_version=bool(app.config.get("SOCKETIO_MESSAGE_QUEUE")),
+    )
+    app.extensions["queue_snapshot"] = snapshot
+    return snapshot
+
+
+def get_queue_snapshot() -> LiveQueueSnapshot:
+    """Return the snapshot for the current app."""
+    return cast(LiveQueueSnapshot, current_app.extensions["queue_snapshot"])
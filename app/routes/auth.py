@@ -13,6 +13,7 @@ from flask import (
 )
 
 from app import db
+from app.auth_utils import get_current_user
 from app.email import send_password_reset_email
 from app.forms import ResetPasswordForm, ResetPasswordRequestForm
 from app.models import User
@@ -60,7 +61,7 @@ def logout():
 def check_session():
     if "user_id" in session:
         # ensure account still exists and is active
-        user = User.query.get(session.get("user_id"))
+        user = get_current_user()
         if user is None or not user.is_active:
             session.clear()
             return jsonify({"logged_in": False}), 200
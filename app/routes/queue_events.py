@@ -2,53 +2,206 @@
 """
 SocketIO events for real-time queue updates.
 Handles broadcasting ticket updates to connected clients.
+
+Every queue mutation is sent as a typed delta event carrying a monotonically
+increasing queue version:
+
+    ticket_created   a student joined the queue
+    ticket_claimed   an assistant took a ticket
+    ticket_resolved  a ticket was closed (helped, no show, duplicate, ...)
+    ticket_requeued  an assistant returned a ticket to the queue
+
+Clients patch their page from the event payload and only refetch when they
+see a gap between the last version they applied and the incoming one.
+Bulk changes (flush, clear) send ``queue_refresh`` which always forces a
+resync.
+
+Each connection joins exactly one room, chosen from its Flask session when it
+connects:
+
+    public      anonymous clients such as the /livequeue kiosk; ticket events
+                carry only what that page shows (PUBLIC_TICKET_FIELDS, the
+                place in line and the estimated wait), the same fields
+                /api/livequeuetickets returns
+    assistants  logged-in assistants; ticket events carry the full ticket and
+                ``unskipped``, each assistant's count of live tickets they
+                have not skipped (see LiveQueueSnapshot.unskipped_counts)
+    admins      logged-in admins; same payload as assistants
+
+Student names, tables and courses are on the public display by design.
+Assistant names, close reasons and student counts never leave the server
+over an unauthenticated socket or the public API.
 """
 
+from typing import Optional
+
+from flask_socketio import join_room
+
 from app import socketio
+from app.auth_utils import get_current_user
+from app.metrics import get_metrics
 from app.models import Ticket
-from app.time_utils import format_pacific, serialize_datetime
+from app.queue_broadcaster import get_queue_broadcaster
+from app.queue_snapshot import get_queue_snapshot, ticket_payload
+from app.version_stamps import QUEUE_STAMP, bump_version
+from app.wait_estimator import get_wait_estimator
+
+QUEUE_NAMESPACE = "/queue"
+QUEUE_VERSION_HEADER = "X-Queue-Version"
+
+TICKET_CREATED = "ticket_created"
+TICKET_CLAIMED = "ticket_claimed"
+TICKET_RESOLVED = "ticket_resolved"
+TICKET_REQUEUED = "ticket_requeued"
+TICKET_EVENTS = frozenset(
+    {TICKET_CREATED, TICKET_CLAIMED, TICKET_RESOLVED, TICKET_REQUEUED}
+)
+
+PUBLIC_ROOM = "public"
+ASSISTANT_ROOM = "assistants"
+ADMIN_ROOM = "admins"
+STAFF_ROOMS = (ASSISTANT_ROOM, ADMIN_ROOM)
+
+# The ticket fields the public live queue renders and sorts by.
+PUBLIC_TICKET_FIELDS = (
+    "id",
+    "student_name",
+    "table",
+    "physics_course",
+    "status",
+    "created_at",
+)
+
+
+def current_queue_version() -> int:
+    """Return the queue version reflected by the live-queue snapshot."""
+    return get_queue_snapshot().version()
+
+
+def _next_queue_version(count: int = 1) -> int:
+    # Versions come from a shared database counter so events raised by any
+    # worker or CLI job form one gap-free sequence. Returns the last of the
+    # ``count`` versions reserved.
+    return bump_version(QUEUE_STAMP, count)
+
 
+def room_for_session() -> str:
+    """Return the room a connection belongs in, based on the Flask session."""
+    user = get_current_user()
+    if user is None:
+        return PUBLIC_ROOM
+    return ADMIN_ROOM if user.is_admin else ASSISTANT_ROOM
 
-@socketio.on("connect", namespace="/queue")
+
+def public_ticket_payload(
+    data: dict, position: Optional[int], wait_seconds: Optional[int] = None
+) -> dict:
+    """Reduce a serialized ticket to what the public live queue displays."""
+    public = {field: data[field] for field in PUBLIC_TICKET_FIELDS}
+    public["position"] = position
+    public["estimated_wait_seconds"] = wait_seconds
+    return public
+
+
+def _record_wait_sample(event_type: str, ticket: Ticket) -> None:
+    estimator = get_wait_estimator()
+    if event_type == TICKET_CREATED:
+        estimator.record_arrival(ticket.created_at)
+    elif event_type == TICKET_CLAIMED:
+        estimator.record_claim(ticket.wa_id)
+    elif event_type == TICKET_RESOLVED:
+        estimator.record_close(ticket.wa_id, ticket.claimed_at, ticket.closed_at)
+
+
+@socketio.on("connect", namespace=QUEUE_NAMESPACE)
 def handle_queue_connect():
     """Handle client connection to queue namespace."""
-    print("Client connected to /queue")
+    room = room_for_session()
+    join_room(room)
+    get_metrics().socket_connected(QUEUE_NAMESPACE)
+    print(f"Client connected to /queue ({room})")
 
 
-@socketio.on("disconnect", namespace="/queue")
+@socketio.on("disconnect", namespace=QUEUE_NAMESPACE)
 def handle_queue_disconnect():
     """Handle client disconnect from queue namespace."""
+    get_metrics().socket_disconnected(QUEUE_NAMESPACE)
     print("Client disconnected from /queue")
 
 
-def broadcast_ticket_update(ticket_id):
+def broadcast_ticket_event(event_type: str, ticket: Ticket) -> int:
+    """
+    Broadcast one typed ticket delta to every room on the queue namespace.
+
+    Callers invoke this after committing a single-ticket change; it also
+    updates the live-queue snapshot and the wait estimator. Staff rooms get
+    the full ticket and the public room gets the reduced payload; both carry
+    the same version and ``wait_estimates``, the estimated wait in seconds
+    for each place in line. The event is handed to the coalescing
+    broadcaster, so during a burst it may reach clients inside a
+    ``ticket_batch``. Returns the queue version assigned to the event.
+    """
+    return broadcast_ticket_events([(event_type, ticket)])[0]
+
+
+def broadcast_ticket_events(events: list[tuple[str, Ticket]]) -> list[int]:
     """
-    Broadcast a ticket update to all connected clients on the queue namespace.
-    Called when a new ticket is created or updated.
+    Broadcast deltas for several tickets changed by one commit.
+
+    Each ``(event_type, ticket)`` pair is sent as by broadcast_ticket_event,
+    but the versions are reserved with a single bump and every ticket is
+    serialized before it, since the bump's commit expires them. Wrap the call
+    in ``get_queue_broadcaster().hold()`` to send the deltas as one batch.
+    Returns the version assigned to each event, in order.
     """
-    try:
-        t = Ticket.query.get(ticket_id)
-        if t:
-            ticket_data = {
-                "id": t.id,
-                "student_name": t.student_name,
-                "table": t.table,
-                "physics_course": t.physics_course,
-                "created_at": serialize_datetime(t.created_at),
-                "created_at_local": format_pacific(
-                    t.created_at, "%Y-%m-%d %H:%M:%S %Z"
-                ),
-                "status": t.status,
-            }
-            socketio.emit("new_ticket", ticket_data, namespace="/queue")
-            print(f"Broadcasted ticket update for ticket ID {ticket_id}")
-    except Exception as e:
-        print(f"Error broadcasting ticket update: {e}")
-
-
-def broadcast_queue_refresh():
+    for event_type, _ in events:
+        if event_type not in TICKET_EVENTS:
+            raise ValueError(f"Unknown ticket event: {event_type}")
+
+    if not events:
+        return []
+
+    prepared = []
+    for event_type, ticket in events:
+        _record_wait_sample(event_type, ticket)
+        prepared.append((event_type, ticket_payload(ticket)))
+    last = _next_queue_version(len(prepared))
+    versions = list(range(last - len(prepared) + 1, last + 1))
+
+    snapshot = get_queue_snapshot()
+    estimator = get_wait_estimator()
+    broadcaster = get_queue_broadcaster()
+    for (event_type, payload), version in zip(prepared, versions):
+        # Write the change through to the live-queue snapshot before clients
+        # are told to look at it.
+        snapshot.apply(payload, version)
+        unskipped = snapshot.unskipped_counts()
+        waits = estimator.estimates(unskipped["all"])
+        position = snapshot.live_position(payload["id"])
+        public = public_ticket_payload(
+            payload, position, waits[position - 1] if position else None
+        )
+        staff = {"ticket": payload, "unskipped": unskipped, "wait_estimates": waits}
+        broadcaster.publish(
+            event_type,
+            version,
+            payload["id"],
+            {
+                STAFF_ROOMS: staff,
+                PUBLIC_ROOM: {"ticket": public, "wait_estimates": waits},
+            },
+        )
+    return versions
+
+
+def broadcast_queue_refresh() -> int:
     """
-    Broadcast a refresh signal to all connected clients.
+    Broadcast a refresh signal to all connected clients, in every room.
     Triggers the client to refetch the queue.
     """
-    socketio.emit("queue_refresh", {}, namespace="/queue")
+    # Deliver buffered deltas first so clients see versions in order.
+    broadcaster = get_queue_broadcaster()
+    broadcaster.flush()
+    version = _next_queue_version()
+    broadcaster.send("queue_refresh", {"version": version})
+    return version
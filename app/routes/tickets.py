@@ -1,20 +1,68 @@
 # /app/routes/tickets.py
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 
-from flask import Blueprint, flash, jsonify, redirect, request, session, url_for
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    flash,
+    jsonify,
+    redirect,
+    request,
+    session,
+    url_for,
+)
 
 from app import db
-from app.models import Skipped, Ticket, User
-from app.routes.queue_events import broadcast_ticket_update
+from app.archive_store import archived_month, invalidate_partitions
+from app.auth_utils import admin_required, get_current_user, login_required
+from app.models import Skipped, Ticket
+from app.queue_broadcaster import get_queue_broadcaster
+from app.queue_snapshot import get_queue_snapshot, ticket_payload
+from app.routes.queue_events import (
+    QUEUE_VERSION_HEADER,
+    TICKET_CREATED,
+    TICKET_REQUEUED,
+    TICKET_RESOLVED,
+    broadcast_ticket_event,
+    broadcast_ticket_events,
+    current_queue_version,
+    public_ticket_payload,
+)
+from app.ticket_export import (
+    PageParamsError,
+    next_page_link,
+    page_params,
+    stream_tickets_ndjson,
+    ticket_page,
+    wants_ndjson,
+)
+from app.ticket_history import closed_tickets_page
+from app.ticket_resolution import MAX_BULK_TICKETS, bulk_resolve
+from app.ticket_rollup import GROUP_COLUMNS, rollup_delta, ticket_stats, update_rollup
+from app.wait_estimator import get_wait_estimator
 
 tickets_bp = Blueprint("tickets", __name__, url_prefix="/api")
 
 
-# GET: API route to get all tickets
+# GET: API route to page through all tickets (?after_id=&limit=), or stream
+# them all as NDJSON with ?format=ndjson
 @tickets_bp.route("/tickets", methods=["GET"])
 def get_tickets():
-    tickets = Ticket.query.all()
-    return jsonify([t.to_dict() for t in tickets])
+    try:
+        after_id, limit = page_params()
+    except PageParamsError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if wants_ndjson():
+        return stream_tickets_ndjson(Ticket.to_dict, after_id=after_id)
+
+    tickets, next_after_id = ticket_page(after_id, limit)
+    response = jsonify([t.to_dict() for t in tickets])
+    link = next_page_link(next_after_id, limit)
+    if link:
+        response.headers["Link"] = link
+    return response
 
 
 # POST: API route to create a new ticket
@@ -42,63 +90,181 @@ def create_ticket():
     db.session.commit()
 
     # Broadcast the new ticket to all connected queue clients
-    broadcast_ticket_update(new_ticket.id)
+    broadcast_ticket_event(TICKET_CREATED, new_ticket)
 
     return jsonify(new_ticket.to_dict()), 201
 
 
+def _snapshot_json(read, scope: str = ""):
+    """
+    Serve a queue snapshot read as JSON with ETag revalidation.
+
+    A request whose If-None-Match still matches the snapshot gets a 304
+    without reading or serializing any tickets.
+    """
+    # Read the version before the snapshot so clients never skip a newer event.
+    version = str(current_queue_version())
+    etag = get_queue_snapshot().etag(scope)
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(read())
+
+    response.set_etag(etag)
+    # Clients may cache but must revalidate, which makes refetches cheap.
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers[QUEUE_VERSION_HEADER] = version
+    return response
+
+
 # GET: API route to get all open tickets that the current user has not skipped
 @tickets_bp.route("/unskippedtickets", methods=["GET"])
 def get_unskipped_tickets():
-    # skipped_subquery = get all tickets skipped by current user
-    # get all live tickets not
+    # Served from the in-memory live-queue snapshot, which also tracks which
+    # users skipped each live ticket, so this endpoint makes no DB round trip.
     user_id = session["user_id"]
     if not user_id:
         return jsonify({"error": "Unauthorized"}), 401
 
-    # Get IDs of tickets already skipped by the current user
-    skipped_subquery = (
-        db.session.query(Skipped.tkt_id)
-        .filter(Skipped.wa_id == user_id)
-        .subquery()
-        .select()
+    response = _snapshot_json(
+        lambda: get_queue_snapshot().live_tickets(skipped_by=user_id),
+        scope=f"u{user_id}",
     )
+    response.vary.add("Cookie")
+    return response
 
-    # Get all live tickets which the current user has not skipped
-    tickets = (
-        Ticket.query.filter_by(status="live")
-        .filter(Ticket.id.notin_(skipped_subquery))
-        .all()
-    )
 
-    return jsonify([t.to_dict() for t in tickets])
+# GET: API route to count the open tickets the current user has not skipped
+@tickets_bp.route("/unskippedtickets/count", methods=["GET"])
+def count_unskipped_tickets():
+    # The userpage badge only needs the number; counting in the snapshot
+    # avoids serializing every live ticket just to read its length.
+    user_id = session.get("user_id")
+    if not user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    response = _snapshot_json(
+        lambda: {"count": len(get_queue_snapshot().live_tickets(skipped_by=user_id))},
+        scope=f"c{user_id}",
+    )
+    response.vary.add("Cookie")
+    return response
 
 
 # GET: API route to get all open tickets
 @tickets_bp.route("/opentickets", methods=["GET"])
 def get_open_tickets():
     # Get all live tickets
-    tickets = Ticket.query.filter_by(status="live").all()
+    return _snapshot_json(lambda: get_queue_snapshot().live_tickets(), scope="open")
 
-    return jsonify([t.to_dict() for t in tickets])
+
+def _public_live_queue(tickets: list[dict]) -> list[dict]:
+    """Reduce snapshot tickets to public payloads with places and waits."""
+    waiting = sum(1 for t in tickets if t["status"] == "live")
+    waits = get_wait_estimator().estimates(waiting)
+    public = []
+    position = 0
+    for t in tickets:
+        if t["status"] == "live":
+            position += 1
+            public.append(public_ticket_payload(t, position, waits[position - 1]))
+        else:
+            public.append(public_ticket_payload(t, None))
+    return public
 
 
 @tickets_bp.route("/livequeuetickets", methods=["GET"])
 def get_livequeue_tickets():
-    """Return every active ticket shown on the public live queue."""
-    tickets = (
-        Ticket.query.filter(Ticket.status.in_(["live", "in_progress"]))
-        .order_by(Ticket.created_at)
-        .all()
+    """Return every active ticket with the fields the public live queue shows."""
+    # The estimates change without a queue event when an assistant goes idle,
+    # so the estimator's revision is part of the ETag.
+    revision = get_wait_estimator().current_revision()
+    return _snapshot_json(
+        lambda: _public_live_queue(get_queue_snapshot().active_tickets()),
+        scope=f"active-w{revision}",
     )
 
-    return jsonify([t.to_dict() for t in tickets])
+
+# GET: API route to page through closed ticket history (newest first)
+@tickets_bp.route("/closedtickets", methods=["GET"])
+@login_required
+def get_closed_tickets():
+    try:
+        tickets, next_cursor = closed_tickets_page(
+            cursor=request.args.get("cursor") or None,
+            limit=request.args.get("limit", type=int),
+        )
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    return jsonify(
+        {
+            "tickets": [ticket_payload(t) for t in tickets],
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+# GET: API route for ticket statistics (?start=&end=YYYY-MM-DD, &by=day,course)
+@tickets_bp.route("/stats/tickets", methods=["GET"])
+@admin_required
+def get_ticket_stats():
+    try:
+        start = date.fromisoformat(request.args["start"])
+        end = date.fromisoformat(request.args["end"])
+    except (KeyError, ValueError):
+        return jsonify({"error": "start and end must be YYYY-MM-DD dates"}), 400
+
+    group_by = [name for name in request.args.get("by", "day").split(",") if name]
+    if not group_by or any(name not in GROUP_COLUMNS for name in group_by):
+        return jsonify(
+            {"error": f"by must be a comma-separated subset of {GROUP_COLUMNS}"}
+        ), 400
+
+    return jsonify(ticket_stats(start, end, group_by))
+
+
+# POST: API route to resolve or requeue several tickets in one transaction
+@tickets_bp.route("/resolvetickets", methods=["POST"])
+@login_required
+def resolve_tickets():
+    """
+    Apply ``{"tickets": [{"id": 7, "resolve": "no_show"}, ...]}`` at once.
+
+    Each entry takes the same options as the single-ticket form. The response
+    lists one outcome per entry, and clients get one batched queue event.
+    """
+    data = request.get_json(silent=True)
+    items = data.get("tickets") if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "tickets must be a non-empty list"}), 400
+    if len(items) > MAX_BULK_TICKETS:
+        return jsonify(
+            {"error": f"At most {MAX_BULK_TICKETS} tickets per request"}
+        ), 400
+
+    user = get_current_user()
+    results, tickets = bulk_resolve(items, user.id)
+
+    snapshot = get_queue_snapshot()
+    events = []
+    for ticket in tickets:
+        if ticket.status == "live":
+            snapshot.mark_skipped(ticket.id, user.id)
+            events.append((TICKET_REQUEUED, ticket))
+        else:
+            events.append((TICKET_RESOLVED, ticket))
+    with get_queue_broadcaster().hold():
+        broadcast_ticket_events(events)
+
+    return jsonify({"results": results, "version": current_queue_version()})
 
 
 # API route to handle ticket resolution form submission
 @tickets_bp.route("/resolveticket/<int:ticket_id>", methods=["POST"])
 def resolve_ticket(ticket_id):
-    user = User.query.get(session["user_id"])
+    user = get_current_user()
     resolved_as = request.form.get("resolve")
     number_students = request.form.get("numstudents")
 
@@ -108,12 +274,18 @@ def resolve_ticket(ticket_id):
     elif resolved_as == "duplicate":
         ticket = Ticket.query.get(ticket_id)
         if ticket:
+            before = rollup_delta(ticket)
+            archived_before = archived_month(ticket)
             ticket.status = "resolved"
             ticket.closed_reason = "duplicate"
             ticket.closed_at = datetime.now(timezone.utc)
             ticket.number_of_students = 0
+            update_rollup(before, rollup_delta(ticket))
             db.session.commit()
-            broadcast_ticket_update(ticket.id)
+            invalidate_partitions(
+                current_app.root_path, [archived_before, archived_month(ticket)]
+            )
+            broadcast_ticket_event(TICKET_RESOLVED, ticket)
             flash("Ticket marked as duplicate and resolved successfully", "success")
             return redirect(url_for("views.userpage", username=user.username))
         else:
@@ -122,12 +294,18 @@ def resolve_ticket(ticket_id):
     elif resolved_as == "helped":
         ticket = Ticket.query.get(ticket_id)
         if ticket:
+            before = rollup_delta(ticket)
+            archived_before = archived_month(ticket)
             ticket.status = "resolved"
             ticket.closed_reason = "helped"
             ticket.closed_at = datetime.now(timezone.utc)
             ticket.number_of_students = number_students
+            update_rollup(before, rollup_delta(ticket))
             db.session.commit()
-            broadcast_ticket_update(ticket.id)
+            invalidate_partitions(
+                current_app.root_path, [archived_before, archived_month(ticket)]
+            )
+            broadcast_ticket_event(TICKET_RESOLVED, ticket)
             flash(
                 f"Ticket marked as helped and resolved successfully ({number_students} students)",
                 "success",
@@ -139,12 +317,18 @@ def resolve_ticket(ticket_id):
     elif resolved_as == "no_show":
         ticket = Ticket.query.get(ticket_id)
         if ticket:
+            before = rollup_delta(ticket)
+            archived_before = archived_month(ticket)
             ticket.status = "resolved"
             ticket.closed_reason = "no_show"
             ticket.closed_at = datetime.now(timezone.utc)
             ticket.number_of_students = 0
+            update_rollup(before, rollup_delta(ticket))
             db.session.commit()
-            broadcast_ticket_update(ticket.id)
+            invalidate_partitions(
+                current_app.root_path, [archived_before, archived_month(ticket)]
+            )
+            broadcast_ticket_event(TICKET_RESOLVED, ticket)
             flash("Ticket marked as no show and resolved successfully", "success")
             return redirect(url_for("views.userpage", username=user.username))
         else:
@@ -153,15 +337,20 @@ def resolve_ticket(ticket_id):
     elif resolved_as == "return_to_queue":
         ticket = Ticket.query.get(ticket_id)
         if ticket:
+            before = rollup_delta(ticket)
+            archived_before = archived_month(ticket)
             ticket.status = "live"
             ticket.wa_id = None
             ticket.wormhole_assistant = None
+            update_rollup(before, None)
             db.session.commit()
-            broadcast_ticket_update(ticket.id)
+            invalidate_partitions(current_app.root_path, [archived_before])
 
             skipped = Skipped(wa_id=user.id, tkt_id=ticket_id)
             db.session.add(skipped)
             db.session.commit()
+            get_queue_snapshot().mark_skipped(ticket_id, user.id)
+            broadcast_ticket_event(TICKET_REQUEUED, ticket)
 
             flash("Ticket skipped and will be handled by another wormhole assistant")
             return redirect(url_for("views.userpage", username=user.username))
@@ -1,8 +1,10 @@
 import csv
 from io import StringIO
 
+import sqlalchemy as sa
 from flask import Blueprint, flash, jsonify, redirect, render_template, request, url_for
 from sqlalchemy.exc import SQLAlchemyError
+from werkzeug.security import generate_password_hash
 
 from app import db
 from app.auth_utils import admin_required
@@ -11,6 +13,9 @@ from app.models import User
 
 user_bp = Blueprint("users", __name__, url_prefix="/api")
 
+# Initial password for accounts created by an admin.
+DEFAULT_PASSWORD = "wormhole"
+
 
 # route to remove user
 @admin_required
@@ -73,7 +78,7 @@ def users_add():
             is_active=True,
         )
 
-        u.set_password("wormhole")
+        u.set_password(DEFAULT_PASSWORD)
 
         db.session.add(u)
         db.session.commit()
@@ -145,19 +150,21 @@ def users_add_batch():
         )
         return render_template("register_batch.html", form=form), 400
 
-    created_count = 0
-    skipped_count = 0
-
+    # First pass: validate every row. Valid rows become candidates and are
+    # checked against the database together below.
+    parsed = []
     for row_number, row in enumerate(rows[1:], start=2):
         if not row or all(not col.strip() for col in row):
             continue
 
         if len(row) < 3:
-            skipped_count += 1
-            flash(
-                f"Row {row_number} skipped: expected 3 columns "
-                "(first name, last name, ONID).",
-                "error",
+            parsed.append(
+                (
+                    row_number,
+                    f"Row {row_number} skipped: expected 3 columns "
+                    "(first name, last name, ONID).",
+                    None,
+                )
             )
             continue
 
@@ -166,37 +173,63 @@ def users_add_batch():
         onid = row[2].strip().lower()
 
         if not first_name or not last_name or not onid:
-            skipped_count += 1
-            flash(
-                f"Row {row_number} skipped: first name, last name, and ONID are required.",
-                "error",
+            parsed.append(
+                (
+                    row_number,
+                    f"Row {row_number} skipped: first name, last name, "
+                    "and ONID are required.",
+                    None,
+                )
             )
             continue
 
-        username = onid
-        email = f"{onid}@oregonstate.edu"
+        parsed.append((row_number, None, (onid, f"{first_name} {last_name}")))
 
-        if (
-            User.query.filter_by(username=username).first()
-            or User.query.filter_by(email=email).first()
+    # One lookup for every username and email the batch would use.
+    onids = [fields[0] for _, _, fields in parsed if fields]
+    emails = [f"{onid}@oregonstate.edu" for onid in onids]
+    taken_usernames, taken_emails = set(), set()
+    if onids:
+        for username, email in db.session.execute(
+            sa.select(User.username, User.email).where(
+                sa.or_(User.username.in_(onids), User.email.in_(emails))
+            )
         ):
+            taken_usernames.add(username)
+            taken_emails.add(email)
+
+    # Every new account gets the same default password, so hash it once:
+    # scrypt costs tens of milliseconds per call and blocks the event loop.
+    default_hash = generate_password_hash(DEFAULT_PASSWORD) if onids else None
+    new_users = []
+    skipped_count = 0
+    for row_number, error, fields in parsed:
+        if error is None:
+            onid, name = fields
+            email = f"{onid}@oregonstate.edu"
+            if onid in taken_usernames or email in taken_emails:
+                error = f"Row {row_number} skipped: user {onid} already exists."
+        if error is not None:
             skipped_count += 1
-            flash(
-                f"Row {row_number} skipped: user {onid} already exists.",
-                "error",
-            )
+            flash(error, "error")
             continue
 
-        new_user = User(
-            username=username,
-            email=email,
-            name=f"{first_name} {last_name}",
-            is_admin=False,
-            is_active=True,
+        # A later row with the same ONID is a duplicate of this one.
+        taken_usernames.add(onid)
+        taken_emails.add(email)
+        new_users.append(
+            {
+                "username": onid,
+                "email": email,
+                "name": name,
+                "password_hash": default_hash,
+                "is_admin": False,
+                "is_active": True,
+            }
         )
-        new_user.set_password("wormhole")
-        db.session.add(new_user)
-        created_count += 1
+    created_count = len(new_users)
+    if new_users:
+        db.session.execute(sa.insert(User), new_users)
 
     try:
         db.session.commit()
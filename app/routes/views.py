@@ -2,10 +2,12 @@
 import csv
 import io
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
 from types import SimpleNamespace
 from urllib.parse import urljoin, urlparse
 
+import sqlalchemy as sa
 from flask import (
     Blueprint,
     Response,
@@ -15,25 +17,32 @@ from flask import (
     redirect,
     render_template,
     request,
+    send_file,
     send_from_directory,
     session,
+    stream_with_context,
     url_for,
 )
 
 # Explicit imports for SQLAlchemy operators to ensure compatibility
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import joinedload
 
 from app import db
+from app.archive_jobs import JOB_DONE, JOB_FAILED, recent_jobs, submit_export_job
+from app.archive_store import invalidate_partitions, load_manifest, search_archive
 from app.archive_utils import (
     archive_dir as get_archive_dir,
 )
 from app.archive_utils import (
     archive_ticket_query,
-    create_archive_file,
+    current_compressed_archive,
+    iter_archive_csv,
     list_archive_files,
+    remove_archive,
 )
-from app.auth_utils import admin_required, login_required
+from app.auth_utils import admin_required, get_current_user, login_required
 from app.forms import (
     ChangePassForm,
     ClearQueueForm,
@@ -46,17 +55,38 @@ from app.forms import (
     RegisterBatchForm,
     RegisterForm,
     ResolveTicketForm,
+    SearchArchiveForm,
     SiteContentForm,
     TicketForm,
 )
-from app.models import Skipped, Ticket, User
+from app.models import Ticket, User
+from app.page_cache import cache_anonymous_page, get_page_cache
 from app.queue_maintenance import flush_open_tickets
+from app.queue_snapshot import get_queue_snapshot
+from app.routes.queue_events import (
+    TICKET_CLAIMED,
+    TICKET_CREATED,
+    TICKET_RESOLVED,
+    broadcast_queue_refresh,
+    broadcast_ticket_event,
+    current_queue_version,
+)
 from app.site_content import (
     get_site_content,
+    get_site_content_cache,
     get_site_content_rows,
     save_site_content_bulk,
     split_lines,
 )
+from app.ticket_claims import claim_next_ticket
+from app.ticket_export import (
+    PageParamsError,
+    page_params,
+    stream_tickets_ndjson,
+    ticket_page,
+    wants_ndjson,
+)
+from app.ticket_history import closed_tickets_page
 from app.time_utils import (
     PACIFIC_TZ,
     format_pacific,
@@ -69,6 +99,8 @@ INSTRUCTION_FILES = {
     "Wormhole_Student_Instructions.pdf",
     "MS_Teams_Instructions.pdf",
 }
+# Archive search results shown on one page.
+ARCHIVE_SEARCH_LIMIT = 200
 
 
 # --- Helper Functions ---
@@ -90,6 +122,13 @@ def is_safe_url(target):
     return test_url.scheme in ("http", "https") and ref_url.netloc == test_url.netloc
 
 
+def _ticket_with_assistant(ticket_id: int):
+    """Load a ticket and the assistant _ticket_to_ns names in one query."""
+    return db.session.get(
+        Ticket, ticket_id, options=[joinedload(Ticket.wormhole_assistant)]
+    )
+
+
 def _ticket_to_ns(ticket: Ticket):
     if ticket is None:
         return None
@@ -118,6 +157,22 @@ def _ticket_to_ns(ticket: Ticket):
     )
 
 
+def _snapshot_to_ns(data: dict):
+    """Build the template namespace for a ticket served from the queue snapshot."""
+    return SimpleNamespace(
+        id=data["id"],
+        name=data["student_name"],
+        table=data["table"],
+        phClass=data["physics_course"],
+        time_create_pacific=data["created_at_short"],
+        time_close_pacific=data["closed_at_short"],
+        num_students=data["number_of_students"],
+        closed_reason=data["closed_reason"],
+        closed_by=data["assistant_name"],
+        assigned_to=data["assistant_name"],
+    )
+
+
 def _split_user_name(full_name):
     if not full_name:
         return "", ""
@@ -174,6 +229,7 @@ def _build_users_csv_response(users, filename):
 
 @views_bp.route("/")
 @views_bp.route("/index", endpoint="index")
+@cache_anonymous_page(lambda: get_site_content_cache().current_version())
 def index():
     content = get_site_content()
 
@@ -229,18 +285,16 @@ def edit_site_content():
 
 
 @views_bp.route("/livequeue")
+@cache_anonymous_page(current_queue_version)
 def livequeue():
     # Fetch current open tickets for initial page load
-    open_tickets = (
-        Ticket.query.filter_by(status="live", wa_id=None)
-        .order_by(Ticket.created_at)
-        .all()
-    )
-    ol = [_ticket_to_ns(t) for t in open_tickets]
+    open_tickets = get_queue_snapshot().live_tickets(unassigned_only=True)
+    ol = [_snapshot_to_ns(t) for t in open_tickets]
     return render_template("livequeue.html", ol=ol)
 
 
 @views_bp.route("/wiki")
+@cache_anonymous_page()
 def wiki():
     return render_template("wiki.html")
 
@@ -249,33 +303,25 @@ def wiki():
 @login_required
 def queue():
     # 1. Fetch the REAL user to ensure template links use the correct username
-    sid = session.get("user_id")
-    current_user_obj = db.session.get(User, sid) if sid else None
+    current_user_obj = get_current_user()
 
     if not current_user_obj:
         return redirect(url_for("views.assistant_login"))
 
-    # Fetch current queue data
-    open_tickets = (
-        Ticket.query.filter_by(status="live", wa_id=None)
-        .order_by(Ticket.created_at)
-        .all()
-    )
+    # Fetch current queue data, noting the version it reflects for live updates
+    queue_version = current_queue_version()
+    snapshot = get_queue_snapshot()
+    open_tickets = snapshot.live_tickets(unassigned_only=True)
 
     # Filter by 'in_progress' to match Ticket.assign_to() logic
-    current_tickets = (
-        Ticket.query.filter_by(status="in_progress").order_by(Ticket.created_at).all()
-    )
+    current_tickets = snapshot.in_progress_tickets()
 
-    # Include both "closed" and "resolved" in the historical list
-    closed_tickets = (
-        Ticket.query.filter(Ticket.status.in_(["closed", "resolved"]))
-        .order_by(Ticket.created_at.desc())
-        .all()
-    )
+    # Include both "closed" and "resolved" in the historical list. Only the
+    # first page is rendered; the page fetches more from /api/closedtickets.
+    closed_tickets, history_cursor = closed_tickets_page()
 
-    ol = [_ticket_to_ns(t) for t in open_tickets]
-    cul = [_ticket_to_ns(t) for t in current_tickets]
+    ol = [_snapshot_to_ns(t) for t in open_tickets]
+    cul = [_snapshot_to_ns(t) for t in current_tickets]
     cll = [_ticket_to_ns(t) for t in closed_tickets]
 
     # Use dedicated CSRF-protected forms for admin queue actions
@@ -291,6 +337,8 @@ def queue():
         user=current_user_obj,
         flush_form=flush_form,
         clear_form=clear_form,
+        queue_version=queue_version,
+        history_cursor=history_cursor,
     )
 
 
@@ -307,6 +355,7 @@ def flush():
         return redirect(url_for("views.queue"))
 
     count = flush_open_tickets(reason="Queue Flushed")
+    broadcast_queue_refresh()
 
     flash(f"Queue flushed. {count} tickets closed.", "info")
     return redirect(url_for("views.queue"))
@@ -347,6 +396,11 @@ def clear_queue():
         flash("Unable to clear queue data.", "error")
         return redirect(url_for("views.queue"))
 
+    # Every partition now describes tickets the database no longer has.
+    invalidate_partitions(current_app.root_path, load_manifest(current_app.root_path))
+    get_queue_snapshot().invalidate()
+    broadcast_queue_refresh()
+
     flash(
         f"Queue data cleared permanently. {cleared_count} tickets removed.",
         "info",
@@ -370,9 +424,7 @@ def create_ticket_page():
 
         # broadcast update to queue clients
         try:
-            from app.routes.queue_events import broadcast_ticket_update
-
-            broadcast_ticket_update(t.id)
+            broadcast_ticket_event(TICKET_CREATED, t)
         except Exception:
             pass
 
@@ -382,33 +434,51 @@ def create_ticket_page():
     return render_template("createticket.html", form=form)
 
 
+def _debug_ticket_dict(t: Ticket) -> dict:
+    return {
+        "id": t.id,
+        "name": t.student_name,
+        "class": t.physics_course,
+        "table": t.table,
+        "status": t.status,
+        "created_at": serialize_datetime(t.created_at),
+        "created_at_local": format_pacific(t.created_at, "%Y-%m-%d %H:%M:%S %Z"),
+    }
+
+
 @views_bp.route("/debug/tickets")
+@admin_required
 def debug_tickets():
-    """List all tickets for debugging."""
+    """List tickets for debugging, one page (or an NDJSON stream) at a time."""
     from flask import jsonify
 
-    all_tickets = Ticket.query.all()
+    try:
+        after_id, limit = page_params()
+    except PageParamsError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if wants_ndjson():
+        return stream_tickets_ndjson(_debug_ticket_dict, after_id=after_id)
+
+    tickets, next_after_id = ticket_page(after_id, limit)
     return jsonify(
         {
-            "total": len(all_tickets),
-            "tickets": [
-                {
-                    "id": t.id,
-                    "name": t.student_name,
-                    "class": t.physics_course,
-                    "table": t.table,
-                    "status": t.status,
-                    "created_at": serialize_datetime(t.created_at),
-                    "created_at_local": format_pacific(
-                        t.created_at, "%Y-%m-%d %H:%M:%S %Z"
-                    ),
-                }
-                for t in all_tickets
-            ],
+            "total": db.session.scalar(sa.select(sa.func.count(Ticket.id))),
+            "next_after_id": next_after_id,
+            "tickets": [_debug_ticket_dict(t) for t in tickets],
         }
     )
 
 
+@views_bp.route("/debug/page-cache")
+@admin_required
+def debug_page_cache():
+    """Report the anonymous page cache's hit ratio and size."""
+    from flask import jsonify
+
+    return jsonify(get_page_cache().stats())
+
+
 @views_bp.route("/assistant-login", methods=["GET", "POST"])
 def assistant_login():
     # support form-based login (POST) as well as rendering the login page (GET)
@@ -494,18 +564,15 @@ def export_archive():
     safe_end = end_date.date().isoformat()
     filename = f"wormhole_archive_{safe_start}_to_{safe_end}.csv"
 
-    try:
-        create_archive_file(
-            root_path=current_app.root_path,
-            start_utc=start_date,
-            end_utc=end_date,
-            filename=filename,
-        )
-    except OSError:
+    job = submit_export_job(
+        start_date, end_date, filename, requested_by_id=session.get("user_id")
+    )
+    if job.status == JOB_DONE:
+        flash(f"Archive created: {filename}", "success")
+    elif job.status == JOB_FAILED:
         flash("Failed to save archive file on server.", "error")
-        return redirect(url_for("views.archive"))
-
-    flash(f"Archive created: {filename}", "success")
+    else:
+        flash(f"Archive export queued: {filename}", "info")
     return redirect(url_for("views.archive"))
 
 
@@ -515,6 +582,10 @@ def export_archive():
 @views_bp.route("/archive")
 @admin_required
 def archive():
+    return _render_archive_page(SearchArchiveForm(formdata=None))
+
+
+def _render_archive_page(search_form, search_results=None):
     # Instantiate form for the template to render CSRF token and fields
     form = ExportArchiveForm()
     delete_form = DeleteArchiveForm()
@@ -526,11 +597,47 @@ def archive():
         tkt_list=tkt_list,
         assoc_list=assoc_list,
         archive_files=archive_files,
+        archive_jobs=recent_jobs(),
         delete_form=delete_form,
         form=form,
+        search_form=search_form,
+        search_results=search_results,
+        search_limit=ARCHIVE_SEARCH_LIMIT,
     )
 
 
+@views_bp.route("/archive/search")
+@admin_required
+def search_archives():
+    """Show archived tickets in a date range matching a student, course or assistant."""
+    search_form = SearchArchiveForm(formdata=request.args, meta={"csrf": False})
+    if not search_form.validate():
+        flash("Enter a date range and search text.", "error")
+        return redirect(url_for("views.archive"))
+
+    start_date, _ = pacific_day_bounds_to_utc(search_form.start_date.data)
+    _, end_date = pacific_day_bounds_to_utc(search_form.end_date.data)
+    if start_date > end_date:
+        flash("Start date cannot be after end date.", "error")
+        return redirect(url_for("views.archive"))
+
+    # Partitioned months are scanned from disk, so stop at the first page.
+    matches = search_archive(
+        current_app.root_path, start_date, end_date, search_form.query.data
+    )
+    results = list(islice(matches, ARCHIVE_SEARCH_LIMIT))
+    return _render_archive_page(search_form, results)
+
+
+@views_bp.route("/archive/jobs")
+@admin_required
+def archive_jobs():
+    """Return recent export jobs so the archive page can show live progress."""
+    from flask import jsonify
+
+    return jsonify([job.to_dict() for job in recent_jobs()])
+
+
 @views_bp.route("/archive/delete", methods=["POST"])
 @admin_required
 def delete_archives():
@@ -555,7 +662,7 @@ def delete_archives():
         archive_path = archive_dir_path / safe_name
         try:
             if archive_path.is_file():
-                archive_path.unlink()
+                remove_archive(archive_path)
                 deleted_count += 1
         except OSError:
             continue
@@ -580,7 +687,58 @@ def download_archive(filename):
     if not file_path.is_file():
         abort(404)
 
-    return send_from_directory(str(archive_dir_path), safe_filename, as_attachment=True)
+    # Serve the stored gzip copy to clients that accept it. send_file handles
+    # Range requests, which then address bytes of the compressed copy.
+    gz_path = current_compressed_archive(file_path)
+    if gz_path is not None and request.accept_encodings["gzip"]:
+        response = send_file(
+            gz_path,
+            mimetype="text/csv",
+            as_attachment=True,
+            download_name=safe_filename,
+            conditional=True,
+        )
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        response = send_from_directory(
+            str(archive_dir_path), safe_filename, as_attachment=True
+        )
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+@views_bp.route("/archive/stream")
+@admin_required
+def stream_archive():
+    """Stream a date-range export straight to the browser, gzip-compressed."""
+    form = ExportArchiveForm(formdata=request.args, meta={"csrf": False})
+    if not form.validate():
+        flash("Invalid date format or missing fields.", "error")
+        return redirect(url_for("views.archive"))
+
+    start_date, _ = pacific_day_bounds_to_utc(form.start_date.data)
+    _, end_date = pacific_day_bounds_to_utc(form.end_date.data)
+    if start_date > end_date:
+        flash("Start date cannot be after end date.", "error")
+        return redirect(url_for("views.archive"))
+
+    tickets = archive_ticket_query(start_date, end_date, include_end=True).yield_per(
+        1000
+    )
+    compress = bool(request.accept_encodings["gzip"])
+    filename = (
+        f"wormhole_archive_{start_date.date().isoformat()}"
+        f"_to_{end_date.date().isoformat()}.csv"
+    )
+    response = Response(
+        stream_with_context(iter_archive_csv(tickets, compress=compress)),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+    if compress:
+        response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+    return response
 
 
 @views_bp.route("/instructions/<path:filename>")
@@ -606,21 +764,11 @@ def userpage(username):
         abort(404)
     # Get user's current ticket (if any)
     current_ticket = Ticket.query.filter_by(wa_id=u.id, status="in_progress").first()
-    # All Skipped?
-    # Get IDs of tickets already skipped by the current user
-    skipped_subquery = (
-        db.session.query(Skipped.tkt_id)
-        .filter(Skipped.wa_id == session["user_id"])
-        .subquery()
-        .select()
-    )
-
-    # Get all live tickets which the current user has not skipped
-    ticket_count = (
-        Ticket.query.filter_by(status="live")
-        .filter(Ticket.id.notin_(skipped_subquery))
-        .count()
-    )
+    # Count live tickets the current user has not skipped from the snapshot;
+    # later changes arrive with the socket events.
+    viewer_id = session["user_id"]
+    queue_version = current_queue_version()
+    ticket_count = len(get_queue_snapshot().live_tickets(skipped_by=viewer_id))
     skipped_all = ticket_count == 0
     # create minimal surface for template
     user_ns = SimpleNamespace(
@@ -636,6 +784,9 @@ def userpage(username):
         user=user_ns,
         current_user=current_user,
         skipped_all=skipped_all,
+        ticket_count=ticket_count,
+        viewer_id=viewer_id,
+        queue_version=queue_version,
     )
 
 
@@ -647,32 +798,17 @@ def getnewticket(username):
     if not u:
         abort(404)
 
-    # Get IDs of tickets already skipped by the current user
-    skipped_subquery = (
-        db.session.query(Skipped.tkt_id)
-        .filter(Skipped.wa_id == session["user_id"])
-        .subquery()
-        .select()
-    )
-
-    # Get the live ticket which the current user has not skipped that is first in line
-    t = (
-        Ticket.query.filter_by(status="live")
-        .filter(Ticket.id.notin_(skipped_subquery))
-        .first()
-    )
+    # Atomically claim the oldest live ticket the current user has not skipped,
+    # so simultaneous clicks from two assistants can never share a ticket.
+    t = claim_next_ticket(u.id, skipped_by_id=session["user_id"])
 
     if not t:
         # no tickets available; redirect back to user page
         flash("No available tickets to claim.", "info")
         return redirect(url_for("views.userpage", username=username))
 
-    t.assign_to(u)
-
     try:
-        from app.routes.queue_events import broadcast_ticket_update
-
-        broadcast_ticket_update(t.id)
+        broadcast_ticket_event(TICKET_CLAIMED, t)
     except Exception:
         pass
 
@@ -829,8 +965,7 @@ def changepass():
             return render_template("changepass.html", form=form)
 
         # get current session user
-        sid = session.get("user_id")
-        cur = User.query.get(sid) if sid else None
+        cur = get_current_user()
         if not cur:
             flash("Not authorized.", "error")
             return render_template("changepass.html", form=form)
@@ -857,8 +992,7 @@ def changepass():
 @views_bp.route("/currentticket/<int:tktid>")
 @login_required
 def currentticket(tktid):
-    # Use session.get for SQLAlchemy 2.0 compliance
-    t = db.session.get(Ticket, tktid)
+    t = _ticket_with_assistant(tktid)
     if not t:
         abort(404)
     form = ResolveTicketForm()
@@ -873,16 +1007,14 @@ def currentticket(tktid):
 @login_required
 def pastticket(username, tktid):
     # Validate authorization first: Ensure path username matches logged-in user or admin
-    sid = session.get("user_id")
-    current_user_obj = db.session.get(User, sid) if sid else None
+    current_user_obj = get_current_user()
 
     if not current_user_obj or (
         current_user_obj.username != username and not current_user_obj.is_admin
     ):
         abort(403)
 
-    # Use session.get for SQLAlchemy 2.0 compliance
-    t = db.session.get(Ticket, tktid)
+    t = _ticket_with_assistant(tktid)
     if not t:
         abort(404)
     form = ResolveTicketForm()
@@ -896,6 +1028,7 @@ def pastticket(username, tktid):
         t.wa_id = current_user_obj.id
 
         t.close_ticket(closed_reason=form.resolveReason.data, num_students=num_stds)
+        broadcast_ticket_event(TICKET_RESOLVED, t)
 
         flash("Ticket resolved successfully.", "success")
 
@@ -1,11 +1,30 @@
+"""Editable homepage content, cached per worker.
+
+The homepage renders the merged ``DEFAULT_SITE_CONTENT`` plus database
+overrides on every hit, but the content changes only a few times a semester.
+``SiteContentCache`` keeps the merged dict in process memory:
+
+* ``save_site_content_bulk`` bumps the ``site_content`` version stamp and
+  drops the local copy, so the editing worker serves new content at once.
+* Other workers compare their copy with the stamp at most once every
+  ``SITE_CONTENT_CHECK_SECONDS``; in between, a warm homepage makes no
+  database queries at all.
+"""
+
 from __future__ import annotations
 
-from typing import Optional
+import threading
+import time
+from typing import Optional, cast
 
 import sqlalchemy as sa
+from flask import Flask, current_app
 
 from app import db
 from app.models import SiteContent
+from app.version_stamps import SITE_CONTENT_STAMP, bump_version, read_version
+
+DEFAULT_CHECK_SECONDS = 5.0
 
 DEFAULT_SITE_CONTENT: dict[str, str] = {
     "homepage_banner": "",
@@ -26,8 +45,8 @@ DEFAULT_SITE_CONTENT: dict[str, str] = {
 }
 
 
-def get_site_content() -> dict[str, str]:
-    """Return editable website content with database values overriding defaults."""
+def load_site_content() -> dict[str, str]:
+    """Read website content from the database, overriding the defaults."""
 
     content = DEFAULT_SITE_CONTENT.copy()
 
@@ -38,6 +57,79 @@ def get_site_content() -> dict[str, str]:
     return content
 
 
+class SiteContentCache:
+    """Thread-safe cache of the merged site content, keyed by version stamp."""
+
+    def __init__(self, check_seconds: float = DEFAULT_CHECK_SECONDS):
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._content: Optional[dict[str, str]] = None
+        self._version = 0
+        self._checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def version(self) -> int:
+        """Return the stamp version of the cached content."""
+        return self._version
+
+    def get(self) -> dict[str, str]:
+        """Return a copy of the site content, reloading it if it changed."""
+        with self._lock:
+            return dict(self._refresh())
+
+    def current_version(self) -> int:
+        """Return the version of the content ``get`` would return now."""
+        with self._lock:
+            self._refresh()
+            return self._version
+
+    def _refresh(self) -> dict[str, str]:
+        """Reload the content if it is stale, and return the cached mapping."""
+        now = time.monotonic()
+        if self._content is not None and now - self._checked_at < self.check_seconds:
+            self.hits += 1
+            return self._content
+
+        version = read_version(SITE_CONTENT_STAMP)
+        if self._content is None or version != self._version:
+            self.misses += 1
+            self._content = load_site_content()
+            self._version = version
+        else:
+            self.hits += 1
+        self._checked_at = now
+        return self._content
+
+    def invalidate(self) -> None:
+        """Drop the cached content so the next read reloads it."""
+        with self._lock:
+            self._content = None
+
+
+def init_site_content_cache(app: Flask) -> SiteContentCache:
+    """Attach a fresh site content cache to the app."""
+    cache = SiteContentCache(
+        check_seconds=app.config.get(
+            "SITE_CONTENT_CHECK_SECONDS", DEFAULT_CHECK_SECONDS
+        )
+    )
+    app.extensions["site_content_cache"] = cache
+    return cache
+
+
+def get_site_content_cache() -> SiteContentCache:
+    """Return the site content cache for the current app."""
+    return cast(SiteContentCache, current_app.extensions["site_content_cache"])
+
+
+def get_site_content() -> dict[str, str]:
+    """Return editable website content with database values overriding defaults."""
+
+    return get_site_content_cache().get()
+
+
 def get_site_content_rows() -> list[SiteContent]:
     """Return stored content rows for admin audit display."""
 
@@ -84,6 +176,9 @@ def save_site_content_bulk(
         )
 
     db.session.commit()
+    # Tell every worker its cached copy is stale, then drop this worker's.
+    bump_version(SITE_CONTENT_STAMP)
+    get_site_content_cache().invalidate()
 
 
 def split_lines(value: str) -> list[str]:
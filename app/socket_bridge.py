@@ -0,0 +1,124 @@
+"""Cross-process delivery of Socket.IO emits.
+
+With a single gunicorn worker every client is connected to the process that
+emits. With several workers, or when a CLI job such as ``flush-open-tickets``
+emits, the event must reach clients connected to other processes. Setting
+``SOCKETIO_MESSAGE_QUEUE`` routes every emit through a shared channel:
+
+    redis://host:6379/0        Redis or any Redis-compatible server; needs the
+                               ``redis`` package (python-socketio's RedisManager)
+    unix:///run/wormhole/sio   a directory of Unix datagram sockets, one per
+                               worker, for single-host deployments that do
+                               not run a broker
+    amqp://, kafka://, zmq+... the other python-socketio managers, as supported
+                               by Flask-SocketIO
+
+Typical usage example:
+    socketio.init_app(app, **socketio_options(app))
+"""
+
+from __future__ import annotations
+
+import glob
+import os
+import socket
+from typing import Any
+
+import socketio as python_socketio
+from flask import Flask
+
+UNIX_SCHEME = "unix://"
+DEFAULT_CHANNEL = "wormhole"
+
+# Upper bound on one queued message; large enough for a ticket_batch of
+# several hundred tickets and below the default Linux datagram limit.
+MAX_MESSAGE_BYTES = 200 * 1024
+
+
+class UnixSocketManager(python_socketio.PubSubManager):
+    """
+    Socket.IO client manager that fans emits out over Unix datagram sockets.
+
+    Every listening process binds ``<directory>/<channel>-<host id>.sock``.
+    Publishing sends the message to every socket in the directory, removing
+    sockets whose process has exited. python-socketio starts the listener when
+    the first client connects, so processes that accept no connections, such
+    as CLI and archive jobs, only publish and never bind a socket, although
+    ``write_only`` is left False for every process built by create_app.
+    """
+
+    name = "unix"
+
+    def __init__(
+        self,
+        url: str,
+        channel: str = DEFAULT_CHANNEL,
+        write_only: bool = False,
+        logger: Any = None,
+        json: Any = None,
+    ):
+        super().__init__(
+            channel=channel, write_only=write_only, logger=logger, json=json
+        )
+        self.directory = url[len(UNIX_SCHEME) :]
+        self.path = os.path.join(self.directory, f"{channel}-{self.host_id}.sock")
+
+    def _peers(self) -> list[str]:
+        return glob.glob(os.path.join(self.directory, f"{self.channel}-*.sock"))
+
+    def _publish(self, data: dict) -> None:
+        message = self.json.dumps(data).encode("utf-8")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sender:
+            for peer in self._peers():
+                if peer == self.path:
+                    continue  # this process already handled the message
+                try:
+                    sender.sendto(message, peer)
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # The worker that bound this socket has exited.
+                    try:
+                        os.unlink(peer)
+                    except FileNotFoundError:
+                        pass
+                except OSError as e:
+                    self._get_logger().error(f"Cannot publish to {peer}: {e}")
+
+    def _listen(self):
+        os.makedirs(self.directory, exist_ok=True)
+        receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        receiver.bind(self.path)
+        try:
+            while True:
+                yield receiver.recv(MAX_MESSAGE_BYTES)
+        finally:
+            receiver.close()
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+
+def _client_manager(url: str, channel: str) -> python_socketio.PubSubManager:
+    if url.startswith(UNIX_SCHEME):
+        return UnixSocketManager(url, channel=channel)
+    if url.startswith(("redis://", "rediss://")):
+        return python_socketio.RedisManager(url, channel=channel)
+    if url.startswith("kafka://"):
+        return python_socketio.KafkaManager(url, channel=channel)
+    if url.startswith("zmq"):
+        return python_socketio.ZmqManager(url, channel=channel)
+    return python_socketio.KombuManager(url, channel=channel)
+
+
+def socketio_options(app: Flask) -> dict[str, Any]:
+    """
+    Return the client-manager keyword arguments for ``socketio.init_app``.
+
+    Both keys are always returned: Flask-SocketIO keeps options between
+    ``init_app`` calls, so an app without a queue must reset them explicitly.
+    """
+    url = app.config.get("SOCKETIO_MESSAGE_QUEUE")
+    if not url:
+        return {"message_queue": None, "client_manager": None}
+    channel = app.config.get("SOCKETIO_CHANNEL", DEFAULT_CHANNEL)
+    return {"message_queue": url, "client_manager": _client_manager(url, channel)}
@@ -0,0 +1,60 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const table = document.getElementById('archive-jobs');
+    if (!table) {
+        return;
+    }
+    const POLL_MS = 2000;
+
+    function isActive(status) {
+        return status === 'queued' || status === 'running';
+    }
+
+    function activeJobIds() {
+        return Array.from(table.querySelectorAll('tr[data-job-id]'))
+            .filter(row => isActive(row.dataset.status))
+            .map(row => row.dataset.jobId);
+    }
+
+    function renderJob(row, job) {
+        row.dataset.status = job.status;
+        row.querySelector('.job-status').textContent =
+            job.error ? `${job.status} (${job.error})` : job.status;
+        row.querySelector('.job-rows').textContent =
+            job.rows_total === null ? String(job.rows_written)
+                                    : `${job.rows_written} of ${job.rows_total}`;
+    }
+
+    // Poll only while an export is queued or running.
+    function poll() {
+        if (activeJobIds().length === 0) {
+            return;
+        }
+        fetch(table.dataset.jobsUrl)
+            .then(response => response.json())
+            .then(jobs => {
+                let finished = false;
+                jobs.forEach(job => {
+                    const row = table.querySelector(`tr[data-job-id="${job.id}"]`);
+                    if (!row) {
+                        return;
+                    }
+                    if (isActive(row.dataset.status) && job.status === 'done') {
+                        finished = true;
+                    }
+                    renderJob(row, job);
+                });
+                if (finished) {
+                    // Reload so the new file shows up in the archive list.
+                    window.location.reload();
+                    return;
+                }
+                setTimeout(poll, POLL_MS);
+            })
+            .catch(error => {
+                console.error('Error fetching archive jobs:', error);
+                setTimeout(poll, POLL_MS);
+            });
+    }
+
+    setTimeout(poll, POLL_MS);
+});
@@ -1,64 +1,171 @@
 document.addEventListener('DOMContentLoaded', function() {
     // Connect to the queue namespace
-    const socket = io('/queue');
+    // WebSocket only: polling requests could land on different gunicorn
+    // workers, which do not share Engine.IO sessions.
+    const socket = io('/queue', {transports: ['websocket']});
+
+    // Active tickets (live and in progress) in queue order, keyed by id.
+    let tickets = new Map();
+    // Version of the last queue event reflected in `tickets`.
+    let queueVersion = null;
+    // Estimated wait in seconds for each place in line, first place first.
+    let waitEstimates = [];
 
     socket.on('connect', function() {
         console.log('Connected to queue namespace');
-        updateTicketTable();
-        console.log('Initial ticket table loaded');
+        resync();
+    });
+
+    // How each ticket event changes the local map; false means resync.
+    const patches = {
+        ticket_created: upsertTicket,
+        ticket_claimed: upsertTicket,
+        ticket_requeued: upsertTicket,
+        ticket_resolved: function(ticket) {
+            tickets.delete(ticket.id);
+            return true;
+        },
+    };
+
+    Object.keys(patches).forEach(function(type) {
+        socket.on(type, function(event) {
+            applyEvents(
+                event.version,
+                event.version,
+                [{type: type, ticket: event.ticket}],
+                event.wait_estimates
+            );
+        });
     });
 
-    socket.on('new_ticket', function(data) {
-        console.log('New ticket created:', data);
-        updateTicketTable();
+    // Events raised in a burst arrive together, one entry per ticket.
+    socket.on('ticket_batch', function(batch) {
+        applyEvents(batch.first_version, batch.version, batch.events, batch.wait_estimates);
     });
 
     socket.on('queue_refresh', function(data) {
         console.log('Queue refresh event received');
-        refreshLiveQueue();
+        resync();
     });
 
     socket.on('disconnect', function() {
         console.log('Disconnected from queue namespace');
     });
 
-    function refreshLiveQueue() {
-        location.reload();
+    // Apply the events for versions first..last, or resync when a version
+    // was missed.
+    function applyEvents(first, last, events, estimates) {
+        if (queueVersion === null) {
+            return;  // initial load still in flight; it will include this change
+        }
+        if (last <= queueVersion) {
+            return;  // already reflected in the last snapshot
+        }
+        if (first !== queueVersion + 1) {
+            console.log('Queue version gap, resyncing', queueVersion, first);
+            resync();
+            return;
+        }
+        queueVersion = last;
+        waitEstimates = estimates || waitEstimates;
+        let patched = true;
+        events.forEach(function(event) {
+            patched = patches[event.type](event.ticket) && patched;
+        });
+        if (patched) {
+            renderTickets();
+        } else {
+            resync();
+        }
+    }
+
+    // Every room's ticket events carry the fields this page renders, so a
+    // new ticket is placed without refetching the queue.
+    function upsertTicket(ticket) {
+        tickets.set(ticket.id, ticket);
+        sortTickets();
+        return true;
+    }
+
+    function sortTickets() {
+        tickets = new Map(
+            [...tickets.entries()].sort(function(a, b) {
+                const byCreated = a[1].created_at.localeCompare(b[1].created_at);
+                return byCreated !== 0 ? byCreated : a[1].id - b[1].id;
+            })
+        );
     }
 
-    function updateTicketTable() {
+    function resync() {
         fetch('/api/livequeuetickets')
             .then(response => {
-                console.log('Response status', response.status);
-                return response.json();
+                const version = Number(response.headers.get('X-Queue-Version') || 0);
+                return response.json().then(data => [version, data]);
+            })
+            .then(([version, data]) => {
+                queueVersion = version;
+                tickets = new Map(data.map(ticket => [ticket.id, ticket]));
+                waitEstimates = data
+                    .filter(ticket => ticket.status === 'live')
+                    .map(ticket => ticket.estimated_wait_seconds);
+                renderTickets();
             })
-            .then(tickets => {
-                console.log('API tickets:', tickets);
+            .catch(error => console.error('Error fetching tickets:', error));
+    }
 
-                const ticketTableBody = document.querySelector('#tickets tbody');
-                ticketTableBody.innerHTML = '';
+    // Patch the table rows in place: reuse existing rows, drop removed ones.
+    function renderTickets() {
+        const ticketTableBody = document.querySelector('#tickets tbody');
+        const existingRows = new Map(
+            [...ticketTableBody.querySelectorAll('tr')].map(row => [row.id, row])
+        );
 
-                tickets.forEach((ticket, index) => {
-                    const row = document.createElement('tr');
-                    row.id = `ticket-${ticket.id}`;
+        let index = 0;
+        let livePosition = 0;
+        let previousRow = null;
+        tickets.forEach(ticket => {
+            const rowId = `ticket-${ticket.id}`;
+            let row = existingRows.get(rowId);
+            existingRows.delete(rowId);
+            if (!row) {
+                row = document.createElement('tr');
+                row.id = rowId;
+                for (let i = 0; i < 5; i++) {
+                    row.appendChild(document.createElement('td'));
+                }
+            }
 
-                    const positionOrStatus = ticket.status === 'in_progress'
-                        ? 'IN PROGRESS'
-                        : index + 1;
+            const positionOrStatus = ticket.status === 'in_progress'
+                ? 'IN PROGRESS'
+                : index + 1;
+            index++;
+            const cells = row.children;
+            cells[0].textContent = positionOrStatus;
+            cells[1].textContent = ticket.student_name;
+            cells[2].textContent = ticket.table;
+            cells[3].textContent = ticket.physics_course;
+            cells[4].textContent = ticket.status === 'live'
+                ? formatWait(waitEstimates[livePosition++])
+                : '';
 
-                    row.innerHTML = `
-                        <td>${positionOrStatus}</td>
-                        <td>${ticket.student_name}</td>
-                        <td>${ticket.table}</td>
-                        <td>${ticket.physics_course}</td>
-                    `;
+            const expectedNext = previousRow ? previousRow.nextSibling : ticketTableBody.firstChild;
+            if (row !== expectedNext) {
+                ticketTableBody.insertBefore(row, expectedNext);
+            }
+            previousRow = row;
+        });
 
-                    ticketTableBody.appendChild(row);
-                });
+        existingRows.forEach(row => row.remove());
 
-                document.getElementById('refresh-time').textContent =
-                    new Date().toLocaleTimeString();
-            })
-            .catch(error => console.error('Error fetching tickets:', error));
+        document.getElementById('refresh-time').textContent =
+            new Date().toLocaleTimeString();
+    }
+
+    function formatWait(seconds) {
+        if (seconds === undefined || seconds === null) {
+            return '';
+        }
+        const minutes = Math.round(seconds / 60);
+        return minutes < 1 ? 'under 1 min' : `~${minutes} min`;
     }
-});
\ No newline at end of file
+});
@@ -1,20 +1,50 @@
 // app/static/js/queue.js
 // Real-time queue updates using Socket.IO
+//
+// The dashboard is rendered by the server once. Afterwards each typed ticket
+// event moves or patches a single list item; the page only reloads when a
+// queue version is missed or the whole queue changed (flush/clear).
 
 document.addEventListener('DOMContentLoaded', function() {
+    const dashboard = document.getElementById('queue-dashboard');
+    if (!dashboard) {
+        return;
+    }
+    const username = dashboard.dataset.username;
+    const queuePath = window.location.pathname;
+    let queueVersion = Number(dashboard.dataset.queueVersion || 0);
+
+    const openList = document.getElementById('open-tickets');
+    const currentList = document.getElementById('current-tickets');
+    const closedList = document.getElementById('closed-tickets');
+
     // Connect to the queue namespace (use simple namespace connect)
-    const socket = io('/queue');
+    // WebSocket only: polling requests could land on different gunicorn
+    // workers, which do not share Engine.IO sessions.
+    const socket = io('/queue', {transports: ['websocket']});
 
     // Handle connection
     socket.on('connect', function() {
         console.log('Connected to queue updates');
     });
 
-    // Handle new ticket broadcast
-    socket.on('new_ticket', function(data) {
-        console.log('New ticket received:', data);
-        // Refresh the queue display
-        refreshQueue();
+    // Where each ticket event moves the ticket's list item.
+    const patches = {
+        ticket_created: ticket => placeTicket(openList, openItem(ticket), false),
+        ticket_claimed: ticket => placeTicket(currentList, currentItem(ticket), false),
+        ticket_requeued: ticket => placeTicket(openList, openItem(ticket), false),
+        ticket_resolved: ticket => placeTicket(closedList, closedItem(ticket), true),
+    };
+
+    Object.keys(patches).forEach(function(type) {
+        socket.on(type, function(event) {
+            applyEvents(event.version, event.version, [{type: type, ticket: event.ticket}]);
+        });
+    });
+
+    // Events raised in a burst arrive together, one entry per ticket.
+    socket.on('ticket_batch', function(batch) {
+        applyEvents(batch.first_version, batch.version, batch.events);
     });
 
     // Handle queue refresh signal
@@ -28,8 +58,123 @@ document.addEventListener('DOMContentLoaded', function() {
         console.log('Disconnected from queue updates');
     });
 
-    // Function to refresh queue display (fetch updated data via API or reload)
+    // Apply the events for versions first..last, or reload when a version
+    // was missed.
+    function applyEvents(first, last, events) {
+        if (last <= queueVersion) {
+            return;  // already part of the rendered page
+        }
+        if (first !== queueVersion + 1) {
+            console.log('Queue version gap, reloading', queueVersion, first);
+            refreshQueue();
+            return;
+        }
+        queueVersion = last;
+        events.forEach(event => patches[event.type](event.ticket));
+    }
+
+    // Remove any existing item for the ticket and insert the new one.
+    function placeTicket(list, item, prepend) {
+        const existing = document.getElementById(item.id);
+        if (existing) {
+            existing.remove();
+        }
+        if (!list) {
+            return;
+        }
+        if (prepend) {
+            list.insertBefore(item, list.firstChild);
+        } else {
+            list.appendChild(item);
+        }
+    }
+
+    function linkItem(ticket, href, text) {
+        const item = document.createElement('li');
+        item.id = `ticket-${ticket.id}`;
+        const link = document.createElement('a');
+        link.href = href;
+        link.textContent = text;
+        item.appendChild(link);
+        return item;
+    }
+
+    function pastTicketHref(ticket) {
+        const next = encodeURIComponent(queuePath);
+        return `/pastticket/${encodeURIComponent(username)}/${ticket.id}?next=${next}`;
+    }
+
+    function openItem(ticket) {
+        return linkItem(
+            ticket,
+            pastTicketHref(ticket),
+            `${ticket.student_name} — ${ticket.physics_course} (Table ${ticket.table})`
+        );
+    }
+
+    function currentItem(ticket) {
+        return linkItem(
+            ticket,
+            `/currentticket/${ticket.id}`,
+            `${ticket.student_name} (Table ${ticket.table}) - ${ticket.assistant_name}`
+        );
+    }
+
+    function closedItem(ticket) {
+        return linkItem(
+            ticket,
+            pastTicketHref(ticket),
+            [
+                ticket.id,
+                ticket.student_name,
+                ticket.table,
+                ticket.physics_course,
+                `Opened: ${ticket.created_at_short}`,
+                `Closed: ${ticket.closed_at_short}`,
+                ticket.closed_reason || 'N/A',
+                ticket.number_of_students,
+                ticket.assistant_name,
+            ].join(' - ')
+        );
+    }
+
+    // Load older closed tickets a page at a time as the user scrolls down.
+    const moreHistory = document.getElementById('closed-tickets-more');
+    if (moreHistory && closedList && 'IntersectionObserver' in window) {
+        let loading = false;
+        const observer = new IntersectionObserver(function(entries) {
+            if (!entries[0].isIntersecting || loading) {
+                return;
+            }
+            loading = true;
+            const cursor = encodeURIComponent(moreHistory.dataset.nextCursor);
+            fetch(`/api/closedtickets?cursor=${cursor}`)
+                .then(response => response.json())
+                .then(page => {
+                    page.tickets.forEach(ticket => {
+                        if (!document.getElementById(`ticket-${ticket.id}`)) {
+                            closedList.appendChild(closedItem(ticket));
+                        }
+                    });
+                    if (page.next_cursor) {
+                        moreHistory.dataset.nextCursor = page.next_cursor;
+                        // Re-observe so a sentinel that is still visible
+                        // triggers the next page.
+                        observer.unobserve(moreHistory);
+                        observer.observe(moreHistory);
+                    } else {
+                        observer.disconnect();
+                        moreHistory.remove();
+                    }
+                })
+                .catch(error => console.error('Error loading ticket history:', error))
+                .finally(() => { loading = false; });
+        });
+        observer.observe(moreHistory);
+    }
+
+    // Full resync: the dashboard is server-rendered, so reload it.
     function refreshQueue() {
         location.reload();
     }
-});
\ No newline at end of file
+});
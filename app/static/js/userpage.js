@@ -1,44 +1,66 @@
 document.addEventListener('DOMContentLoaded', function() {
+    const ticketCountElem = document.getElementById('ticket-count');
+    if (!ticketCountElem) {
+        return;  // the assistant is working a ticket; there is no badge
+    }
+    const userId = ticketCountElem.dataset.userId;
+    // Version of the queue state the badge shows; the server rendered it.
+    let queueVersion = Number(ticketCountElem.dataset.queueVersion || 0);
+
     // Connect to the queue namespace
-    const socket = io('/queue');
+    // WebSocket only: polling requests could land on different gunicorn
+    // workers, which do not share Engine.IO sessions.
+    const socket = io('/queue', {transports: ['websocket']});
 
+    // Reconnects may have missed events; refetch the count once.
     socket.on('connect', function() {
         console.log('Connected to queue namespace (userpage)');
-        updateTicketCount();
-        console.log('Initial ticket count updated (userpage)');
+        resync();
     });
 
-    socket.on('new_ticket', function(data) {
-        console.log('New ticket event (userpage):', data);
-        updateTicketCount();
+    // Staff events carry every assistant's unskipped count, so the badge is
+    // updated from the event itself with no HTTP round trip.
+    ['ticket_created', 'ticket_claimed', 'ticket_resolved', 'ticket_requeued',
+     'ticket_batch'].forEach(function(type) {
+        socket.on(type, applyCounts);
     });
 
     socket.on('queue_refresh', function(data) {
         console.log('Queue refresh event (userpage)');
-        refreshUserPage();
+        resync();
     });
 
     socket.on('disconnect', function() {
         console.log('Disconnected from queue namespace (userpage)');
     });
 
-    function refreshUserPage() {
-        location.reload();
+    function applyCounts(event) {
+        if (!event.unskipped || event.version <= queueVersion) {
+            return;  // older than what the badge already shows
+        }
+        queueVersion = event.version;
+        const counts = event.unskipped;
+        renderTicketCount(userId in counts.by_user ? counts.by_user[userId] : counts.all);
     }
 
-    function updateTicketCount() {
-        console.log('fetching ticket count...');
-        fetch('/api/unskippedtickets')
+    function resync() {
+        fetch('/api/unskippedtickets/count')
             .then(response => {
-            return response.json();
-        })
-            .then(data => {
-                const ticketCountElem = document.getElementById('ticket-count');
-                if (ticketCountElem) {
-                    ticketCountElem.textContent = data.length;
-                    console.log('Ticket count updated to:', data.length);
+                const version = Number(response.headers.get('X-Queue-Version') || 0);
+                return response.json().then(data => [version, data]);
+            })
+            .then(([version, data]) => {
+                if (version < queueVersion) {
+                    return;  // a newer event arrived while this was in flight
                 }
+                queueVersion = version;
+                renderTicketCount(data.count);
             })
             .catch(error => console.error('Error fetching ticket count:', error));
     }
+
+    function renderTicketCount(count) {
+        ticketCountElem.textContent = count;
+        console.log('Ticket count updated to:', count);
+    }
 });
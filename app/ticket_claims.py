@@ -0,0 +1,130 @@
+"""Race-free ticket claiming for wormhole assistants.
+
+Two assistants pressing "Get Next Request" at the same moment must never end up
+with the same ticket. Claims are therefore made with a single conditional
+UPDATE that selects the oldest eligible ticket and assigns it in one statement:
+
+* PostgreSQL locks the candidate row with ``FOR UPDATE SKIP LOCKED`` so
+  concurrent claimers move on to the next ticket instead of blocking or
+  re-reading a row another transaction already took.
+* SQLite serializes writers, so the same single UPDATE is atomic there; the
+  ``FOR UPDATE`` clause is simply not rendered.
+* Dialects without ``UPDATE ... RETURNING`` fall back to a select-then-claim
+  loop whose UPDATE is guarded by ``status = 'live' AND wa_id IS NULL`` so a
+  lost race is detected from the row count and retried.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Optional, cast
+
+import sqlalchemy as sa
+
+from app import db
+from app.db_utils import supports_update_returning
+from app.models import Skipped, Ticket
+
+# Upper bound on conditional-update retries in the fallback path. Each lost
+# race means another assistant claimed a ticket, so the queue shrinks each time.
+MAX_CLAIM_ATTEMPTS = 10
+
+
+def _claimable_ticket_ids(skipped_by_id: Optional[int]) -> sa.Select:
+    """Return a FIFO-ordered select of live, unassigned, unskipped ticket IDs."""
+    query = sa.select(Ticket.id).where(
+        Ticket.status == "live",
+        Ticket.wa_id.is_(None),
+    )
+    if skipped_by_id is not None:
+        skipped_ids = sa.select(Skipped.tkt_id).where(Skipped.wa_id == skipped_by_id)
+        query = query.where(Ticket.id.not_in(skipped_ids))
+    return query.order_by(Ticket.created_at, Ticket.id)
+
+
+def _claim_values(assistant_id: int) -> dict:
+    return {
+        Ticket.wa_id: assistant_id,
+        Ticket.status: "in_progress",
+        Ticket.claimed_at: datetime.now(timezone.utc),
+    }
+
+
+def claim_next_ticket(
+    assistant_id: int,
+    *,
+    skipped_by_id: Optional[int] = None,
+) -> Optional[Ticket]:
+    """
+    Atomically assign the oldest claimable ticket to an assistant.
+
+    Parameters
+    ----------
+    assistant_id : int
+        ID of the user who will own the claimed ticket.
+    skipped_by_id : int, optional
+        User whose skipped tickets should be excluded from the claim.
+
+    Returns
+    -------
+    Ticket or None
+        The claimed ticket, already committed, or None when nothing is claimable.
+    """
+    if supports_update_returning():
+        return _claim_with_returning(assistant_id, skipped_by_id)
+    return _claim_with_conditional_update(assistant_id, skipped_by_id)
+
+
+def _claim_with_returning(
+    assistant_id: int, skipped_by_id: Optional[int]
+) -> Optional[Ticket]:
+    candidate = (
+        _claimable_ticket_ids(skipped_by_id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        sa.update(Ticket)
+        .where(
+            Ticket.id == candidate,
+            Ticket.status == "live",
+            Ticket.wa_id.is_(None),
+        )
+        .values(_claim_values(assistant_id))
+        .returning(Ticket)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    ticket = db.session.scalars(stmt).first()
+    db.session.commit()
+    return ticket
+
+
+def _claim_with_conditional_update(
+    assistant_id: int, skipped_by_id: Optional[int]
+) -> Optional[Ticket]:
+    for _ in range(MAX_CLAIM_ATTEMPTS):
+        ticket_id = db.session.scalar(_claimable_ticket_ids(skipped_by_id).limit(1))
+        if ticket_id is None:
+            db.session.rollback()
+            return None
+
+        # An UPDATE returns a CursorResult, which carries the rowcount.
+        result = cast(
+            sa.CursorResult,
+            db.session.execute(
+                sa.update(Ticket)
+                .where(
+                    Ticket.id == ticket_id,
+                    Ticket.status == "live",
+                    Ticket.wa_id.is_(None),
+                )
+                .values(_claim_values(assistant_id))
+                .execution_options(synchronize_session=False)
+            ),
+        )
+        db.session.commit()
+        if result.rowcount == 1:
+            return db.session.get(Ticket, ticket_id, populate_existing=True)
+
+    return None
@@ -0,0 +1,85 @@
+"""Cursor pagination and NDJSON streaming over the whole tickets table.
+
+``/api/tickets`` and ``/debug/tickets`` used to load every ticket ever created
+into one JSON array. They now return pages ordered by ticket id, resumed with
+``?after_id=<last id seen>&limit=<n>``, with a hard cap on the page size.
+
+For full exports, ``?format=ndjson`` streams one JSON object per line from a
+server-side ``yield_per`` cursor, so memory use stays flat however many
+tickets exist.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Callable, Iterator, Optional
+
+import sqlalchemy as sa
+from flask import Response, request, stream_with_context
+
+from app import db
+from app.models import Ticket
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+STREAM_BATCH_SIZE = 500
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+class PageParamsError(ValueError):
+    """Raised when pagination query parameters are malformed."""
+
+
+def page_params() -> tuple[int, int]:
+    """Read ``after_id`` and ``limit`` from the request, clamping the limit."""
+    try:
+        after_id = int(request.args.get("after_id", 0))
+        limit = int(request.args.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError as exc:
+        raise PageParamsError("after_id and limit must be integers") from exc
+
+    if after_id < 0 or limit < 1:
+        raise PageParamsError("after_id must be >= 0 and limit must be >= 1")
+    return after_id, min(limit, MAX_PAGE_SIZE)
+
+
+def wants_ndjson() -> bool:
+    """Return True when the client asked for the streaming NDJSON format."""
+    return request.args.get("format") == "ndjson"
+
+
+def _tickets_after(after_id: int) -> sa.Select:
+    return sa.select(Ticket).where(Ticket.id > after_id).order_by(Ticket.id)
+
+
+def ticket_page(after_id: int, limit: int) -> tuple[list[Ticket], Optional[int]]:
+    """Return up to ``limit`` tickets after ``after_id`` and the next cursor."""
+    tickets = list(db.session.scalars(_tickets_after(after_id).limit(limit + 1)))
+    if len(tickets) <= limit:
+        return tickets, None
+    tickets = tickets[:limit]
+    return tickets, tickets[-1].id
+
+
+def stream_tickets_ndjson(
+    serialize: Callable[[Ticket], dict],
+    after_id: int = 0,
+) -> Response:
+    """Stream every ticket after ``after_id`` as newline-delimited JSON."""
+
+    def generate() -> Iterator[str]:
+        rows = db.session.scalars(
+            _tickets_after(after_id).execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        for ticket in rows:
+            yield json.dumps(serialize(ticket)) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+
+def next_page_link(next_after_id: Optional[int], limit: int) -> Optional[str]:
+    """Return an RFC 8288 Link header value for the next page, if any."""
+    if next_after_id is None:
+        return None
+    url = f"{request.base_url}?after_id={next_after_id}&limit={limit}"
+    return f'<{url}>; rel="next"'
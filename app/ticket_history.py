@@ -0,0 +1,108 @@
+"""Keyset pagination over closed and resolved tickets.
+
+The queue dashboard's history grows with every ticket closed since the last
+clear, so it is served one page at a time, newest first, ordered by
+``(closed_at, id)``. Pages are addressed by an opaque cursor naming the last
+row already shown instead of an OFFSET, so each page costs the same no matter
+how deep the user has scrolled.
+
+Rows without a ``closed_at`` (legacy resolved tickets) sort after every dated
+row, ordered by id.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Optional
+
+import sqlalchemy as sa
+from sqlalchemy.orm import selectinload
+
+from app import db
+from app.models import Ticket
+from app.time_utils import ensure_aware_utc
+
+CLOSED_STATUSES = ("closed", "resolved")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+_NO_CLOSED_AT = "none"
+
+
+def encode_cursor(ticket: Ticket) -> str:
+    """Return the cursor that resumes pagination after this ticket."""
+    closed_at = ensure_aware_utc(ticket.closed_at)
+    stamp = closed_at.isoformat() if closed_at else _NO_CLOSED_AT
+    return f"{stamp}|{ticket.id}"
+
+
+def decode_cursor(cursor: str) -> tuple[Optional[datetime], int]:
+    """Parse a cursor from encode_cursor, raising ValueError when malformed."""
+    stamp, sep, raw_id = cursor.rpartition("|")
+    if not sep:
+        raise ValueError("Malformed history cursor")
+
+    ticket_id = int(raw_id)
+    if stamp == _NO_CLOSED_AT:
+        return None, ticket_id
+
+    closed_at = datetime.fromisoformat(stamp)
+    if closed_at.tzinfo is None:
+        raise ValueError("History cursor timestamp must include a UTC offset")
+    # Compare against the naive UTC values stored in the tickets table.
+    return closed_at.astimezone(timezone.utc).replace(tzinfo=None), ticket_id
+
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    """Return a page size between 1 and MAX_PAGE_SIZE."""
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def closed_tickets_page(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> tuple[list[Ticket], Optional[str]]:
+    """
+    Return one page of closed/resolved tickets and the cursor for the next.
+
+    Assistants are eager-loaded so rendering the page does not lazy-load one
+    user per row. The next cursor is None once the history is exhausted.
+    """
+    page_size = clamp_page_size(limit)
+    query = (
+        sa.select(Ticket)
+        .options(selectinload(Ticket.wormhole_assistant))
+        .where(Ticket.status.in_(CLOSED_STATUSES))
+    )
+    # Dated rows and the NULL tail are read separately so each branch is a
+    # plain range over ix_tickets_closed_at_id instead of an OR the planner
+    # cannot walk in index order.
+    dated: Optional[sa.Select] = query.where(Ticket.closed_at.is_not(None))
+    undated = query.where(Ticket.closed_at.is_(None))
+
+    if cursor:
+        after_closed_at, after_id = decode_cursor(cursor)
+        if after_closed_at is None:
+            dated = None
+            undated = undated.where(Ticket.id < after_id)
+        else:
+            dated = query.where(
+                sa.tuple_(Ticket.closed_at, Ticket.id) < (after_closed_at, after_id)
+            )
+
+    tickets: list[Ticket] = []
+    if dated is not None:
+        dated = dated.order_by(
+            Ticket.closed_at.desc().nulls_last(), Ticket.id.desc()
+        ).limit(page_size + 1)
+        tickets = list(db.session.scalars(dated))
+    if len(tickets) <= page_size:
+        undated = undated.order_by(Ticket.id.desc()).limit(page_size + 1 - len(tickets))
+        tickets += db.session.scalars(undated)
+
+    if len(tickets) <= page_size:
+        return tickets, None
+    tickets = tickets[:page_size]
+    return tickets, encode_cursor(tickets[-1])
@@ -0,0 +1,216 @@
+"""Resolving or requeueing many tickets in one request.
+
+At the end of a shift admins close the remaining no-shows, which through
+``/api/resolveticket`` means one POST and up to two commits per ticket.
+``bulk_resolve`` applies a whole list instead:
+
+* Every entry is validated first; bad entries are reported and skipped, and
+  the rest are applied together.
+* The tickets are locked and changed by a single set-based UPDATE whose
+  values are ``CASE`` expressions on the ticket id, so each ticket gets its
+  own outcome. Dialects with ``UPDATE ... RETURNING`` hand the changed rows
+  back from the same statement; others re-read them.
+* The daily rollup, the skip records for requeued tickets and the tickets
+  themselves are committed in one transaction. Archive partitions of the
+  months the tickets were or are now archived under are dropped afterwards.
+
+Broadcasting is left to the caller, which wraps the per-ticket events in
+``CoalescingBroadcaster.hold()`` so clients receive one batch.
+
+Typical usage example:
+    results, tickets = bulk_resolve(
+        [{"id": 7, "resolve": "no_show"}, {"id": 9, "resolve": "helped"}],
+        user_id=current_user.id,
+    )
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+import sqlalchemy as sa
+from flask import current_app
+from sqlalchemy.orm import selectinload
+
+from app import db
+from app.archive_store import archived_month, invalidate_partitions
+from app.db_utils import supports_update_returning
+from app.models import Skipped, Ticket
+from app.ticket_rollup import add_to_rollup, rollup_delta
+
+RESOLVE_REASONS = ("duplicate", "helped", "no_show")
+RETURN_TO_QUEUE = "return_to_queue"
+MAX_BULK_TICKETS = 200
+
+OUTCOME_RESOLVED = "resolved"
+OUTCOME_REQUEUED = "requeued"
+OUTCOME_NOT_FOUND = "not_found"
+OUTCOME_INVALID = "invalid"
+
+
+@dataclass(frozen=True)
+class Resolution:
+    """One validated entry of a bulk request."""
+
+    ticket_id: int
+    resolve: str
+    number_of_students: int
+
+    @property
+    def requeue(self) -> bool:
+        return self.resolve == RETURN_TO_QUEUE
+
+
+def _parse(item: Any) -> Resolution:
+    """Validate one request entry, raising ValueError with the reason."""
+    if not isinstance(item, dict):
+        raise ValueError("Each entry must be an object")
+    ticket_id = item.get("id")
+    if not isinstance(ticket_id, int) or isinstance(ticket_id, bool):
+        raise ValueError("id must be an integer")
+    resolve = item.get("resolve")
+    if resolve not in (*RESOLVE_REASONS, RETURN_TO_QUEUE):
+        raise ValueError("Invalid resolution option")
+
+    students = 0
+    if resolve == "helped":
+        students = item.get("numstudents", 1)
+        if not isinstance(students, int) or isinstance(students, bool) or students < 0:
+            raise ValueError("numstudents must be a non-negative integer")
+    return Resolution(ticket_id, resolve, students)
+
+
+def _by_id(resolutions: list[Resolution], value_of, default):
+    """Return a CASE on the ticket id giving each resolution its own value."""
+    whens = {r.ticket_id: value_of(r) for r in resolutions}
+    if not whens:
+        return default
+    return sa.case(whens, value=Ticket.id, else_=default)
+
+
+def _apply(resolutions: list[Resolution]) -> list[Ticket]:
+    """Change the given (already locked) tickets with one UPDATE."""
+    now = datetime.now(timezone.utc)
+    resolved = [r for r in resolutions if not r.requeue]
+    requeued = [r for r in resolutions if r.requeue]
+    closed_at = sa.literal(now, Ticket.closed_at.type)
+
+    values = {
+        Ticket.status: _by_id(
+            resolutions,
+            lambda r: "live" if r.requeue else "resolved",
+            Ticket.status,
+        ),
+        Ticket.closed_reason: _by_id(
+            resolved, lambda r: r.resolve, Ticket.closed_reason
+        ),
+        Ticket.closed_at: _by_id(resolved, lambda r: closed_at, Ticket.closed_at),
+        Ticket.number_of_students: _by_id(
+            resolved,
+            lambda r: r.number_of_students,
+            Ticket.number_of_students,
+        ),
+        Ticket.wa_id: _by_id(requeued, lambda r: sa.null(), Ticket.wa_id),
+    }
+    ids = [r.ticket_id for r in resolutions]
+    stmt = sa.update(Ticket).where(Ticket.id.in_(ids)).values(values)
+
+    if supports_update_returning():
+        return list(
+            db.session.scalars(
+                stmt.returning(Ticket).execution_options(
+                    synchronize_session=False, populate_existing=True
+                )
+            )
+        )
+    db.session.execute(stmt.execution_options(synchronize_session=False))
+    return list(
+        db.session.scalars(
+            sa.select(Ticket)
+            .where(Ticket.id.in_(ids))
+            .execution_options(populate_existing=True)
+        )
+    )
+
+
+def bulk_resolve(items: list, user_id: int) -> tuple[list[dict], list[Ticket]]:
+    """
+    Resolve or requeue the listed tickets in one transaction.
+
+    Parameters
+    ----------
+    items : list
+        Entries like ``{"id": 7, "resolve": "helped", "numstudents": 2}``,
+        where ``resolve`` is one of the single-ticket form's options.
+    user_id : int
+        The user making the change; requeued tickets are skipped for them.
+
+    Returns
+    -------
+    tuple[list[dict], list[Ticket]]
+        One ``{"id", "resolve", "outcome"}`` result per entry, in request
+        order (``error`` is added for invalid entries), and the changed
+        tickets, for broadcasting once the caller has committed.
+    """
+    results: list[dict] = []
+    resolutions: dict[int, Resolution] = {}
+    for item in items:
+        result = {
+            "id": item.get("id") if isinstance(item, dict) else None,
+            "resolve": item.get("resolve") if isinstance(item, dict) else None,
+        }
+        results.append(result)
+        try:
+            resolution = _parse(item)
+            if resolution.ticket_id in resolutions:
+                raise ValueError("Ticket listed more than once")
+        except ValueError as e:
+            result.update(outcome=OUTCOME_INVALID, error=str(e))
+            continue
+        resolutions[resolution.ticket_id] = resolution
+
+    locked = {
+        ticket.id: ticket
+        for ticket in db.session.scalars(
+            sa.select(Ticket).where(Ticket.id.in_(list(resolutions))).with_for_update()
+        )
+    }
+    found = [r for r in resolutions.values() if r.ticket_id in locked]
+    before = [rollup_delta(ticket) for ticket in locked.values()]
+    archived = [archived_month(ticket) for ticket in locked.values()]
+
+    tickets = _apply(found) if found else []
+    add_to_rollup(
+        [delta.negated() for delta in before if delta]
+        + [rollup_delta(ticket) for ticket in tickets]
+    )
+    archived += [archived_month(ticket) for ticket in tickets]
+    db.session.add_all(
+        Skipped(wa_id=user_id, tkt_id=r.ticket_id) for r in found if r.requeue
+    )
+    db.session.commit()
+    invalidate_partitions(current_app.root_path, archived)
+
+    for result in results:
+        if "outcome" in result:
+            continue
+        resolution = resolutions[result["id"]]
+        if resolution.ticket_id not in locked:
+            result["outcome"] = OUTCOME_NOT_FOUND
+        elif resolution.requeue:
+            result["outcome"] = OUTCOME_REQUEUED
+        else:
+            result["outcome"] = OUTCOME_RESOLVED
+    if not found:
+        return results, []
+    # The commit expired every ticket; reload them with their assistants in
+    # two queries rather than one refresh and one lazy load per broadcast.
+    reloaded = db.session.scalars(
+        sa.select(Ticket)
+        .where(Ticket.id.in_([r.ticket_id for r in found]))
+        .options(selectinload(Ticket.wormhole_assistant))
+        .order_by(Ticket.id)
+    )
+    return results, list(reloaded)
@@ -0,0 +1,234 @@
+"""Incrementally maintained ticket statistics.
+
+``ticket_daily_rollup`` holds one row per Pacific day, hour, course, location
+and closed reason, keyed by when the ticket was created, with the number of
+tickets, students helped, tickets claimed by an assistant, and summed wait and
+handle time. Every path that closes tickets records the change in the same
+transaction:
+
+* ``rollup_delta`` describes what one closed ticket contributes;
+* ``update_rollup(before, after)`` subtracts a ticket's old contribution and
+  adds its new one, so re-resolving a closed ticket is not counted twice;
+* ``add_to_rollup`` applies many deltas at once, for bulk closes.
+
+Wait time runs from creation to the (last) claim, or to the close for
+tickets no one claimed; handle time runs from the claim to the close.
+``flask rebuild-ticket-rollup`` recomputes the table from ``tickets``.
+
+Typical usage example:
+    before = rollup_delta(ticket)
+    ticket.closed_at = datetime.now(timezone.utc)
+    update_rollup(before, rollup_delta(ticket))
+    db.session.commit()
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable, Optional, cast
+
+import click
+import sqlalchemy as sa
+from flask import Flask
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.archive_utils import ticket_type
+from app.models import Ticket, TicketDailyRollup
+from app.time_utils import ensure_aware_utc, to_pacific
+
+CLOSED_STATUSES = ("closed", "resolved")
+COUNTER_COLUMNS = ("tickets", "students", "claimed", "wait_seconds", "handle_seconds")
+GROUP_COLUMNS = ("day", "hour", "course", "location", "closed_reason")
+
+
+@dataclass(frozen=True)
+class RollupDelta:
+    """One rollup row key and the amounts to add to its counters."""
+
+    key: tuple[date, int, str, str, str]
+    tickets: int = 1
+    students: int = 0
+    claimed: int = 0
+    wait_seconds: int = 0
+    handle_seconds: int = 0
+
+    def counters(self) -> dict[str, int]:
+        return {name: getattr(self, name) for name in COUNTER_COLUMNS}
+
+    def negated(self) -> "RollupDelta":
+        return RollupDelta(self.key, **{k: -v for k, v in self.counters().items()})
+
+
+def _students(value) -> int:
+    # Form handlers may store the raw submitted string.
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _seconds(start, end) -> int:
+    return max(0, int((end - start).total_seconds()))
+
+
+def rollup_delta(ticket: Ticket) -> Optional[RollupDelta]:
+    """Return the ticket's contribution to the rollup, or None if it is open."""
+    closed_at = ensure_aware_utc(ticket.closed_at)
+    created_at = ensure_aware_utc(ticket.created_at)
+    if ticket.status not in CLOSED_STATUSES or closed_at is None or created_at is None:
+        return None
+
+    claimed_at = ensure_aware_utc(ticket.claimed_at)
+    created_local = to_pacific(created_at)
+    key = (
+        created_local.date(),
+        created_local.hour,
+        ticket.physics_course or "",
+        ticket_type(ticket.table),
+        ticket.closed_reason or "",
+    )
+    return RollupDelta(
+        key,
+        students=_students(ticket.number_of_students),
+        claimed=1 if claimed_at else 0,
+        wait_seconds=_seconds(created_at, claimed_at or closed_at),
+        handle_seconds=_seconds(claimed_at, closed_at) if claimed_at else 0,
+    )
+
+
+def _merge(deltas: Iterable[Optional[RollupDelta]]) -> dict[tuple, dict[str, int]]:
+    merged: dict[tuple, dict[str, int]] = {}
+    for delta in deltas:
+        if delta is None:
+            continue
+        totals = merged.setdefault(delta.key, dict.fromkeys(COUNTER_COLUMNS, 0))
+        for name, value in delta.counters().items():
+            totals[name] += value
+    return merged
+
+
+def _row_filter(key: tuple) -> list:
+    return [getattr(TicketDailyRollup, c) == v for c, v in zip(GROUP_COLUMNS, key)]
+
+
+def add_to_rollup(deltas: Iterable[Optional[RollupDelta]]) -> None:
+    """
+    Add deltas to the rollup in the caller's transaction; the caller commits.
+
+    Each affected row gets one increment UPDATE, so concurrent closes in
+    other workers add up correctly. A row seen for the first time is
+    inserted; if another worker inserts it first, the increment is retried.
+    """
+    for key, counters in _merge(deltas).items():
+        if not any(counters.values()):
+            continue
+        increment = (
+            sa.update(TicketDailyRollup)
+            .where(*_row_filter(key))
+            .values(
+                {
+                    getattr(TicketDailyRollup, name): getattr(TicketDailyRollup, name)
+                    + value
+                    for name, value in counters.items()
+                }
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if cast(sa.CursorResult, db.session.execute(increment)).rowcount:
+            continue
+        try:
+            with db.session.begin_nested():
+                db.session.add(
+                    TicketDailyRollup(**dict(zip(GROUP_COLUMNS, key)), **counters)
+                )
+        except IntegrityError:
+            db.session.execute(increment)
+
+
+def update_rollup(before: Optional[RollupDelta], after: Optional[RollupDelta]):
+    """Replace one ticket's old rollup contribution with its new one."""
+    add_to_rollup([before.negated() if before else None, after])
+
+
+def rebuild_rollup() -> int:
+    """Recompute the whole rollup from ``tickets`` and return the row count."""
+    tickets = db.session.scalars(
+        sa.select(Ticket)
+        .where(Ticket.status.in_(CLOSED_STATUSES))
+        .execution_options(yield_per=1000)
+    )
+    merged = _merge(rollup_delta(ticket) for ticket in tickets)
+
+    db.session.execute(sa.delete(TicketDailyRollup))
+    if merged:
+        db.session.execute(
+            sa.insert(TicketDailyRollup),
+            [
+                {**dict(zip(GROUP_COLUMNS, key)), **counters}
+                for key, counters in merged.items()
+            ],
+        )
+    db.session.commit()
+    return len(merged)
+
+
+def ticket_stats(
+    start: date, end: date, group_by: Iterable[str] = ("day",)
+) -> list[dict]:
+    """
+    Return summed rollup counters for [start, end], grouped by rollup columns.
+
+    Reads only ``ticket_daily_rollup``. Each row also carries the no-show
+    count and the averages derived from the sums.
+    """
+    groups = [getattr(TicketDailyRollup, name) for name in group_by]
+    no_shows = sa.func.sum(
+        sa.case(
+            (TicketDailyRollup.closed_reason == "no_show", TicketDailyRollup.tickets),
+            else_=0,
+        )
+    )
+    query = (
+        sa.select(
+            *groups,
+            *(
+                sa.func.sum(getattr(TicketDailyRollup, name)).label(name)
+                for name in COUNTER_COLUMNS
+            ),
+            no_shows.label("no_shows"),
+        )
+        .where(TicketDailyRollup.day.between(start, end))
+        .group_by(*groups)
+        .order_by(*groups)
+    )
+
+    stats = []
+    for row in db.session.execute(query):
+        item = dict(row._mapping)
+        if "day" in item:
+            item["day"] = item["day"].isoformat()
+        tickets = item["tickets"] or 0
+        item["no_show_rate"] = item["no_shows"] / tickets if tickets else 0.0
+        item["avg_wait_seconds"] = item["wait_seconds"] / tickets if tickets else 0.0
+        claimed = item["claimed"] or 0
+        item["avg_handle_seconds"] = (
+            item["handle_seconds"] / claimed if claimed else 0.0
+        )
+        stats.append(item)
+    return stats
+
+
+def register_ticket_rollup_cli(app: Flask) -> None:
+    """Register the rollup rebuild command on the Flask app."""
+
+    @app.cli.command("rebuild-ticket-rollup")
+    def rebuild_ticket_rollup_command() -> None:
+        """Recompute ticket_daily_rollup from the full ticket history.
+
+        Tickets closed while the rebuild runs may be missed; run it when the
+        Wormhole is closed.
+        """
+        rows = rebuild_rollup()
+        click.echo(f"Ticket rollup rebuilt: {rows} row(s)")
@@ -1,12 +1,22 @@
 from __future__ import annotations
 
 from datetime import date, datetime, time, timezone
-from typing import Optional, Tuple
+from typing import Optional, Tuple, overload
 from zoneinfo import ZoneInfo
 
 PACIFIC_TZ = ZoneInfo("America/Los_Angeles")
 
 
+@overload
+def ensure_aware_utc(dt: datetime) -> datetime:
+    ...
+
+
+@overload
+def ensure_aware_utc(dt: None) -> None:
+    ...
+
+
 def ensure_aware_utc(dt: Optional[datetime]) -> Optional[datetime]:
     """Treat naive datetimes from the DB as UTC and return an aware datetime."""
     if dt is None:
@@ -16,6 +26,16 @@ def ensure_aware_utc(dt: Optional[datetime]) -> Optional[datetime]:
     return dt.astimezone(timezone.utc)
 
 
+@overload
+def to_pacific(dt: datetime) -> datetime:
+    ...
+
+
+@overload
+def to_pacific(dt: None) -> None:
+    ...
+
+
 def to_pacific(dt: Optional[datetime]) -> Optional[datetime]:
     """Convert a datetime to America/Los_Angeles for display."""
     aware_utc = ensure_aware_utc(dt)
@@ -0,0 +1,79 @@
+"""Shared version counters for in-process caches.
+
+Each gunicorn worker keeps its own in-memory copies of hot data (the live
+queue snapshot, for example). When another worker or a CLI job changes that
+data, the local copy must notice. Writers therefore bump a named counter in the
+``version_stamps`` table after committing, and readers compare the counter with
+the version their copy was built from. Reading a stamp is a single primary-key
+lookup, far cheaper than reloading the data it guards.
+
+Typical usage example:
+    from app.version_stamps import QUEUE_STAMP, bump_version
+    version = bump_version(QUEUE_STAMP)
+"""
+
+from __future__ import annotations
+
+from typing import Optional, cast
+
+import sqlalchemy as sa
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.db_utils import supports_update_returning
+from app.models import VersionStamp
+
+QUEUE_STAMP = "queue"
+SITE_CONTENT_STAMP = "site_content"
+
+
+def read_version(name: str) -> int:
+    """Return the current value of a stamp, or 0 if it was never bumped."""
+    version = db.session.scalar(
+        sa.select(VersionStamp.version).where(VersionStamp.name == name)
+    )
+    return version or 0
+
+
+def bump_version(name: str, by: int = 1) -> int:
+    """
+    Atomically increment a stamp, commit, and return its new value.
+
+    The increment is one UPDATE, so concurrent writers in different
+    processes always receive distinct, increasing versions. With ``by`` above
+    one the caller owns every version from ``result - by + 1`` to ``result``.
+    Call it after the change it announces has been committed.
+    """
+    for _ in range(2):
+        version = _increment(name, by)
+        if version is not None:
+            db.session.commit()
+            return version
+
+        # First bump of this stamp: create the row. Another process may win
+        # the race to insert it, in which case the increment is retried.
+        try:
+            db.session.add(VersionStamp(name=name, version=by))
+            db.session.commit()
+            return by
+        except IntegrityError:
+            db.session.rollback()
+
+    raise RuntimeError(f"Could not bump version stamp {name!r}")
+
+
+def _increment(name: str, by: int) -> Optional[int]:
+    stmt = (
+        sa.update(VersionStamp)
+        .where(VersionStamp.name == name)
+        .values(version=VersionStamp.version + by)
+        .execution_options(synchronize_session=False)
+    )
+    if supports_update_returning():
+        return db.session.scalar(stmt.returning(VersionStamp.version))
+
+    # Without RETURNING, the UPDATE's row lock keeps the follow-up read
+    # consistent until the caller commits.
+    if cast(sa.CursorResult, db.session.execute(stmt)).rowcount == 0:
+        return None
+    return read_version(name)
@@ -0,0 +1,260 @@
+"""Estimated waits for the live queue.
+
+Students on ``/livequeue`` see their place in line; this module turns a
+place into an expected wait. Each worker keeps a small in-memory model that
+is updated from the queue events it raises, each update costing O(1):
+
+* service time, an exponentially weighted moving average (EWMA) of how long
+  assistants spend on a ticket, from claim to close;
+* arrival rate, an EWMA of the gap between new tickets;
+* active assistants, those who claimed or closed a ticket within the last
+  ``QUEUE_WAIT_ASSISTANT_IDLE_SECONDS``, kept oldest first so expired ones
+  are dropped from the front.
+
+The ticket at position ``p`` waits about ``p * service / assistants``. The
+queue is served first come, first served, so arrivals do not change anyone's
+wait; the rate is reported alongside the estimates.
+
+The model starts from the most recent tickets in the database the first time
+it is used, so a restarted worker does not begin with no history. After that
+it only sees the events its own worker raises; the averages make that a
+reasonable sample when several workers share the load.
+
+Typical usage example:
+    from app.wait_estimator import get_wait_estimator
+    waits = get_wait_estimator().estimates(live_count)
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, Optional, cast
+
+import sqlalchemy as sa
+from flask import Flask, current_app
+
+from app import db
+from app.models import Ticket
+from app.time_utils import ensure_aware_utc
+
+DEFAULT_SERVICE_SECONDS = 300.0
+DEFAULT_SMOOTHING = 0.2
+DEFAULT_ASSISTANT_IDLE_SECONDS = 900.0
+SEED_TICKETS = 50
+
+
+def _ewma(current: Optional[float], sample: float, smoothing: float) -> float:
+    if current is None:
+        return sample
+    return current + smoothing * (sample - current)
+
+
+class WaitTimeEstimator:
+    """Thread-safe rolling service-time and arrival-rate statistics."""
+
+    def __init__(
+        self,
+        default_service_seconds: float = DEFAULT_SERVICE_SECONDS,
+        smoothing: float = DEFAULT_SMOOTHING,
+        assistant_idle_seconds: float = DEFAULT_ASSISTANT_IDLE_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.default_service_seconds = default_service_seconds
+        self.smoothing = smoothing
+        self.assistant_idle_seconds = assistant_idle_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._seeded = False
+        self._service_seconds: Optional[float] = None
+        self._interarrival_seconds: Optional[float] = None
+        self._last_arrival: Optional[datetime] = None
+        # Assistant id -> monotonic time last seen, least recent first.
+        self._assistants: OrderedDict[int, float] = OrderedDict()
+        self.samples = 0
+        # Bumped on every change that can move an estimate, for ETags.
+        self.revision = 0
+
+    # -------------------------------
+    # Updates
+    # -------------------------------
+    def record_arrival(self, created_at: Optional[datetime]) -> None:
+        """Count a new ticket toward the arrival rate."""
+        created_at = ensure_aware_utc(created_at)
+        with self._lock:
+            if self._ensure_seeded() or created_at is None:
+                return
+            self._arrive(created_at)
+
+    def record_claim(self, assistant_id: Optional[int]) -> None:
+        """Mark an assistant active when they take a ticket."""
+        with self._lock:
+            if self._ensure_seeded() or assistant_id is None:
+                return
+            self._seen(assistant_id, self._clock())
+
+    def record_close(
+        self,
+        assistant_id: Optional[int],
+        claimed_at: Optional[datetime],
+        closed_at: Optional[datetime],
+    ) -> None:
+        """Fold a closed ticket's handle time into the service-time average."""
+        claimed_at = ensure_aware_utc(claimed_at)
+        closed_at = ensure_aware_utc(closed_at)
+        with self._lock:
+            if self._ensure_seeded():
+                return
+            if assistant_id is not None:
+                self._seen(assistant_id, self._clock())
+            if claimed_at is not None and closed_at is not None:
+                self._serve((closed_at - claimed_at).total_seconds())
+
+    # -------------------------------
+    # Reads
+    # -------------------------------
+    def estimates(self, waiting: int) -> list[int]:
+        """Return the estimated wait in seconds for positions 1..waiting."""
+        with self._lock:
+            self._ensure_seeded()
+            per_position = self._service() / max(1, self._active_assistants())
+            return [
+                round(position * per_position) for position in range(1, waiting + 1)
+            ]
+
+    def current_revision(self) -> int:
+        """Return the revision, first expiring assistants who went idle."""
+        with self._lock:
+            self._ensure_seeded()
+            self._active_assistants()
+            return self.revision
+
+    def stats(self) -> dict:
+        """Return the current averages and the number of active assistants."""
+        with self._lock:
+            self._ensure_seeded()
+            interarrival = self._interarrival_seconds
+            return {
+                "service_seconds": round(self._service(), 1),
+                "arrivals_per_hour": (
+                    round(3600 / interarrival, 2) if interarrival else 0.0
+                ),
+                "active_assistants": self._active_assistants(),
+                "samples": self.samples,
+            }
+
+    # -------------------------------
+    # Internals (call with the lock held)
+    # -------------------------------
+    def _service(self) -> float:
+        if self._service_seconds is None:
+            return self.default_service_seconds
+        return self._service_seconds
+
+    def _serve(self, seconds: float) -> None:
+        if seconds < 0:
+            return
+        self._service_seconds = _ewma(self._service_seconds, seconds, self.smoothing)
+        self.samples += 1
+        self.revision += 1
+
+    def _arrive(self, created_at: datetime) -> None:
+        if self._last_arrival is not None and created_at > self._last_arrival:
+            gap = (created_at - self._last_arrival).total_seconds()
+            self._interarrival_seconds = _ewma(
+                self._interarrival_seconds, gap, self.smoothing
+            )
+        if self._last_arrival is None or created_at > self._last_arrival:
+            self._last_arrival = created_at
+
+    def _seen(self, assistant_id: int, at: float) -> None:
+        is_new = assistant_id not in self._assistants
+        self._assistants[assistant_id] = max(at, self._assistants.get(assistant_id, at))
+        self._assistants.move_to_end(assistant_id)
+        if is_new:
+            self.revision += 1
+
+    def _active_assistants(self) -> int:
+        # Amortized O(1): each assistant is dropped at most once per visit.
+        cutoff = self._clock() - self.assistant_idle_seconds
+        while self._assistants:
+            assistant_id, seen_at = next(iter(self._assistants.items()))
+            if seen_at >= cutoff:
+                break
+            del self._assistants[assistant_id]
+            self.revision += 1
+        return len(self._assistants)
+
+    def _ensure_seeded(self) -> bool:
+        """
+        Load recent history the first time the estimator is used.
+
+        Returns True when this call did the loading. The database then
+        already reflects the event being recorded, so it must not be
+        applied a second time.
+        """
+        if self._seeded:
+            return False
+        now_utc = datetime.now(timezone.utc)
+        now = self._clock()
+
+        # Only tickets an assistant resolved; a queue flush also closes
+        # claimed tickets, hours after the claim, and would skew the average.
+        closed = db.session.execute(
+            sa.select(Ticket.wa_id, Ticket.claimed_at, Ticket.closed_at)
+            .where(
+                Ticket.status == "resolved",
+                Ticket.closed_at.is_not(None),
+                Ticket.claimed_at.is_not(None),
+            )
+            .order_by(Ticket.closed_at.desc())
+            .limit(SEED_TICKETS)
+        ).all()
+        claiming = db.session.scalars(
+            sa.select(Ticket.wa_id).where(
+                Ticket.status == "in_progress", Ticket.wa_id.is_not(None)
+            )
+        ).all()
+        arrivals = db.session.scalars(
+            sa.select(Ticket.created_at)
+            .order_by(Ticket.created_at.desc())
+            .limit(SEED_TICKETS)
+        ).all()
+
+        # Apply the history only once every query has succeeded, so a failed
+        # load leaves the model untouched and the next call retries it.
+        for wa_id, claimed_at, closed_at in reversed(closed):
+            claimed_at = ensure_aware_utc(claimed_at)
+            closed_at = ensure_aware_utc(closed_at)
+            self._serve((closed_at - claimed_at).total_seconds())
+            if wa_id is not None:
+                self._seen(wa_id, now - (now_utc - closed_at).total_seconds())
+        for wa_id in claiming:
+            self._seen(wa_id, now)
+        for created_at in reversed(arrivals):
+            if created_at is not None:
+                self._arrive(ensure_aware_utc(created_at))
+        self._seeded = True
+        return True
+
+
+def init_wait_estimator(app: Flask) -> WaitTimeEstimator:
+    """Attach a fresh estimator configured from the app's QUEUE_WAIT_* settings."""
+    estimator = WaitTimeEstimator(
+        default_service_seconds=app.config.get(
+            "QUEUE_WAIT_DEFAULT_SERVICE_SECONDS", DEFAULT_SERVICE_SECONDS
+        ),
+        smoothing=app.config.get("QUEUE_WAIT_SMOOTHING", DEFAULT_SMOOTHING),
+        assistant_idle_seconds=app.config.get(
+            "QUEUE_WAIT_ASSISTANT_IDLE_SECONDS", DEFAULT_ASSISTANT_IDLE_SECONDS
+        ),
+    )
+    app.extensions["wait_estimator"] = estimator
+    return estimator
+
+
+def get_wait_estimator() -> WaitTimeEstimator:
+    """Return the estimator for the current app."""
+    return cast(WaitTimeEstimator, current_app.extensions["wait_estimator"])
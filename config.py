@@ -53,6 +53,54 @@ class Config:
         "RESET_PASSWORD_TOKEN_SALT", "password-reset-salt"
     )
 
+    # Maximum age of the in-memory live-queue snapshot before it is reloaded,
+    # bounding staleness from writers in other processes (e.g. CLI jobs).
+    QUEUE_SNAPSHOT_TTL_SECONDS = float(
+        os.environ.get("QUEUE_SNAPSHOT_TTL_SECONDS", "30")
+    )
+
+    # Ticket events raised within this many milliseconds of each other are
+    # sent to clients as one batch per room; 0 sends every event immediately.
+    QUEUE_BROADCAST_WINDOW_MS = int(os.environ.get("QUEUE_BROADCAST_WINDOW_MS", "150"))
+
+    # Live queue wait estimates: the service time assumed before any ticket
+    # has been handled, how strongly each new sample moves the rolling
+    # averages, and how long after their last claim or close an assistant
+    # still counts as on shift.
+    QUEUE_WAIT_DEFAULT_SERVICE_SECONDS = float(
+        os.environ.get("QUEUE_WAIT_DEFAULT_SERVICE_SECONDS", "300")
+    )
+    QUEUE_WAIT_SMOOTHING = float(os.environ.get("QUEUE_WAIT_SMOOTHING", "0.2"))
+    QUEUE_WAIT_ASSISTANT_IDLE_SECONDS = float(
+        os.environ.get("QUEUE_WAIT_ASSISTANT_IDLE_SECONDS", "900")
+    )
+
+    # How often each worker checks whether homepage content was edited on
+    # another worker; the homepage makes no queries in between.
+    SITE_CONTENT_CHECK_SECONDS = float(
+        os.environ.get("SITE_CONTENT_CHECK_SECONDS", "5")
+    )
+
+    # Rendered public pages kept per worker for anonymous visitors, and how
+    # long browsers and nginx may reuse one before revalidating its ETag.
+    PAGE_CACHE_MAX_ENTRIES = int(os.environ.get("PAGE_CACHE_MAX_ENTRIES", "32"))
+    PAGE_CACHE_MAX_AGE = int(os.environ.get("PAGE_CACHE_MAX_AGE", "30"))
+
+    # Archive exports run outside the web worker ("process"), or inside the
+    # request ("inline", used by tests). At most ARCHIVE_EXPORT_MAX_JOBS run at
+    # once; a running job with no progress for ARCHIVE_JOB_STALE_SECONDS is
+    # considered dead. ARCHIVE_JOB_APP is the --app target for the runner.
+    ARCHIVE_JOB_RUNNER = os.environ.get("ARCHIVE_JOB_RUNNER", "process")
+    ARCHIVE_EXPORT_MAX_JOBS = int(os.environ.get("ARCHIVE_EXPORT_MAX_JOBS", "1"))
+    ARCHIVE_JOB_STALE_SECONDS = int(os.environ.get("ARCHIVE_JOB_STALE_SECONDS", "600"))
+    ARCHIVE_JOB_APP = os.environ.get("ARCHIVE_JOB_APP", "application:application")
+
+    # Shared channel that carries Socket.IO emits between gunicorn workers and
+    # CLI jobs (redis://..., or unix:///path/to/dir on a single host). Required
+    # when running more than one worker; see app/socket_bridge.py.
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get("SOCKETIO_MESSAGE_QUEUE") or None
+    SOCKETIO_CHANNEL = os.environ.get("SOCKETIO_CHANNEL", "wormhole")
+
     # In production (Elastic Beanstalk), DATABASE_URL must be set as an
     # environment variable pointing to an RDS instance.
     # The SQLite fallback is kept only for local development.
@@ -0,0 +1,20 @@
+"""Load generation for a local Wormhole instance.
+
+``python -m loadtest`` starts the app on this machine (SQLite by default, or a
+local PostgreSQL database via ``--database-url``) and drives it the way a busy
+lab does:
+
+* students submit tickets through the ``/createticket`` form and
+  ``POST /api/tickets``, at random intervals so submissions arrive in bursts;
+* assistants log in and loop ``/getnewticket`` -> ``/api/resolveticket``;
+* anonymous Socket.IO clients (kiosks and student phones) listen on
+  ``/queue``.
+
+When the run ends it prints p50/p95/p99 latency, throughput and error rate
+for each route, plus broadcast fan-out delay: the time from a student's
+``POST /api/tickets`` until each listening client first hears of the ticket
+(its ``ticket_created`` event, or a later one when a batch folded them).
+
+The harness only needs the app's own dependencies; eventlet green threads
+let one process hold hundreds of clients. See ``python -m loadtest --help``.
+"""
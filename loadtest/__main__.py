@@ -0,0 +1,130 @@
+"""Command line entry point: ``python -m loadtest``."""
+
+import eventlet
+
+# Patch before anything imports socket, so urllib calls yield to other clients.
+eventlet.monkey_patch()
+
+import argparse  # noqa: E402
+import json  # noqa: E402
+import sys  # noqa: E402
+import time  # noqa: E402
+
+from loadtest import scenarios  # noqa: E402
+from loadtest.clients import Recorder  # noqa: E402
+from loadtest.instance import (  # noqa: E402
+    ASSISTANT_PASSWORD,
+    assistant_usernames,
+    local_instance,
+)
+from loadtest.report import format_report, summarize  # noqa: E402
+
+DRAIN_SECONDS = 2.0
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="python -m loadtest",
+        description="Drive a local Wormhole instance and report latency.",
+    )
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--students", type=int, default=50)
+    parser.add_argument("--assistants", type=int, default=5)
+    parser.add_argument("--sockets", type=int, default=200)
+    parser.add_argument(
+        "--student-interval",
+        type=float,
+        default=5.0,
+        help="mean seconds between one student's tickets",
+    )
+    parser.add_argument(
+        "--service-time",
+        type=float,
+        default=1.0,
+        help="mean seconds an assistant holds a ticket",
+    )
+    parser.add_argument(
+        "--form-share",
+        type=float,
+        default=0.5,
+        help="share of tickets created through the /createticket form",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="app processes")
+    parser.add_argument(
+        "--database-url",
+        help="local PostgreSQL scratch database (default: a fresh SQLite file)",
+    )
+    parser.add_argument(
+        "--broadcast-window-ms",
+        type=int,
+        help="override QUEUE_BROADCAST_WINDOW_MS for the instance",
+    )
+    parser.add_argument("--json", help="also write the summary to this file")
+    return parser.parse_args(argv)
+
+
+def run(args) -> dict:
+    """Start an instance, run every simulated user for the duration, summarize."""
+    recorder = Recorder()
+    pacing = scenarios.Pacing(
+        student_interval=args.student_interval,
+        service_time=args.service_time,
+        form_share=args.form_share,
+    )
+    with local_instance(
+        assistants=args.assistants,
+        workers=args.workers,
+        database_url=args.database_url,
+        broadcast_window_ms=args.broadcast_window_ms,
+    ) as urls:
+
+        def url(i):
+            return urls[i % len(urls)]
+
+        # Displays connect first so they see the whole run's tickets.
+        displays = [
+            eventlet.spawn(scenarios.queue_display, url(i), recorder)
+            for i in range(args.sockets)
+        ]
+        eventlet.sleep(min(5.0, 0.01 * args.sockets + 0.5))
+
+        recorder.started = time.monotonic()
+        users = [
+            eventlet.spawn(
+                scenarios.assistant,
+                url(i),
+                recorder,
+                pacing,
+                username,
+                ASSISTANT_PASSWORD,
+            )
+            for i, username in enumerate(assistant_usernames(args.assistants))
+        ]
+        users += [
+            eventlet.spawn(scenarios.student, url(i), recorder, pacing, i)
+            for i in range(args.students)
+        ]
+        eventlet.sleep(args.duration)
+        recorder.finished = time.monotonic()
+        for thread in users:
+            thread.kill()
+        # Let events for the last tickets reach the displays.
+        eventlet.sleep(DRAIN_SECONDS)
+        for thread in displays:
+            thread.kill()
+
+    return summarize(recorder, sockets_started=args.sockets)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    summary = run(args)
+    print(format_report(summary))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,180 @@
+"""HTTP and Socket.IO clients that record what they measure.
+
+Both are built on urllib so that, once eventlet has monkey-patched the
+standard library, each client runs in its own green thread.
+"""
+
+from __future__ import annotations
+
+import http.cookiejar
+import json
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class Recorder:
+    """Latencies, errors and fan-out delays collected during a run."""
+
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    # Ticket id -> when the POST creating it was sent.
+    created: dict[int, float] = field(default_factory=dict)
+    # Ticket id -> when each display first heard of the ticket. Kept apart
+    # from ``created`` because the event can beat the HTTP response.
+    deliveries: dict[int, list[float]] = field(
+        default_factory=lambda: defaultdict(list)
+    )
+    sockets_connected: int = 0
+    started: float = 0.0
+    finished: float = 0.0
+
+    def record(self, label: str, seconds: float, ok: bool) -> None:
+        self.latencies[label].append(seconds)
+        if not ok:
+            self.errors[label] += 1
+
+    def fanout_delays(self) -> list[float]:
+        """Seconds from sending each API ticket to each display receiving it."""
+        return [
+            received - self.created[ticket_id]
+            for ticket_id, times in self.deliveries.items()
+            if ticket_id in self.created
+            for received in times
+        ]
+
+
+@dataclass
+class Response:
+    status: int
+    headers: dict
+    body: bytes
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # Redirects are part of the answer (e.g. which ticket was claimed), and
+    # following them would fold a second request into the latency.
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpClient:
+    """One browser: a cookie jar, with every request timed under a label."""
+
+    def __init__(self, base_url: str, recorder: Recorder, timeout: float = 30):
+        self.base_url = base_url
+        self.recorder = recorder
+        self.timeout = timeout
+        self._opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()),
+            _NoRedirect(),
+        )
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        label: str,
+        *,
+        form: Optional[dict] = None,
+        json_body: Optional[dict] = None,
+        expect: tuple[int, ...] = (200,),
+    ) -> Optional[Response]:
+        """Send a request; returns None on a connection error."""
+        headers = {}
+        data = None
+        if json_body is not None:
+            data = json.dumps(json_body).encode()
+            headers["Content-Type"] = "application/json"
+        elif form is not None:
+            data = urllib.parse.urlencode(form).encode()
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        request = urllib.request.Request(
+            self.base_url + path, data=data, headers=headers, method=method
+        )
+
+        start = time.monotonic()
+        try:
+            with self._opener.open(request, timeout=self.timeout) as raw:
+                response = Response(raw.status, dict(raw.headers), raw.read())
+        except urllib.error.HTTPError as e:
+            response = Response(e.code, dict(e.headers), e.read())
+        except OSError:
+            self.recorder.record(label, time.monotonic() - start, ok=False)
+            return None
+        self.recorder.record(
+            label, time.monotonic() - start, ok=response.status in expect
+        )
+        return response
+
+
+class QueueSocket:
+    """Anonymous Socket.IO client on /queue, over Engine.IO long-polling."""
+
+    def __init__(self, base_url: str, recorder: Recorder, timeout: float = 60):
+        self.url = f"{base_url}/socket.io/?EIO=4&transport=polling"
+        self.recorder = recorder
+        self.timeout = timeout
+        self._packets: list[str] = []
+        self._seen: set[int] = set()
+
+    def connect(self) -> bool:
+        start = time.monotonic()
+        try:
+            opened = self._poll()[0]
+            self.url += "&sid=" + json.loads(opened[1:])["sid"]
+            self._send("40/queue,")
+            ok = self._next_packet().startswith("40/queue,")
+        except (OSError, ValueError, KeyError):
+            ok = False
+        self.recorder.record("socket connect", time.monotonic() - start, ok=ok)
+        if ok:
+            self.recorder.sockets_connected += 1
+        return ok
+
+    def listen(self) -> None:
+        """Record when each ticket is first announced, until killed."""
+        while True:
+            packet = self._next_packet()
+            if packet == "2":  # Engine.IO ping
+                self._send("3")
+            elif packet.startswith("42/queue,"):
+                name, data = json.loads(packet[len("42/queue,") :])
+                self._on_event(name, data, time.monotonic())
+
+    def _on_event(self, name: str, data: dict, received: float) -> None:
+        if name == "ticket_batch":
+            events = data.get("events", [])
+        else:
+            events = [{"type": name, "ticket": data.get("ticket", {})}]
+        # A batch keeps only each ticket's latest event, so a ticket created
+        # and claimed within one window first appears as ticket_claimed.
+        for event in events:
+            ticket_id = event["ticket"].get("id")
+            if ticket_id is not None and ticket_id not in self._seen:
+                self._seen.add(ticket_id)
+                self.recorder.deliveries[ticket_id].append(received)
+
+    def _poll(self) -> list[str]:
+        with urllib.request.urlopen(self.url, timeout=self.timeout) as response:
+            # Engine.IO v4 separates packets in one payload with \x1e.
+            body: bytes = response.read()
+            return body.decode().split("\x1e")
+
+    def _send(self, packet: str) -> None:
+        request = urllib.request.Request(self.url, data=packet.encode(), method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    def _next_packet(self) -> str:
+        while not self._packets:
+            self._packets.extend(self._poll())
+        return self._packets.pop(0)
@@ -0,0 +1,134 @@
+"""Start and stop a throwaway Wormhole instance for a load run."""
+
+from __future__ import annotations
+
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+ASSISTANT_PASSWORD = "loadtest-password"
+
+WORKER_SCRIPT = """
+import sys
+import eventlet
+eventlet.monkey_patch()
+from app import create_app, socketio
+app = create_app()
+socketio.run(app, host="127.0.0.1", port=int(sys.argv[1]), log_output=False)
+"""
+
+# Creates the schema if needed and the assistant accounts the run logs in as.
+SETUP_SCRIPT = """
+import sys
+from app import create_app, db
+from app.models import User
+app = create_app()
+with app.app_context():
+    db.create_all()
+    for i in range(int(sys.argv[1])):
+        username = f"loadtest_wa{i}"
+        if User.query.filter_by(username=username).first() is None:
+            user = User(username=username, email=f"{username}@loadtest.invalid")
+            user.set_password(sys.argv[2])
+            db.session.add(user)
+    db.session.commit()
+"""
+
+
+def assistant_usernames(count: int) -> list[str]:
+    return [f"loadtest_wa{i}" for i in range(count)]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port: int = s.getsockname()[1]
+        return port
+
+
+def _wait_for_health(port: int, process: subprocess.Popen, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"worker on port {port} exited during startup")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health"):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"worker on port {port} did not start")
+
+
+@contextmanager
+def local_instance(
+    *,
+    assistants: int,
+    workers: int = 1,
+    database_url: Optional[str] = None,
+    broadcast_window_ms: Optional[int] = None,
+) -> Iterator[list[str]]:
+    """
+    Run ``workers`` app processes sharing one database and yield their URLs.
+
+    Without ``database_url`` a fresh SQLite file is used. A PostgreSQL URL
+    should name a scratch database: the schema is created if missing and
+    the run leaves its tickets behind. With several workers, Socket.IO
+    emits travel between them over a Unix-socket message queue, as in a
+    multi-worker deployment.
+    """
+    work_dir = tempfile.mkdtemp(prefix="wq-load-", dir="/tmp")
+    env = dict(
+        os.environ,
+        PYTHONPATH=REPO_ROOT,
+        DATABASE_URL=database_url or f"sqlite:///{work_dir}/loadtest.db",
+        SECRET_KEY="loadtest",
+        APP_ENV="development",
+        FORCE_HTTPS="0",
+        ENABLE_HSTS="0",
+        SESSION_COOKIE_SECURE="0",
+        EMAIL_ENABLED="0",
+    )
+    if workers > 1:
+        env["SOCKETIO_MESSAGE_QUEUE"] = f"unix://{work_dir}"
+    if broadcast_window_ms is not None:
+        env["QUEUE_BROADCAST_WINDOW_MS"] = str(broadcast_window_ms)
+
+    subprocess.run(
+        [sys.executable, "-c", SETUP_SCRIPT, str(assistants), ASSISTANT_PASSWORD],
+        cwd=REPO_ROOT,
+        env=env,
+        check=True,
+    )
+    ports = [_free_port() for _ in range(workers)]
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-c", WORKER_SCRIPT, str(port)],
+            cwd=REPO_ROOT,
+            env=env,
+            # The app prints a line per socket connection; keep stderr only.
+            stdout=subprocess.DEVNULL,
+        )
+        for port in ports
+    ]
+    try:
+        for port, process in zip(ports, processes):
+            _wait_for_health(port, process)
+        yield [f"http://127.0.0.1:{port}" for port in ports]
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        shutil.rmtree(work_dir, ignore_errors=True)
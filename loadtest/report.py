@@ -0,0 +1,94 @@
+"""Summaries of a load run: latency percentiles, throughput and errors."""
+
+from __future__ import annotations
+
+import math
+from typing import Optional
+
+from loadtest.clients import Recorder
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values: list[float], pct: float) -> Optional[float]:
+    """Return the nearest-rank percentile of ``values``, or None if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _latency_summary(values: list[float]) -> dict:
+    return {f"p{pct}_ms": _ms(percentile(values, pct)) for pct in PERCENTILES}
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def summarize(recorder: Recorder, sockets_started: int) -> dict:
+    """Reduce a finished run's recorder to the numbers the report prints."""
+    elapsed = max(recorder.finished - recorder.started, 1e-9)
+    routes = {}
+    for label in sorted(recorder.latencies):
+        values = recorder.latencies[label]
+        errors = recorder.errors.get(label, 0)
+        routes[label] = {
+            "requests": len(values),
+            "errors": errors,
+            "error_rate": round(errors / len(values), 4),
+            "throughput_rps": round(len(values) / elapsed, 2),
+            **_latency_summary(values),
+        }
+
+    api_tickets = len(recorder.created)
+    fanout = recorder.fanout_delays()
+    expected = api_tickets * recorder.sockets_connected
+    return {
+        "duration_s": round(elapsed, 1),
+        "routes": routes,
+        "total_requests": sum(r["requests"] for r in routes.values()),
+        "total_errors": sum(r["errors"] for r in routes.values()),
+        "fanout": {
+            "sockets_started": sockets_started,
+            "sockets_connected": recorder.sockets_connected,
+            "api_tickets": api_tickets,
+            "deliveries": len(fanout),
+            "expected_deliveries": expected,
+            **_latency_summary(fanout),
+        },
+    }
+
+
+def _cell(value) -> str:
+    return "-" if value is None else str(value)
+
+
+def format_report(summary: dict) -> str:
+    """Render a summary as a plain-text table."""
+    header = (
+        f"{'route':<32} {'reqs':>7} {'errors':>7} {'err%':>6} {'req/s':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    lines = [f"Load run: {summary['duration_s']} s", "", header, "-" * len(header)]
+    for label, route in summary["routes"].items():
+        lines.append(
+            f"{label:<32} {route['requests']:>7} {route['errors']:>7} "
+            f"{route['error_rate'] * 100:>6.2f} {route['throughput_rps']:>8} "
+            f"{_cell(route['p50_ms']):>8} {_cell(route['p95_ms']):>8} "
+            f"{_cell(route['p99_ms']):>8}"
+        )
+
+    fanout = summary["fanout"]
+    lines += [
+        "",
+        "Broadcast fan-out (POST /api/tickets sent -> first event for the ticket)",
+        f"  sockets connected   {fanout['sockets_connected']} "
+        f"of {fanout['sockets_started']}",
+        f"  deliveries          {fanout['deliveries']} "
+        f"of {fanout['expected_deliveries']} expected",
+        f"  p50 / p95 / p99 ms  {_cell(fanout['p50_ms'])} / "
+        f"{_cell(fanout['p95_ms'])} / {_cell(fanout['p99_ms'])}",
+    ]
+    return "\n".join(lines)
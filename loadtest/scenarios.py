@@ -0,0 +1,115 @@
+"""The simulated students, assistants and queue displays.
+
+Each function is one user's loop and runs in its own green thread until the
+run ends. Think times are drawn from an exponential distribution, so
+arrivals cluster into bursts the way a lab's do at the start of the hour.
+"""
+
+from __future__ import annotations
+
+import random
+import re
+import time
+from dataclasses import dataclass
+
+import eventlet
+
+from loadtest.clients import HttpClient, QueueSocket, Recorder
+
+COURSES = ("Ph 211", "Ph 212", "Ph 213", "Ph 20x")
+LOCATIONS = ("Zoom", "Teams")
+CSRF_FIELD = re.compile(rb'name="csrf_token"[^>]*value="([^"]+)"')
+CURRENT_TICKET = re.compile(r"/currentticket/(\d+)")
+
+
+@dataclass
+class Pacing:
+    """Mean think times, in seconds."""
+
+    student_interval: float = 5.0
+    service_time: float = 1.0
+    idle_poll: float = 0.5
+    form_share: float = 0.5
+
+
+def _think(mean: float) -> None:
+    eventlet.sleep(random.expovariate(1 / mean) if mean > 0 else 0)
+
+
+def student(base_url: str, recorder: Recorder, pacing: Pacing, number: int) -> None:
+    """Submit a ticket, wait, and submit another, through the form or the API."""
+    client = HttpClient(base_url, recorder)
+    while True:
+        _think(pacing.student_interval)
+        name = f"Load Student {number}"
+        if random.random() < pacing.form_share:
+            page = client.request("GET", "/createticket", "GET /createticket")
+            match = CSRF_FIELD.search(page.body) if page else None
+            client.request(
+                "POST",
+                "/createticket",
+                "POST /createticket",
+                form={
+                    "name": name,
+                    "phClass": random.choice(COURSES),
+                    "location": random.choice(LOCATIONS),
+                    "csrf_token": match.group(1).decode() if match else "",
+                },
+                expect=(302,),
+            )
+        else:
+            sent = time.monotonic()
+            response = client.request(
+                "POST",
+                "/api/tickets",
+                "POST /api/tickets",
+                json_body={
+                    "student_name": name,
+                    "class_name": random.choice(COURSES),
+                    "table_number": random.choice(LOCATIONS),
+                },
+                expect=(201,),
+            )
+            if response is not None and response.status == 201:
+                recorder.created[response.json()["id"]] = sent
+
+
+def assistant(
+    base_url: str, recorder: Recorder, pacing: Pacing, username: str, password: str
+) -> None:
+    """Log in, then claim and resolve tickets for the rest of the run."""
+    client = HttpClient(base_url, recorder)
+    client.request(
+        "POST",
+        "/api/login",
+        "POST /api/login",
+        json_body={"username": username, "password": password},
+    )
+    while True:
+        response = client.request(
+            "GET",
+            f"/getnewticket/{username}",
+            "GET /getnewticket/<username>",
+            expect=(302,),
+        )
+        location = response.headers.get("Location", "") if response else ""
+        claimed = CURRENT_TICKET.search(location)
+        if claimed is None:
+            _think(pacing.idle_poll)
+            continue
+
+        _think(pacing.service_time)
+        client.request(
+            "POST",
+            f"/api/resolveticket/{claimed.group(1)}",
+            "POST /api/resolveticket/<id>",
+            form={"resolve": "helped", "numstudents": "1"},
+            expect=(302,),
+        )
+
+
+def queue_display(base_url: str, recorder: Recorder) -> None:
+    """Connect to /queue and record fan-out delay until the run ends."""
+    client = QueueSocket(base_url, recorder)
+    if client.connect():
+        client.listen()
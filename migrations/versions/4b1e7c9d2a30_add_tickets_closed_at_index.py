@@ -0,0 +1,31 @@
+"""add tickets closed_at index for history pagination
+
+Revision ID: 4b1e7c9d2a30
+Revises: af3c2d4e5f61
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "4b1e7c9d2a30"
+down_revision = "af3c2d4e5f61"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("tickets", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_tickets_closed_at_id",
+            ["closed_at", "id"],
+            unique=False,
+            # Match the history's ORDER BY closed_at DESC NULLS LAST, id DESC.
+            postgresql_ops={"closed_at": "DESC NULLS LAST", "id": "DESC"},
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("tickets", schema=None) as batch_op:
+        batch_op.drop_index("ix_tickets_closed_at_id")
@@ -0,0 +1,29 @@
+"""add version stamps for cross-worker cache invalidation
+
+Revision ID: 5c2f8a1e7b94
+Revises: 4b1e7c9d2a30
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5c2f8a1e7b94"
+down_revision = "4b1e7c9d2a30"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "version_stamps",
+        sa.Column("name", sa.String(length=50), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade():
+    op.drop_table("version_stamps")
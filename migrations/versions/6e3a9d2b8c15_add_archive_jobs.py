@@ -0,0 +1,48 @@
+"""add archive jobs for background exports
+
+Revision ID: 6e3a9d2b8c15
+Revises: 5c2f8a1e7b94
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "6e3a9d2b8c15"
+down_revision = "5c2f8a1e7b94"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "archive_jobs",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("filename", sa.String(length=255), nullable=False),
+        sa.Column("start_utc", sa.DateTime(), nullable=False),
+        sa.Column("end_utc", sa.DateTime(), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("rows_written", sa.Integer(), nullable=False),
+        sa.Column("rows_total", sa.Integer(), nullable=True),
+        sa.Column("error", sa.String(length=255), nullable=True),
+        sa.Column("requested_by_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["requested_by_id"], ["users.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    with op.batch_alter_table("archive_jobs", schema=None) as batch_op:
+        batch_op.create_index(
+            batch_op.f("ix_archive_jobs_status"), ["status"], unique=False
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("archive_jobs", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_archive_jobs_status"))
+
+    op.drop_table("archive_jobs")
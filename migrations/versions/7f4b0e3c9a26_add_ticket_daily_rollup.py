@@ -0,0 +1,43 @@
+"""add ticket claimed_at and the daily ticket rollup
+
+Revision ID: 7f4b0e3c9a26
+Revises: 6e3a9d2b8c15
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "7f4b0e3c9a26"
+down_revision = "6e3a9d2b8c15"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("tickets", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("claimed_at", sa.DateTime(), nullable=True))
+
+    op.create_table(
+        "ticket_daily_rollup",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("hour", sa.SmallInteger(), nullable=False),
+        sa.Column("course", sa.String(length=50), nullable=False),
+        sa.Column("location", sa.String(length=10), nullable=False),
+        sa.Column("closed_reason", sa.String(length=20), nullable=False),
+        sa.Column("tickets", sa.Integer(), nullable=False),
+        sa.Column("students", sa.Integer(), nullable=False),
+        sa.Column("claimed", sa.Integer(), nullable=False),
+        sa.Column("wait_seconds", sa.BigInteger(), nullable=False),
+        sa.Column("handle_seconds", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("day", "hour", "course", "location", "closed_reason"),
+    )
+
+
+def downgrade():
+    op.drop_table("ticket_daily_rollup")
+
+    with op.batch_alter_table("tickets", schema=None) as batch_op:
+        batch_op.drop_column("claimed_at")
@@ -1,8 +1,10 @@
 # tests/conftest.py
 import os
 import sys
+from contextlib import contextmanager
 
 import pytest
+from sqlalchemy import event
 
 # 1. Path modification MUST come before importing 'app'
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -11,6 +13,41 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 from app import create_app, db  # noqa: E402
 
 
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks", "hot-path micro-benchmarks")
+    group.addoption(
+        "--run-benchmarks",
+        action="store_true",
+        help="Run the tests marked 'benchmark' (skipped by default).",
+    )
+    group.addoption(
+        "--benchmark-threshold",
+        type=float,
+        default=float(os.environ.get("BENCHMARK_THRESHOLD", "25")),
+        help="Fail a benchmark this many percent slower than its baseline.",
+    )
+    group.addoption(
+        "--update-benchmark-baselines",
+        action="store_true",
+        help="Store this run's benchmark timings as the new baselines.",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "benchmark: hot-path timing compared against stored baselines"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-benchmarks"):
+        return
+    skip = pytest.mark.skip(reason="benchmarks run with --run-benchmarks")
+    for item in items:
+        if item.get_closest_marker("benchmark"):
+            item.add_marker(skip)
+
+
 @pytest.fixture()
 def test_app():
     """Creates a Flask app instance for testing."""
@@ -30,3 +67,54 @@ def test_app():
 def test_client(test_app):
     """A test client for the app."""
     return test_app.test_client()
+
+
+@pytest.fixture()
+def capture_queries(test_app):
+    """
+    Return a context manager that records SQL statements sent to the database.
+
+    Usage:
+        with capture_queries() as statements:
+            test_client.get("/queue")
+        assert len(statements) <= 4
+    """
+
+    @contextmanager
+    def _capture():
+        statements = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db.engine
+        event.listen(engine, "before_cursor_execute", _record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", _record)
+
+    return _capture
+
+
+@pytest.fixture()
+def assert_max_queries(capture_queries):
+    """
+    Return a context manager that fails when more than ``limit`` SQL
+    statements run inside it, listing them in the failure message.
+
+    Usage:
+        with assert_max_queries(3):
+            test_client.get("/queue")
+    """
+
+    @contextmanager
+    def _assert(limit):
+        with capture_queries() as statements:
+            yield statements
+        assert len(statements) <= limit, (
+            f"expected at most {limit} SQL statements, got {len(statements)}:\n"
+            + "\n".join(statements)
+        )
+
+    return _assert
@@ -0,0 +1,178 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import sqlalchemy as sa
+
+import app.archive_jobs as archive_jobs
+import app.archive_store as archive_store
+from app import db
+from app.archive_jobs import (
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    run_pending_jobs,
+    submit_export_job,
+)
+from app.archive_utils import remove_archive
+from app.models import ArchiveJob, Ticket, User
+
+START = datetime(2026, 4, 1, tzinfo=timezone.utc)
+END = datetime(2026, 4, 30, tzinfo=timezone.utc)
+
+
+def _closed_tickets(count):
+    closed_at = datetime(2026, 4, 15, 12, tzinfo=timezone.utc)
+    db.session.add_all(
+        Ticket(
+            student_name=f"Job {i}",
+            table="T1",
+            physics_course="Ph 211",
+            status="closed",
+            closed_at=closed_at,
+        )
+        for i in range(count)
+    )
+    db.session.commit()
+
+
+def _login_admin(test_client):
+    admin = User(username="jobs_admin", email="jobs_admin@test.com", is_admin=True)
+    admin.set_password("pass")
+    db.session.add(admin)
+    db.session.commit()
+    with test_client.session_transaction() as sess:
+        sess["user_id"] = admin.id
+        sess["is_admin"] = True
+
+
+def test_export_job_records_progress_and_shows_on_archive_page(
+    test_client, test_app, monkeypatch
+):
+    """A job reports its row counts while running and is listed on /archive."""
+    monkeypatch.setattr(archive_store, "ARCHIVE_PROGRESS_INTERVAL", 2)
+    _closed_tickets(5)
+    _login_admin(test_client)
+    seen = []
+    progress = []
+    original_run_job = archive_jobs.run_job
+    original_record_progress = archive_jobs._record_progress
+
+    def watch(job):
+        db.session.expire_all()
+        seen.append(job.status)
+        original_run_job(job)
+
+    def watch_progress(job_id, rows_written):
+        original_record_progress(job_id, rows_written)
+        progress.append(
+            db.session.scalar(
+                sa.select(ArchiveJob.rows_written).where(ArchiveJob.id == job_id)
+            )
+        )
+
+    monkeypatch.setattr(archive_jobs, "run_job", watch)
+    monkeypatch.setattr(archive_jobs, "_record_progress", watch_progress)
+    filename = "wormhole_archive_job_progress.csv"
+    path = Path(test_app.root_path) / "data" / "archives" / filename
+    try:
+        job = submit_export_job(START, END, filename)
+
+        assert seen == [JOB_RUNNING]
+        assert progress == [2, 4]
+        assert (job.status, job.rows_written, job.rows_total) == (JOB_DONE, 5, 5)
+        assert path.exists()
+        assert not path.with_name(f".{filename}.part").exists()
+
+        page = test_client.get("/archive")
+        assert b"wormhole_archive_job_progress.csv" in page.data
+        assert b'data-status="done"' in page.data
+        jobs = test_client.get("/archive/jobs").get_json()
+        assert (jobs[0]["status"], jobs[0]["rows_written"]) == (JOB_DONE, 5)
+    finally:
+        remove_archive(path)
+
+
+def test_jobs_beyond_the_cap_wait_for_a_free_slot(test_app):
+    """With one slot taken, a new job stays queued until the slot frees up."""
+    now = datetime.now(timezone.utc)
+    busy = ArchiveJob(
+        filename="busy.csv",
+        start_utc=START,
+        end_utc=END,
+        status=JOB_RUNNING,
+        started_at=now,
+        heartbeat_at=now,
+    )
+    db.session.add(busy)
+    db.session.commit()
+
+    filename = "wormhole_archive_job_capped.csv"
+    path = Path(test_app.root_path) / "data" / "archives" / filename
+    try:
+        job = submit_export_job(START, END, filename)
+        assert job.status == JOB_QUEUED
+
+        busy.status = JOB_DONE
+        db.session.commit()
+        assert run_pending_jobs() == 1
+        db.session.refresh(job)
+        assert job.status == JOB_DONE
+    finally:
+        remove_archive(path)
+
+
+def test_failed_and_abandoned_jobs_are_marked_failed(test_app, monkeypatch):
+    """Errors are recorded on the job, and dead runners do not hold a slot."""
+    stale = datetime.now(timezone.utc) - timedelta(hours=1)
+    abandoned = ArchiveJob(
+        filename="abandoned.csv",
+        start_utc=START,
+        end_utc=END,
+        status=JOB_RUNNING,
+        started_at=stale,
+        heartbeat_at=stale,
+    )
+    db.session.add(abandoned)
+    db.session.commit()
+
+    def disk_full(*args, **kwargs):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(archive_jobs, "export_range", disk_full)
+    job = submit_export_job(START, END, "wormhole_archive_job_failed.csv")
+
+    db.session.refresh(abandoned)
+    assert abandoned.status == JOB_FAILED
+    assert (job.status, job.error) == (JOB_FAILED, "No space left on device")
+
+
+def test_simultaneous_claims_hand_back_only_the_later_one(test_app, monkeypatch):
+    """Of two claims that overshoot the cap together, the earlier one runs."""
+    later = datetime.now(timezone.utc) + timedelta(minutes=1)
+    rival = ArchiveJob(
+        filename="rival.csv",
+        start_utc=START,
+        end_utc=END,
+        status=JOB_RUNNING,
+        started_at=later,
+        heartbeat_at=later,
+    )
+    mine = ArchiveJob(filename="mine.csv", start_utc=START, end_utc=END)
+    db.session.add_all([rival, mine])
+    db.session.commit()
+
+    # This runner checked the cap before the rival's claim landed.
+    running_count = archive_jobs._running_count
+    checks = []
+
+    def count_before_rival_claim():
+        checks.append(None)
+        return 0 if len(checks) == 1 else running_count()
+
+    monkeypatch.setattr(archive_jobs, "_running_count", count_before_rival_claim)
+    job = archive_jobs._claim_next_job()
+
+    assert (job.id, job.status) == (mine.id, JOB_RUNNING)
+    # The rival runner, re-checking the cap, finds its own claim past it.
+    assert archive_jobs._first_running_ids(1) == [mine.id]
@@ -0,0 +1,181 @@
+import csv
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app import db
+from app.archive_store import (
+    ArchivePartitionError,
+    build_partition,
+    export_range,
+    load_manifest,
+    partition_dir,
+    plan_range_export,
+    search_archive,
+)
+from app.models import Ticket, User
+from app.time_utils import PACIFIC_TZ, pacific_day_bounds_to_utc
+
+
+def _closed(name, closed_local, course="Ph 211"):
+    ticket = Ticket(
+        student_name=name,
+        table="T1",
+        physics_course=course,
+        status="closed",
+        closed_reason="helped",
+    )
+    ticket.created_at = closed_local.astimezone(timezone.utc)
+    ticket.closed_at = closed_local.astimezone(timezone.utc)
+    return ticket
+
+
+def _rows(path):
+    with path.open("r", encoding="utf-8", newline="") as archive_file:
+        return list(csv.reader(archive_file))
+
+
+@pytest.fixture()
+def spring_tickets(test_app):
+    db.session.add_all(
+        [
+            _closed("Early March", datetime(2026, 3, 2, 10, tzinfo=PACIFIC_TZ)),
+            _closed("Late March", datetime(2026, 3, 30, 10, tzinfo=PACIFIC_TZ)),
+            # Midnight on the 1st belongs to April, and must be exported once.
+            _closed("April Fools", datetime(2026, 4, 1, tzinfo=PACIFIC_TZ)),
+            _closed(
+                "Mid April", datetime(2026, 4, 15, 10, tzinfo=PACIFIC_TZ), "Ph 212"
+            ),
+            _closed("May Day", datetime(2026, 5, 1, 10, tzinfo=PACIFIC_TZ)),
+        ]
+    )
+    db.session.commit()
+
+
+def test_export_matches_database_export_and_skips_the_database(
+    test_app, tmp_path, spring_tickets
+):
+    """Partitioned months are read from disk with the same rows and order."""
+    start, _ = pacific_day_bounds_to_utc(date(2026, 3, 15))
+    _, end = pacific_day_bounds_to_utc(date(2026, 5, 31))
+    # Without partitions every month is queried from the database.
+    expected = _rows(export_range(tmp_path, start, end, "db.csv").path)
+
+    march = build_partition(tmp_path, date(2026, 3, 1))
+    april = build_partition(tmp_path, date(2026, 4, 1))
+    assert (march.rows, april.rows) == (2, 2)
+    assert set(load_manifest(tmp_path)) == {"2026-03", "2026-04"}
+
+    # Archived months no longer need their tickets in the database.
+    db.session.query(Ticket).filter(Ticket.student_name != "May Day").delete()
+    db.session.commit()
+
+    result = export_range(tmp_path, start, end, "store.csv")
+    assert _rows(result.path) == expected
+    assert [row[1] for row in expected[1:]] == [
+        "May Day",
+        "Mid April",
+        "April Fools",
+        "Late March",
+    ]
+
+
+def test_plan_reads_only_overlapping_partitions(test_app, tmp_path, spring_tickets):
+    for month in (3, 4):
+        build_partition(tmp_path, date(2026, month, 1))
+    start, _ = pacific_day_bounds_to_utc(date(2026, 4, 10))
+    _, end = pacific_day_bounds_to_utc(date(2026, 4, 20))
+
+    plan = plan_range_export(tmp_path, start, end)
+
+    assert [(p.partition.month, p.whole) for p in plan] == [("2026-04", False)]
+    matches = search_archive(tmp_path, start, end, "ph 212")
+    assert [row["Student Name"] for row in matches] == ["Mid April"]
+
+
+def test_clipped_partition_places_the_repeated_dst_hour(test_app, tmp_path):
+    """Rows from the hour repeated at fall-back are filtered by their UTC time."""
+    first = datetime(2026, 11, 1, 1, 30, tzinfo=PACIFIC_TZ)
+    second = first.replace(fold=1)
+    db.session.add_all([_closed("Before", first), _closed("After", second)])
+    db.session.commit()
+    # Both rows read 01:30:00 Pacific; the range ends between them.
+    start = datetime(2026, 11, 1, tzinfo=PACIFIC_TZ)
+    end = datetime(2026, 11, 1, 9, tzinfo=timezone.utc)
+    expected = _rows(export_range(tmp_path, start, end, "db.csv").path)
+
+    build_partition(tmp_path, date(2026, 11, 1))
+    result = export_range(tmp_path, start, end, "store.csv")
+
+    assert [row[1] for row in expected[1:]] == ["Before"]
+    assert _rows(result.path) == expected
+
+
+def test_reclosing_an_archived_ticket_drops_its_partition(
+    test_app, tmp_path, monkeypatch, spring_tickets
+):
+    monkeypatch.setattr("app.archive_store.archive_dir", lambda root: tmp_path)
+    for month in (3, 4):
+        build_partition(tmp_path, date(2026, month, 1))
+    ticket = Ticket.query.filter_by(student_name="Late March").one()
+
+    ticket.close_ticket("duplicate")
+
+    # The ticket moved from March to today's month; April is untouched.
+    assert set(load_manifest(tmp_path)) == {"2026-04"}
+    assert not (partition_dir(tmp_path) / "2026-03.csv").exists()
+    start = datetime(2026, 3, 1, tzinfo=PACIFIC_TZ)
+    end = datetime(2026, 3, 31, tzinfo=PACIFIC_TZ)
+    result = export_range(tmp_path, start, end, "march.csv")
+    assert [row[1] for row in _rows(result.path)[1:]] == ["Early March"]
+
+
+def test_clear_queue_drops_every_partition(
+    test_app, test_client, tmp_path, monkeypatch, spring_tickets
+):
+    monkeypatch.setattr("app.archive_store.archive_dir", lambda root: tmp_path)
+    for month in (3, 4):
+        build_partition(tmp_path, date(2026, month, 1))
+    admin = User(username="admin_partitions", email="p@test.com", is_admin=True)
+    admin.set_password("pass")
+    db.session.add(admin)
+    db.session.commit()
+    with test_client.session_transaction() as sess:
+        sess["user_id"] = admin.id
+        sess["is_admin"] = True
+
+    response = test_client.post("/clear_queue")
+
+    assert response.status_code == 302
+    assert load_manifest(tmp_path) == {}
+    assert list(partition_dir(tmp_path).glob("*.csv")) == []
+
+
+def test_corrupted_partition_is_refused(test_app, tmp_path, spring_tickets):
+    build_partition(tmp_path, date(2026, 3, 1))
+    path = partition_dir(tmp_path) / "2026-03.csv"
+    path.write_text(path.read_text(encoding="utf-8") + "9,Forged\r\n")
+    start, end = (
+        datetime(2026, 3, 1, tzinfo=PACIFIC_TZ),
+        datetime(2026, 3, 31, tzinfo=PACIFIC_TZ),
+    )
+
+    with pytest.raises(ArchivePartitionError):
+        export_range(tmp_path, start, end, "march.csv")
+
+
+def test_cli_builds_completed_months_once(test_app, spring_tickets):
+    runner = test_app.test_cli_runner()
+    manifest_dir = partition_dir(test_app.root_path)
+    try:
+        args = ["archive-partitions", "--now", "2026-06-01T00:00:00-07:00"]
+        result = runner.invoke(args=args)
+        assert result.exit_code == 0
+        assert "3 partition(s) built" in result.output
+
+        again = runner.invoke(args=args)
+        assert "0 partition(s) built" in again.output
+    finally:
+        for path in manifest_dir.iterdir():
+            path.unlink()
+        manifest_dir.rmdir()
@@ -1,12 +1,27 @@
 import csv
-from datetime import datetime, timezone
+import gzip
+import io
+import time
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from uuid import uuid4
 from zoneinfo import ZoneInfo
 
+import app.archive_utils as archive_utils
 from app import db
+from app.archive_utils import (
+    ARCHIVE_HEADERS,
+    append_weekly_archive,
+    archive_dir,
+    archive_index_path,
+    compressed_archive_path,
+    current_compressed_archive,
+    remove_archive,
+)
 from app.models import Ticket, User
 
+PACIFIC = ZoneInfo("America/Los_Angeles")
+
 
 def test_archive_weekly_cli_appends_previous_week_once(test_app):
     """Weekly archive command appends the completed Sat-to-Sat week only once."""
@@ -114,7 +129,7 @@ def test_archive_weekly_cli_appends_previous_week_once(test_app):
         assert len(rows) == 1
     finally:
         if archive_path.exists():
-            archive_path.unlink()
+            remove_archive(archive_path)
 
 
 def test_archive_weekly_cli_confines_filename_to_archive_directory(test_app):
@@ -158,6 +173,158 @@ def test_archive_weekly_cli_confines_filename_to_archive_directory(test_app):
         assert not escaped_path.exists()
     finally:
         if archive_path.exists():
-            archive_path.unlink()
+            remove_archive(archive_path)
         if escaped_path.exists():
             escaped_path.unlink()
+
+
+def _closed_ticket(name, closed_local):
+    ticket = Ticket(
+        student_name=name,
+        table="T1",
+        physics_course="PH 211",
+        status="closed",
+        closed_reason="helped",
+        number_of_students=1,
+    )
+    ticket.created_at = (closed_local - timedelta(hours=1)).astimezone(timezone.utc)
+    ticket.closed_at = closed_local.astimezone(timezone.utc)
+    return ticket
+
+
+def _forbid_full_scan(monkeypatch):
+    def scan(path):
+        raise AssertionError("the cumulative archive was re-read")
+
+    def recompress(path):
+        raise AssertionError("the cumulative archive was recompressed")
+
+    monkeypatch.setattr(archive_utils, "_existing_archive_keys", scan)
+    monkeypatch.setattr(archive_utils, "compress_archive", recompress)
+
+
+def test_weekly_append_uses_the_index_instead_of_rereading(
+    test_app, tmp_path, monkeypatch
+):
+    """After the first run, appends and re-runs never re-read the CSV."""
+    db.session.add_all(
+        [
+            _closed_ticket("Week One", datetime(2026, 4, 20, 12, tzinfo=PACIFIC)),
+            _closed_ticket("Week Two", datetime(2026, 4, 27, 12, tzinfo=PACIFIC)),
+        ]
+    )
+    db.session.commit()
+    first_week = datetime(2026, 4, 25, tzinfo=PACIFIC)
+    second_week = datetime(2026, 5, 2, tzinfo=PACIFIC)
+
+    assert append_weekly_archive(root_path=tmp_path, now=first_week).rows_written == 1
+
+    _forbid_full_scan(monkeypatch)
+    assert append_weekly_archive(root_path=tmp_path, now=second_week).rows_written == 1
+    rerun = append_weekly_archive(root_path=tmp_path, now=first_week)
+    assert (rerun.rows_written, rerun.rows_skipped) == (0, 1)
+
+    with rerun.path.open("r", encoding="utf-8", newline="") as archive_file:
+        names = [row["Student Name"] for row in csv.DictReader(archive_file)]
+    assert names == ["Week One", "Week Two"]
+    # The second week was added to the gzip copy as a member of its own.
+    compressed = compressed_archive_path(rerun.path)
+    assert gzip.decompress(compressed.read_bytes()) == rerun.path.read_bytes()
+    assert current_compressed_archive(rerun.path) == compressed
+
+
+def test_weekly_append_rescans_an_archive_edited_outside_the_job(
+    test_app, tmp_path, monkeypatch
+):
+    """A CSV changed behind the index's back is scanned again for duplicates."""
+    db.session.add(
+        _closed_ticket("Week One", datetime(2026, 4, 20, 12, tzinfo=PACIFIC))
+    )
+    db.session.commit()
+    now = datetime(2026, 4, 25, tzinfo=PACIFIC)
+    path = append_weekly_archive(root_path=tmp_path, now=now).path
+    assert archive_index_path(path).exists()
+
+    # Someone edits the CSV; the index is left as the job wrote it.
+    rows = path.read_text(encoding="utf-8")
+    path.write_text(rows + rows.splitlines()[1] + "\r\n", encoding="utf-8")
+    scanned = []
+    existing_archive_keys = archive_utils._existing_archive_keys
+
+    def scan(archive_path):
+        scanned.append(archive_path)
+        return existing_archive_keys(archive_path)
+
+    monkeypatch.setattr(archive_utils, "_existing_archive_keys", scan)
+    result = append_weekly_archive(root_path=tmp_path, now=now)
+    assert scanned == [path]
+    assert (result.rows_written, result.rows_skipped) == (0, 1)
+
+
+def test_weekly_append_on_multi_year_archive_benchmark(test_app, tmp_path, monkeypatch):
+    """
+    Append one week to a synthetic four-year archive.
+
+    The first run has no index and parses every row; the next week's append
+    reads only the index, so its cost no longer grows with the archive.
+    """
+    years, rows_per_week = 4, 150
+    path = archive_dir(tmp_path) / archive_utils.CUMULATIVE_ARCHIVE_FILENAME
+    with path.open("w", encoding="utf-8", newline="") as archive_file:
+        writer = csv.writer(archive_file)
+        writer.writerow(ARCHIVE_HEADERS)
+        for i in range(years * 52 * rows_per_week):
+            writer.writerow(
+                [i, "Student", "T1", "PH 211", "helped", "2022-01-03 10:00:00"]
+                + ["2022-01-03 11:00:00", 1, "N/A", "Box"]
+            )
+    archive_rows = years * 52 * rows_per_week
+
+    for day in (20, 27):
+        db.session.add_all(
+            _closed_ticket(
+                f"{day}-{n}",
+                datetime(2026, 4, day, 12, tzinfo=PACIFIC) + timedelta(seconds=n),
+            )
+            for n in range(rows_per_week)
+        )
+    db.session.commit()
+
+    started = time.perf_counter()
+    first = append_weekly_archive(
+        root_path=tmp_path, now=datetime(2026, 4, 25, tzinfo=PACIFIC)
+    )
+    full_scan = time.perf_counter() - started
+
+    _forbid_full_scan(monkeypatch)
+    started = time.perf_counter()
+    second = append_weekly_archive(
+        root_path=tmp_path, now=datetime(2026, 5, 2, tzinfo=PACIFIC)
+    )
+    incremental = time.perf_counter() - started
+
+    print(
+        f"\n{archive_rows} archived rows: first append {full_scan:.3f}s "
+        f"(full scan), next week {incremental:.3f}s (index only)"
+    )
+    assert first.rows_written == second.rows_written == rows_per_week
+    assert incremental < full_scan
+
+
+def test_streamed_gzip_export_matches_the_plain_csv(test_app, monkeypatch):
+    """Compressed chunks decode to exactly the CSV the plain stream yields."""
+    monkeypatch.setattr(archive_utils, "ARCHIVE_STREAM_CHUNK_BYTES", 256)
+    closed = datetime(2026, 4, 20, 12, tzinfo=PACIFIC)
+    db.session.add_all(_closed_ticket(f"Chunk {n}", closed) for n in range(50))
+    db.session.commit()
+    query = archive_utils.archive_ticket_query(
+        closed - timedelta(days=1), closed + timedelta(days=1)
+    )
+
+    plain = list(archive_utils.iter_archive_csv(query))
+    compressed = list(archive_utils.iter_archive_csv(query, compress=True))
+
+    assert len(plain) > 1
+    assert gzip.decompress(b"".join(compressed)) == b"".join(plain)
+    rows = list(csv.DictReader(io.StringIO(b"".join(plain).decode())))
+    assert len(rows) == 50
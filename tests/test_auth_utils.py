@@ -129,3 +129,45 @@ def test_admin_required_allows_admin(auth_test_client):
     res = auth_test_client.get("/protected-admin")
     assert res.status_code == 200
     assert res.get_json()["message"] == "ok"
+
+
+# --------------------------------------------------------------------------
+# Request-scoped current user
+# --------------------------------------------------------------------------
+
+
+def _user_selects(statements):
+    return [
+        s
+        for s in statements
+        if s.lstrip().upper().startswith("SELECT") and "FROM users" in s
+    ]
+
+
+def test_current_user_loaded_once_per_request(test_client, capture_queries):
+    """Decorator, view, and context processor should share one user query."""
+    from app import db
+    from app.models import Ticket, User
+
+    admin = User(username="once_admin", email="once@test.com", is_admin=True)
+    admin.set_password("pass")
+    ticket = Ticket(student_name="Once", table="T1", physics_course="Ph 211")
+    db.session.add_all([admin, ticket])
+    db.session.commit()
+
+    with test_client.session_transaction() as sess:
+        sess["user_id"] = admin.id
+        sess["is_admin"] = True
+
+    for path in [
+        "/queue",
+        f"/pastticket/once_admin/{ticket.id}",
+        "/admin/site-content",
+    ]:
+        # Start each request with an empty identity map, as in production.
+        db.session.expunge_all()
+        with capture_queries() as statements:
+            res = test_client.get(path)
+
+        assert res.status_code == 200
+        assert len(_user_selects(statements)) == 1, path
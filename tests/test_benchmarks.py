@@ -0,0 +1,223 @@
+"""
+Micro-benchmarks for the hot paths behind the queue pages and archive exports.
+
+Each benchmark runs against 1k, 10k and 100k tickets and is compared with the
+stored baseline in ``benchmark_baselines.json``; a run more than
+``--benchmark-threshold`` percent (default 25, or $BENCHMARK_THRESHOLD) slower
+fails. They are skipped unless requested:
+
+    pytest tests/test_benchmarks.py --run-benchmarks
+    pytest tests/test_benchmarks.py --run-benchmarks --update-benchmark-baselines
+
+Timings are stored relative to a fixed pure-Python calibration loop timed
+alongside each benchmark, so a faster or slower machine shifts both alike.
+Baselines are still best regenerated on the machine that runs the check
+before deploying. Each timing is also recorded as a test property, so
+``--junitxml`` reports include it.
+"""
+
+import gc
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.orm import selectinload
+
+from app import create_app, db
+from app.archive_utils import (
+    archive_ticket_query,
+    render_archive_csv,
+    ticket_archive_row,
+)
+from app.models import Skipped, Ticket, User
+from app.queue_snapshot import get_queue_snapshot
+from app.routes.views import _ticket_to_ns
+from app.time_utils import format_pacific, serialize_datetime
+
+BASELINE_PATH = Path(__file__).with_name("benchmark_baselines.json")
+SIZES = (1_000, 10_000, 100_000)
+START = datetime(2026, 1, 5, 16, tzinfo=timezone.utc)
+
+pytestmark = pytest.mark.benchmark
+
+
+def _best_of(repeats, run, setup=lambda: None) -> float:
+    """Fastest of ``repeats`` timed calls, with the collector paused for each."""
+    timings = []
+    for _ in range(repeats):
+        setup()
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started)
+        finally:
+            gc.enable()
+    return min(timings)
+
+
+def _calibration_workload():
+    # Dict building and string formatting, like the serializers under test.
+    rows = []
+    for i in range(50_000):
+        rows.append({"id": i, "name": f"Student {i}", "table": str(i % 7)})
+    return len(rows)
+
+
+def _calibrate() -> float:
+    return _best_of(5, _calibration_workload)
+
+
+@pytest.fixture(scope="session")
+def baselines(request):
+    """Stored baselines; rewritten at the end with --update-benchmark-baselines."""
+    stored = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    results = dict(stored)
+    yield {"stored": stored, "results": results}
+    if request.config.getoption("--update-benchmark-baselines"):
+        BASELINE_PATH.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda n: f"{n // 1000}k")
+def dataset(request):
+    """
+    An app whose database holds ``n`` tickets: 80% closed, the rest live.
+
+    Every fourth live ticket was skipped by the first assistant, so the
+    unskipped-ticket query has rows to filter out.
+    """
+    n = request.param
+    app = create_app(testing=True)
+    with app.app_context():
+        db.create_all()
+        assistants = [
+            User(username=f"bench_wa{i}", email=f"bench_wa{i}@test.com", name=f"WA {i}")
+            for i in range(10)
+        ]
+        db.session.add_all(assistants)
+        db.session.flush()
+
+        rows = []
+        for i in range(n):
+            created = START + timedelta(minutes=i)
+            live = i % 5 == 0
+            rows.append(
+                {
+                    "student_name": f"Student {i}",
+                    "table": ("Zoom", "Teams", "T4")[i % 3],
+                    "physics_course": "Ph 211",
+                    "status": "live" if live else "resolved",
+                    "created_at": created,
+                    "closed_at": None if live else created + timedelta(minutes=12),
+                    "closed_reason": None if live else "helped",
+                    "number_of_students": 1,
+                    "wa_id": None if live else assistants[i % 10].id,
+                }
+            )
+        db.session.execute(sa.insert(Ticket), rows)
+        live_ids = db.session.scalars(
+            sa.select(Ticket.id).where(Ticket.status == "live")
+        ).all()
+        db.session.execute(
+            sa.insert(Skipped),
+            [{"wa_id": assistants[0].id, "tkt_id": tid} for tid in live_ids[::4]],
+        )
+        db.session.commit()
+
+        tickets = db.session.scalars(
+            sa.select(Ticket).options(selectinload(Ticket.wormhole_assistant))
+        ).all()
+        yield {
+            "n": n,
+            "tickets": tickets,
+            "skipper_id": assistants[0].id,
+        }
+        db.session.remove()
+        db.drop_all()
+
+
+def _bench(baselines, threshold, record, name, n, run, setup=lambda: None):
+    """Time ``run`` (best of several) and compare it with the stored baseline."""
+    # Calibrate next to each measurement so drift in CPU speed during a long
+    # session affects both alike.
+    calibration = _calibrate()
+    best = _best_of(max(5, 20_000 // n), run, setup)
+    relative = best / calibration
+
+    key = f"{name}[{n}]"
+    baselines["results"][key] = round(relative, 4)
+    baseline = baselines["stored"].get(key)
+    record(f"{key} ms", round(best * 1000, 1))
+    record(f"{key} relative", round(relative, 3))
+    if baseline is None:
+        return
+    limit = baseline * (1 + threshold / 100)
+    assert relative <= limit, (
+        f"{key} took {best * 1000:.1f} ms, {relative:.3f}x calibration, over "
+        f"the baseline {baseline:.3f}x by more than {threshold:g}%"
+    )
+
+
+@pytest.fixture()
+def bench(request, baselines, dataset, record_property):
+    threshold = request.config.getoption("--benchmark-threshold")
+
+    def run(name, fn, setup=lambda: None):
+        _bench(baselines, threshold, record_property, name, dataset["n"], fn, setup)
+
+    return run
+
+
+def test_ticket_to_dict(bench, dataset):
+    bench("Ticket.to_dict", lambda: [t.to_dict() for t in dataset["tickets"]])
+
+
+def test_ticket_to_namespace(bench, dataset):
+    bench("_ticket_to_ns", lambda: [_ticket_to_ns(t) for t in dataset["tickets"]])
+
+
+def test_datetime_formatting(bench, dataset):
+    stamps = [t.created_at for t in dataset["tickets"]]
+
+    def run():
+        for dt in stamps:
+            format_pacific(dt, "%I:%M %p")
+            serialize_datetime(dt)
+
+    bench("format_pacific+serialize_datetime", run)
+
+
+def test_ticket_archive_row(bench, dataset):
+    bench(
+        "ticket_archive_row",
+        lambda: [ticket_archive_row(t) for t in dataset["tickets"]],
+    )
+
+
+def test_render_archive_csv(bench, dataset):
+    bench("render_archive_csv", lambda: render_archive_csv(dataset["tickets"]))
+
+
+def test_archive_ticket_query(bench, dataset):
+    end = START + timedelta(minutes=dataset["n"] + 60)
+    bench(
+        "archive_ticket_query",
+        lambda: archive_ticket_query(START, end).all(),
+        # Load fresh rows each time rather than hitting the identity map.
+        setup=db.session.expunge_all,
+    )
+
+
+def test_unskipped_ticket_query(bench, dataset):
+    snapshot = get_queue_snapshot()
+    skipper_id = dataset["skipper_id"]
+    bench(
+        "unskipped_tickets",
+        lambda: snapshot.live_tickets(skipped_by=skipper_id),
+        # Time the reload from the database, not a warm snapshot.
+        setup=lambda: (db.session.expunge_all(), snapshot.invalidate()),
+    )
@@ -0,0 +1,71 @@
+import json
+import os
+import subprocess
+import sys
+
+from loadtest.clients import Recorder
+from loadtest.report import format_report, percentile, summarize
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def test_percentiles_use_nearest_rank():
+    values = [float(n) for n in range(1, 101)]
+
+    assert [percentile(values, pct) for pct in (50, 95, 99)] == [50.0, 95.0, 99.0]
+    assert percentile([0.2], 99) == 0.2
+    assert percentile([], 50) is None
+
+
+def test_summary_reports_errors_throughput_and_fanout():
+    recorder = Recorder(started=10.0, finished=20.0, sockets_connected=2)
+    for seconds in (0.01, 0.02, 0.03, 0.5):
+        recorder.record("POST /api/tickets", seconds, ok=seconds < 0.5)
+    recorder.created = {1: 100.0, 2: 101.0}
+    # The event can arrive before the creating request returns.
+    recorder.deliveries.update({1: [100.1, 100.3], 2: [101.2]})
+
+    summary = summarize(recorder, sockets_started=3)
+
+    route = summary["routes"]["POST /api/tickets"]
+    assert (route["requests"], route["errors"], route["error_rate"]) == (4, 1, 0.25)
+    assert (route["throughput_rps"], route["p50_ms"], route["p99_ms"]) == (
+        0.4,
+        20.0,
+        500.0,
+    )
+    fanout = summary["fanout"]
+    assert (fanout["deliveries"], fanout["expected_deliveries"]) == (3, 4)
+    assert fanout["p95_ms"] == 300.0
+    assert "POST /api/tickets" in format_report(summary)
+
+
+def test_short_run_against_a_local_instance(tmp_path):
+    """A few seconds of load exercise every scenario without errors."""
+    out = tmp_path / "summary.json"
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "loadtest",
+            "--duration=3",
+            "--students=4",
+            "--assistants=1",
+            "--sockets=3",
+            "--student-interval=0.3",
+            "--service-time=0.1",
+            f"--json={out}",
+        ],
+        cwd=REPO_ROOT,
+        check=True,
+        capture_output=True,
+        timeout=120,
+    )
+
+    summary = json.loads(out.read_text())
+    assert summary["total_errors"] == 0
+    assert {"POST /api/tickets", "GET /getnewticket/<username>"} <= set(
+        summary["routes"]
+    )
+    assert summary["fanout"]["sockets_connected"] == 3
+    assert summary["fanout"]["deliveries"] > 0
@@ -0,0 +1,125 @@
+import re
+
+from app import db, socketio
+from app.metrics import Histogram
+from app.models import User
+from app.routes.queue_events import QUEUE_NAMESPACE
+
+REMOTE = {"REMOTE_ADDR": "203.0.113.7"}
+
+
+def _scrape(test_client, **kwargs):
+    response = test_client.get("/metrics", **kwargs)
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    return response.get_data(as_text=True)
+
+
+def _sample(text, name, **labels):
+    """Return the value of one sample line, or None when it is absent."""
+    label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    selector = f"{name}{{{label_text}}}" if labels else name
+    match = re.search(rf"^{re.escape(selector)} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def test_requests_are_counted_per_endpoint(test_client):
+    """Latency, status, in-flight and SQL counts are recorded for each request."""
+    per_request = "wormhole_http_db_queries_per_request_count"
+    before = _sample(_scrape(test_client), per_request)
+    for _ in range(3):
+        assert test_client.get("/health").status_code == 200
+    assert test_client.get("/no-such-page").status_code == 404
+    test_client.post(
+        "/api/tickets",
+        json={"student_name": "Metric", "class_name": "Ph 211", "table_number": "T1"},
+    )
+
+    text = _scrape(test_client)
+    duration = "wormhole_http_request_duration_seconds"
+    assert _sample(text, f"{duration}_count", endpoint="health_check") == 3
+    assert _sample(text, f"{duration}_bucket", endpoint="health_check", le="+Inf") == 3
+    assert (
+        _sample(
+            text, "wormhole_http_responses_total", endpoint="health_check", status=200
+        )
+        == 3
+    )
+    assert (
+        _sample(text, "wormhole_http_responses_total", endpoint="unmatched", status=404)
+        == 1
+    )
+    assert _sample(text, "wormhole_http_db_queries_total", endpoint="health_check") == 0
+    assert (
+        _sample(
+            text, "wormhole_http_db_queries_total", endpoint="tickets.create_ticket"
+        )
+        >= 1
+    )
+    # The scrape itself is the only request in flight.
+    assert _sample(text, "wormhole_http_requests_in_flight") == 1
+    # The first scrape, three health checks, the 404 and the ticket post.
+    assert _sample(text, per_request) - before == 6
+    assert _sample(text, "wormhole_queue_snapshot_size") == 1
+    assert "# TYPE wormhole_http_request_duration_seconds histogram" in text
+
+
+def test_metrics_are_limited_to_localhost_and_admins(test_client):
+    """Remote visitors need an admin session; other users are refused."""
+    assert test_client.get("/metrics", environ_base=REMOTE).status_code == 403
+
+    for username, is_admin, expected in [
+        ("metrics_wa", False, 403),
+        ("metrics_admin", True, 200),
+    ]:
+        user = User(username=username, email=f"{username}@test.com", is_admin=is_admin)
+        db.session.add(user)
+        db.session.commit()
+        with test_client.session_transaction() as sess:
+            sess["user_id"] = user.id
+            sess["is_admin"] = is_admin
+        response = test_client.get("/metrics", environ_base=REMOTE)
+        assert response.status_code == expected
+
+
+def test_socket_clients_and_emits_are_counted(test_client):
+    """Connections to /queue and every event emitted on it show up."""
+    client = socketio.test_client(
+        test_client.application,
+        namespace=QUEUE_NAMESPACE,
+        flask_test_client=test_client,
+    )
+    text = _scrape(test_client)
+    assert _sample(text, "wormhole_socketio_clients", namespace=QUEUE_NAMESPACE) == 1
+
+    test_client.post(
+        "/api/tickets",
+        json={"student_name": "Emit", "class_name": "Ph 211", "table_number": "T2"},
+    )
+    client.disconnect(namespace=QUEUE_NAMESPACE)
+
+    text = _scrape(test_client)
+    assert _sample(text, "wormhole_socketio_clients", namespace=QUEUE_NAMESPACE) == 0
+    assert (
+        _sample(text, "wormhole_socketio_connections_total", namespace=QUEUE_NAMESPACE)
+        == 1
+    )
+    # One ticket_created per room group: staff and public.
+    assert (
+        _sample(
+            text,
+            "wormhole_socketio_emits_total",
+            namespace=QUEUE_NAMESPACE,
+            event="ticket_created",
+        )
+        == 2
+    )
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    assert histogram.cumulative() == [(0.1, 2), (1.0, 3)]
+    assert histogram.count == 4
+    assert histogram.total == 3.65
@@ -0,0 +1,202 @@
+"""Integration test: two app processes and a CLI job sharing one message queue."""
+
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+WORKER_SCRIPT = """
+import sys
+import eventlet
+eventlet.monkey_patch()
+from app import create_app, socketio
+app = create_app()
+socketio.run(app, host="127.0.0.1", port=int(sys.argv[1]), log_output=False)
+"""
+
+SETUP_SCRIPT = """
+from app import create_app, db
+app = create_app()
+with app.app_context():
+    db.create_all()
+"""
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_health(port, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health"):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise AssertionError(f"worker on port {port} did not start")
+
+
+class QueueSocket:
+    """Minimal Socket.IO client for the /queue namespace over HTTP long-polling."""
+
+    def __init__(self, port):
+        self.url = f"http://127.0.0.1:{port}/socket.io/?EIO=4&transport=polling"
+        self.packets = []
+        opened = self._poll(self.url)[0]
+        assert opened.startswith("0")  # Engine.IO open
+        self.url += "&sid=" + json.loads(opened[1:])["sid"]
+        self._send("40/queue,")
+        assert self._next_packet().startswith("40/queue,")
+
+    def _poll(self, url, timeout=5):
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            # Engine.IO v4 separates packets in one payload with \x1e.
+            return response.read().decode().split("\x1e")
+
+    def _send(self, packet):
+        request = urllib.request.Request(self.url, data=packet.encode(), method="POST")
+        with urllib.request.urlopen(request, timeout=5) as response:
+            assert response.read() == b"OK"
+
+    def _next_packet(self):
+        while not self.packets:
+            self.packets.extend(self._poll(self.url))
+        return self.packets.pop(0)
+
+    def next_event(self):
+        while True:
+            packet = self._next_packet()
+            if packet == "2":  # Engine.IO ping
+                self._send("3")
+            elif packet.startswith("42/queue,"):
+                name, data = json.loads(packet[len("42/queue,") :])
+                return name, data
+
+    def close(self):
+        self._send("1")  # Engine.IO close
+
+
+@pytest.fixture()
+def cluster(tmp_path):
+    # Unix socket paths are limited to ~100 bytes, so keep the directory short.
+    socket_dir = tempfile.mkdtemp(prefix="wq-", dir="/tmp")
+    env = dict(
+        os.environ,
+        PYTHONPATH=REPO_ROOT,
+        DATABASE_URL=f"sqlite:///{tmp_path / 'queue.db'}",
+        SOCKETIO_MESSAGE_QUEUE=f"unix://{socket_dir}",
+        QUEUE_BROADCAST_WINDOW_MS="0",
+        SECRET_KEY="multi-worker-test",
+        APP_ENV="development",
+        FORCE_HTTPS="0",
+        ENABLE_HSTS="0",
+        SESSION_COOKIE_SECURE="0",
+        EMAIL_ENABLED="0",
+    )
+    subprocess.run(
+        [sys.executable, "-c", SETUP_SCRIPT], cwd=REPO_ROOT, env=env, check=True
+    )
+
+    ports = [_free_port(), _free_port()]
+    workers = [
+        subprocess.Popen(
+            [sys.executable, "-c", WORKER_SCRIPT, str(port)],
+            cwd=REPO_ROOT,
+            env=env,
+        )
+        for port in ports
+    ]
+    try:
+        for port in ports:
+            _wait_for_health(port)
+        yield {"ports": ports, "env": env, "socket_dir": socket_dir}
+    finally:
+        for worker in workers:
+            worker.terminate()
+            worker.wait(timeout=10)
+        shutil.rmtree(socket_dir, ignore_errors=True)
+
+
+def test_events_reach_clients_on_every_worker(cluster):
+    """A ticket created on one worker and a CLI flush reach clients on both."""
+    first_port, second_port = cluster["ports"]
+    clients = [QueueSocket(first_port), QueueSocket(second_port)]
+    try:
+        # Each worker binds its socket once its first client connects.
+        deadline = time.monotonic() + 5
+        while len(os.listdir(cluster["socket_dir"])) < 2:
+            assert time.monotonic() < deadline, "workers did not join the queue"
+            time.sleep(0.05)
+
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{first_port}/api/tickets",
+            data=json.dumps(
+                {"student_name": "Multi", "class_name": "Ph 211", "table_number": "3"}
+            ).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request) as response:
+            ticket_id = json.load(response)["id"]
+
+        for client in clients:
+            name, data = client.next_event()
+            assert name == "ticket_created"
+            assert data["ticket"] == {
+                "id": ticket_id,
+                "student_name": "Multi",
+                "table": "3",
+                "physics_course": "Ph 211",
+                "status": "live",
+                "created_at": data["ticket"]["created_at"],
+                "position": 1,
+                # No ticket has been handled yet, so the default service time.
+                "estimated_wait_seconds": 300,
+            }
+            created_version = data["version"]
+
+        # The other worker's snapshot sees the ticket created on the first.
+        url = f"http://127.0.0.1:{second_port}/api/livequeuetickets"
+        with urllib.request.urlopen(url) as response:
+            assert [t["id"] for t in json.load(response)] == [ticket_id]
+            assert int(response.headers["X-Queue-Version"]) == created_version
+
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "flask",
+                "--app",
+                "application:application",
+                "flush-open-tickets",
+            ],
+            cwd=REPO_ROOT,
+            env=cluster["env"],
+            check=True,
+            capture_output=True,
+        )
+        for client in clients:
+            assert client.next_event() == (
+                "queue_refresh",
+                {"version": created_version + 1},
+            )
+        # The CLI job published without joining the queue.
+        assert len(os.listdir(cluster["socket_dir"])) == 2
+
+        with urllib.request.urlopen(url) as response:
+            assert json.load(response) == []
+    finally:
+        for client in clients:
+            client.close()
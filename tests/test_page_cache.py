@@ -0,0 +1,73 @@
+from app import db
+from app.models import User
+from app.page_cache import CachedPage, PageCache, get_page_cache
+from app.queue_maintenance import flush_open_tickets
+from app.routes.queue_events import broadcast_queue_refresh
+from app.site_content import save_site_content_bulk
+
+
+def test_anonymous_pages_are_served_from_the_cache(test_client):
+    """Repeat anonymous visits reuse the rendered page and carry cache headers."""
+    first = test_client.get("/wiki")
+    second = test_client.get("/wiki")
+
+    assert second.data == first.data
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert second.headers["Cache-Control"] == "public, max-age=30"
+    assert get_page_cache().stats()["hits"] == 1
+
+    revalidated = test_client.get(
+        "/wiki", headers={"If-None-Match": first.headers["ETag"]}
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.data == b""
+
+
+def test_content_and_queue_changes_invalidate_pages(test_client):
+    """A new site content or queue version renders the page again."""
+    test_client.get("/")
+    save_site_content_bulk({"homepage_banner": "Closed for finals"})
+    assert b"Closed for finals" in test_client.get("/").data
+
+    test_client.get("/livequeue")
+    flush_open_tickets()
+    broadcast_queue_refresh()
+    test_client.get("/livequeue")
+
+    stats = get_page_cache().stats()
+    assert stats["hits"] == 0
+    assert stats["misses"] == 4
+
+
+def test_logged_in_visitors_bypass_the_cache(test_client):
+    """Pages that show the visitor's own links are never stored or reused."""
+    test_client.get("/")
+    user = User(username="cached_wa", email="cached_wa@test.com")
+    user.set_password("pass")
+    db.session.add(user)
+    db.session.commit()
+    with test_client.session_transaction() as sess:
+        sess["user_id"] = user.id
+        sess["is_admin"] = False
+
+    response = test_client.get("/")
+
+    assert b"Profile" in response.data
+    assert "Cache-Control" not in response.headers
+    assert get_page_cache().stats()["hits"] == 0
+
+
+def test_least_recently_used_page_is_evicted():
+    cache = PageCache(max_entries=2)
+    for path in ("/", "/wiki", "/livequeue"):
+        cache.put(path, CachedPage("v1", b"page", "text/html", "tag"))
+
+    assert cache.get("/", "v1") is None
+    assert cache.get("/wiki", "v1") is not None
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "evictions": 1,
+        "size": 2,
+        "hit_ratio": 0.5,
+    }
@@ -0,0 +1,135 @@
+"""
+SQL statement budgets for the ticket list views.
+
+Each view is requested with a few tickets and again with many, every one
+handled by a different assistant. The statement count must stay the same,
+which catches a lazy load per row (an N+1), and must stay within the
+budget, so new queries on these paths are a deliberate choice.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import db
+from app.models import Ticket, User
+from app.page_cache import get_page_cache
+from app.queue_snapshot import get_queue_snapshot
+
+ADMIN = "counts_admin"
+
+
+def _add_tickets(count, offset):
+    """Add ``count`` assistants with one live, one claimed and one closed ticket."""
+    created = datetime.now(timezone.utc) - timedelta(hours=2)
+    claimed, closed = [], []
+    for i in range(offset, offset + count):
+        assistant = User(
+            username=f"counts_wa{i}", email=f"counts_wa{i}@test.com", name=f"WA {i}"
+        )
+        db.session.add(assistant)
+        db.session.flush()
+        db.session.add(
+            Ticket(student_name=f"Live {i}", table="T1", physics_course="Ph 211")
+        )
+        claimed.append(
+            Ticket(
+                student_name=f"Claimed {i}",
+                table="T2",
+                physics_course="Ph 212",
+                status="in_progress",
+                wa_id=assistant.id,
+                claimed_at=created,
+            )
+        )
+        closed.append(
+            Ticket(
+                student_name=f"Closed {i}",
+                table="T3",
+                physics_course="Ph 213",
+                status="resolved",
+                closed_reason="helped",
+                wa_id=assistant.id,
+                created_at=created,
+                claimed_at=created,
+                closed_at=created + timedelta(minutes=i),
+            )
+        )
+    db.session.add_all(claimed + closed)
+    db.session.commit()
+    return [t.id for t in claimed], [t.id for t in closed]
+
+
+@pytest.fixture()
+def admin_client(test_client):
+    admin = User(username=ADMIN, email="counts_admin@test.com", is_admin=True)
+    db.session.add(admin)
+    db.session.commit()
+    with test_client.session_transaction() as sess:
+        sess["user_id"] = admin.id
+        sess["is_admin"] = True
+    return test_client
+
+
+def _cold_count(client, capture_queries, method, path, **kwargs):
+    # Start from empty caches and a clean session, as the first request
+    # after a deploy or a queue change would.
+    get_queue_snapshot().invalidate()
+    get_page_cache().clear()
+    db.session.expunge_all()
+    with capture_queries() as statements:
+        response = client.open(path, method=method, **kwargs)
+    assert response.status_code < 400, response.status_code
+    return len(statements)
+
+
+VIEWS = [
+    # (name, method, path, budget); {claimed} and {closed} name a ticket.
+    ("queue page", "GET", "/queue", 10),
+    ("live queue page", "GET", "/livequeue", 6),
+    ("live queue api", "GET", "/api/livequeuetickets", 6),
+    ("closed history api", "GET", "/api/closedtickets", 4),
+    ("current ticket", "GET", "/currentticket/{claimed}", 3),
+    ("past ticket", "GET", f"/pastticket/{ADMIN}/{{closed}}", 3),
+    ("ticket api", "GET", "/api/tickets", 3),
+    ("debug ticket list", "GET", "/debug/tickets", 4),
+]
+
+
+@pytest.mark.parametrize(
+    "method,path,budget", [v[1:] for v in VIEWS], ids=[v[0] for v in VIEWS]
+)
+def test_list_views_do_not_query_per_ticket(
+    admin_client, capture_queries, assert_max_queries, method, path, budget
+):
+    claimed, closed = _add_tickets(2, offset=0)
+    path = path.format(claimed=claimed[0], closed=closed[0])
+    # The first request also seeds process-wide state such as the wait
+    # estimator, which later requests never repeat.
+    _cold_count(admin_client, capture_queries, method, path)
+    few = _cold_count(admin_client, capture_queries, method, path)
+
+    _add_tickets(12, offset=2)
+    many = _cold_count(admin_client, capture_queries, method, path)
+
+    assert many == few
+    with assert_max_queries(budget):
+        _cold_count(admin_client, capture_queries, method, path)
+
+
+def test_bulk_resolution_does_not_query_per_ticket(admin_client, capture_queries):
+    """Broadcasting a bulk resolution reloads its tickets in one pass."""
+
+    def resolve(ids):
+        db.session.expunge_all()
+        with capture_queries() as statements:
+            response = admin_client.post(
+                "/api/resolvetickets",
+                json={"tickets": [{"id": i, "resolve": "helped"} for i in ids]},
+            )
+        assert response.status_code == 200
+        return len(statements)
+
+    claimed, _ = _add_tickets(9, offset=0)
+    resolve(claimed[:1])
+    assert resolve(claimed[1:3]) == resolve(claimed[3:])
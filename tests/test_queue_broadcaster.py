@@ -0,0 +1,151 @@
+import time
+
+from app import create_app, db, socketio
+from app.queue_broadcaster import TICKET_BATCH, CoalescingBroadcaster
+from app.routes.queue_events import PUBLIC_ROOM, QUEUE_NAMESPACE, STAFF_ROOMS
+
+
+def _recorder():
+    sent = []
+
+    def emit(event, data=None, namespace=None, to=None):
+        sent.append({"name": event, "data": data, "to": to})
+
+    return sent, emit
+
+
+def _bodies(ticket_id, status, unskipped=1):
+    return {
+        STAFF_ROOMS: {
+            "ticket": {"id": ticket_id, "status": status, "student_name": "S"},
+            "unskipped": {"all": unskipped, "by_user": {}},
+        },
+        PUBLIC_ROOM: {
+            "ticket": {"id": ticket_id, "status": status, "position": 1},
+        },
+    }
+
+
+def test_zero_window_sends_each_event_as_its_typed_event():
+    """With no window the broadcaster behaves like a plain emit per room."""
+    sent, emit = _recorder()
+    broadcaster = CoalescingBroadcaster(0, QUEUE_NAMESPACE, emit=emit)
+
+    broadcaster.publish("ticket_created", 1, 7, _bodies(7, "live"))
+
+    assert [(s["name"], s["to"]) for s in sent] == [
+        ("ticket_created", STAFF_ROOMS),
+        ("ticket_created", PUBLIC_ROOM),
+    ]
+    assert sent[0]["data"] == {"version": 1, **_bodies(7, "live")[STAFF_ROOMS]}
+    assert sent[1]["data"] == {"version": 1, **_bodies(7, "live")[PUBLIC_ROOM]}
+    assert broadcaster.stats()["coalesced"] == 0
+
+
+def test_hold_batches_events_even_with_no_window():
+    """Deltas published inside hold() leave together when the hold ends."""
+    sent, emit = _recorder()
+    broadcaster = CoalescingBroadcaster(0, QUEUE_NAMESPACE, emit=emit)
+
+    with broadcaster.hold():
+        broadcaster.publish("ticket_resolved", 3, 1, _bodies(1, "resolved"))
+        broadcaster.publish("ticket_resolved", 4, 2, _bodies(2, "resolved"))
+        assert sent == []
+
+    assert [(s["name"], s["to"]) for s in sent] == [
+        (TICKET_BATCH, STAFF_ROOMS),
+        (TICKET_BATCH, PUBLIC_ROOM),
+    ]
+    assert (sent[0]["data"]["first_version"], sent[0]["data"]["version"]) == (3, 4)
+
+
+def test_window_folds_events_into_one_batch_per_room(test_app):
+    """Buffered events go out once per room, keeping the last event per ticket."""
+    sent, emit = _recorder()
+    broadcaster = CoalescingBroadcaster(60, QUEUE_NAMESPACE, emit=emit)
+
+    broadcaster.publish("ticket_created", 5, 1, _bodies(1, "live", unskipped=1))
+    broadcaster.publish("ticket_created", 6, 2, _bodies(2, "live", unskipped=2))
+    broadcaster.publish("ticket_claimed", 7, 1, _bodies(1, "in_progress", unskipped=1))
+    assert sent == []
+    assert broadcaster.stats()["pending"] == 3
+
+    broadcaster.flush()
+
+    assert [(s["name"], s["to"]) for s in sent] == [
+        (TICKET_BATCH, STAFF_ROOMS),
+        (TICKET_BATCH, PUBLIC_ROOM),
+    ]
+    batch = sent[1]["data"]
+    assert (batch["first_version"], batch["version"]) == (5, 7)
+    assert [(e["type"], e["ticket"]["id"]) for e in batch["events"]] == [
+        ("ticket_created", 2),
+        ("ticket_claimed", 1),
+    ]
+    assert set(batch["events"][0]["ticket"]) == {"id", "status", "position"}
+    assert "unskipped" not in batch
+    # Queue-wide fields describe the state after the newest event.
+    assert sent[0]["data"]["unskipped"] == {"all": 1, "by_user": {}}
+    assert broadcaster.stats() == {
+        "published": 3,
+        "coalesced": 2,
+        "batches": 1,
+        "emits": 2,
+        "pending": 0,
+    }
+
+
+def test_ticket_burst_is_coalesced_benchmark(monkeypatch):
+    """
+    Simulate a lab-start burst of ticket submissions through the real route.
+
+    Without coalescing every submission is one emit per room; with a 100 ms
+    window the burst collapses into a handful of batches.
+    """
+    burst_size = 60
+    sent, emit = _recorder()
+    monkeypatch.setattr(socketio, "emit", emit)
+
+    app = create_app(testing=True, test_config={"QUEUE_BROADCAST_WINDOW_MS": 100})
+    with app.app_context():
+        db.create_all()
+        client = app.test_client()
+        broadcaster = app.extensions["queue_broadcaster"]
+
+        started = time.perf_counter()
+        for i in range(burst_size):
+            response = client.post(
+                "/api/tickets",
+                json={
+                    "student_name": f"Burst {i}",
+                    "class_name": "Ph 211",
+                    "table_number": "T1",
+                },
+            )
+            assert response.status_code == 201
+        elapsed = time.perf_counter() - started
+
+        # Let the window close and the background flush run.
+        socketio.sleep(0.3)
+        broadcaster.flush()
+        stats = broadcaster.stats()
+        db.session.remove()
+        db.drop_all()
+
+    uncoalesced_emits = burst_size * 2
+    print(
+        f"\n{burst_size} tickets in {elapsed:.3f}s: {stats['emits']} emits "
+        f"instead of {uncoalesced_emits} ({stats['coalesced']} events coalesced)"
+    )
+    assert stats["published"] == burst_size
+    assert stats["pending"] == 0
+    assert stats["emits"] == len(sent) < uncoalesced_emits
+
+    # Every version reaches each room exactly once, in order.
+    public = [s["data"] for s in sent if s["to"] == PUBLIC_ROOM]
+    covered = []
+    for data in public:
+        covered.extend(
+            range(data.get("first_version", data["version"]), data["version"] + 1)
+        )
+    assert covered == list(range(covered[0], covered[0] + burst_size))
@@ -0,0 +1,176 @@
+import pytest
+
+from app import db, socketio
+from app.models import User
+from app.routes.queue_events import (
+    ADMIN_ROOM,
+    ASSISTANT_ROOM,
+    PUBLIC_ROOM,
+    PUBLIC_TICKET_FIELDS,
+    QUEUE_NAMESPACE,
+    QUEUE_VERSION_HEADER,
+    STAFF_ROOMS,
+)
+
+
+@pytest.fixture()
+def emitted(monkeypatch):
+    """Record socketio.emit calls as {"name", "args", "namespace", "to"} dicts."""
+    received = []
+
+    def fake_emit(event, data=None, namespace=None, to=None, **kwargs):
+        received.append(
+            {"name": event, "args": [data], "namespace": namespace, "to": to}
+        )
+
+    monkeypatch.setattr(socketio, "emit", fake_emit)
+    return received
+
+
+def test_ticket_lifecycle_emits_sequential_typed_deltas(test_client, emitted):
+    """Create, claim and resolve should emit typed events with consecutive versions."""
+    assistant = User(username="delta_wa", email="delta_wa@test.com")
+    assistant.set_password("pass")
+    db.session.add(assistant)
+    db.session.commit()
+
+    response = test_client.post(
+        "/api/tickets",
+        json={"student_name": "Delta", "class_name": "Ph 211", "table_number": "T1"},
+    )
+    assert response.status_code == 201
+    ticket_id = response.get_json()["id"]
+
+    with test_client.session_transaction() as sess:
+        sess["user_id"] = assistant.id
+        sess["is_admin"] = False
+
+    test_client.get(f"/getnewticket/{assistant.username}")
+    test_client.post(f"/api/resolveticket/{ticket_id}", data={"resolve": "no_show"})
+
+    received = [
+        event
+        for event in emitted
+        if event["namespace"] == QUEUE_NAMESPACE and event["to"] == STAFF_ROOMS
+    ]
+    names = [event["name"] for event in received]
+    assert names == ["ticket_created", "ticket_claimed", "ticket_resolved"]
+
+    versions = [event["args"][0]["version"] for event in received]
+    assert versions == list(range(versions[0], versions[0] + 3))
+
+    claimed = received[1]["args"][0]["ticket"]
+    assert claimed["id"] == ticket_id
+    assert claimed["status"] == "in_progress"
+    assert claimed["assistant_name"] == "delta_wa"
+    assert received[2]["args"][0]["ticket"]["closed_reason"] == "no_show"
+
+
+def test_queue_snapshot_endpoints_report_version_header(test_client):
+    """Snapshot endpoints expose the version clients use to detect gaps."""
+    before = test_client.get("/api/livequeuetickets")
+    test_client.post(
+        "/api/tickets",
+        json={"student_name": "Header", "class_name": "Ph 211", "table_number": "T1"},
+    )
+    after = test_client.get("/api/livequeuetickets")
+
+    assert int(after.headers[QUEUE_VERSION_HEADER]) == (
+        int(before.headers[QUEUE_VERSION_HEADER]) + 1
+    )
+
+
+def test_public_room_gets_what_the_live_queue_shows(test_client, emitted):
+    """Kiosk events and the public API carry the same fields, and no staff ones."""
+    for name in ["First", "Second"]:
+        test_client.post(
+            "/api/tickets",
+            json={"student_name": name, "class_name": "Ph 211", "table_number": "T1"},
+        )
+
+    public = [event for event in emitted if event["to"] == PUBLIC_ROOM]
+    staff = [event for event in emitted if event["to"] == STAFF_ROOMS]
+    assert len(public) == len(staff) == 2
+
+    second = public[1]["args"][0]
+    fields = {*PUBLIC_TICKET_FIELDS, "position", "estimated_wait_seconds"}
+    assert set(second["ticket"]) == fields
+    assert second["ticket"]["student_name"] == "Second"
+    assert second["ticket"]["status"] == "live"
+    assert second["ticket"]["position"] == 2
+    assert second["ticket"]["estimated_wait_seconds"] == 600
+    assert second["wait_estimates"] == [300, 600]
+    assert second["version"] == staff[1]["args"][0]["version"]
+    assert "assistant_name" in staff[1]["args"][0]["ticket"]
+
+    listed = test_client.get("/api/livequeuetickets").get_json()
+    assert [set(ticket) for ticket in listed] == [fields, fields]
+    assert listed[1] == second["ticket"]
+
+
+def _connected_rooms(test_client):
+    client = socketio.test_client(
+        test_client.application,
+        namespace=QUEUE_NAMESPACE,
+        flask_test_client=test_client,
+    )
+    assert client.is_connected(QUEUE_NAMESPACE)
+    sid = socketio.server.manager.sid_from_eio_sid(client.eio_sid, QUEUE_NAMESPACE)
+    rooms = set(socketio.server.rooms(sid, namespace=QUEUE_NAMESPACE))
+    client.disconnect(namespace=QUEUE_NAMESPACE)
+    return rooms - {sid}
+
+
+def test_connections_join_the_room_for_their_session(test_client):
+    """Rooms are chosen from the Flask session cookie at connect time."""
+    assert _connected_rooms(test_client) == {PUBLIC_ROOM}
+
+    for username, is_admin, room in [
+        ("room_wa", False, ASSISTANT_ROOM),
+        ("room_admin", True, ADMIN_ROOM),
+    ]:
+        user = User(username=username, email=f"{username}@test.com", is_admin=is_admin)
+        user.set_password("pass")
+        db.session.add(user)
+        db.session.commit()
+        with test_client.session_transaction() as sess:
+            sess["user_id"] = user.id
+        assert _connected_rooms(test_client) == {room}
+
+    # A session naming a user that no longer exists is treated as anonymous.
+    with test_client.session_transaction() as sess:
+        sess["user_id"] = 9999
+    assert _connected_rooms(test_client) == {PUBLIC_ROOM}
+
+
+def test_staff_events_carry_unskipped_counts(test_client, emitted):
+    """Assistants get their unskipped count pushed; kiosks do not."""
+    assistant = User(username="count_wa", email="count_wa@test.com")
+    assistant.set_password("pass")
+    db.session.add(assistant)
+    db.session.commit()
+    with test_client.session_transaction() as sess:
+        sess["user_id"] = assistant.id
+        sess["is_admin"] = False
+
+    for name in ["One", "Two"]:
+        test_client.post(
+            "/api/tickets",
+            json={"student_name": name, "class_name": "Ph 211", "table_number": "T1"},
+        )
+    test_client.get(f"/getnewticket/{assistant.username}")
+    claimed_id = emitted[-1]["args"][0]["ticket"]["id"]
+    test_client.post(
+        f"/api/resolveticket/{claimed_id}", data={"resolve": "return_to_queue"}
+    )
+
+    staff = [e["args"][0] for e in emitted if e["to"] == STAFF_ROOMS]
+    assert [e["unskipped"]["all"] for e in staff] == [1, 2, 1, 2]
+    # After returning a ticket, the assistant no longer counts it.
+    assert staff[-1]["unskipped"]["by_user"] == {str(assistant.id): 1}
+    public = [e["args"][0] for e in emitted if e["to"] == PUBLIC_ROOM]
+    assert all("unskipped" not in e for e in public)
+
+    response = test_client.get("/api/unskippedtickets/count")
+    assert response.get_json() == {"count": 1}
+    assert response.headers[QUEUE_VERSION_HEADER] == str(staff[-1]["version"])
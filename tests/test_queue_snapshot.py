@@ -0,0 +1,97 @@
+from app import db
+from app.models import Ticket, User
+from app.queue_maintenance import flush_open_tickets
+from app.queue_snapshot import get_queue_snapshot
+
+
+def _login(test_client, username="snap_wa"):
+    user = User(username=username, email=f"{username}@test.com")
+    user.set_password("pass")
+    db.session.add(user)
+    db.session.commit()
+    with test_client.session_transaction() as sess:
+        sess["user_id"] = user.id
+        sess["is_admin"] = False
+    return user
+
+
+def test_warm_snapshot_serves_queue_endpoints_without_queries(
+    test_client, capture_queries
+):
+    """Once loaded, every queue read endpoint should serve tickets from memory."""
+    _login(test_client)
+    db.session.add(Ticket(student_name="Snap", table="T1", physics_course="Ph 211"))
+    db.session.commit()
+
+    snapshot = get_queue_snapshot()
+    assert test_client.get("/api/livequeuetickets").status_code == 200
+    assert snapshot.stats()["misses"] == 1
+    warm_hits = snapshot.stats()["hits"]
+
+    with capture_queries() as statements:
+        for path in [
+            "/api/livequeuetickets",
+            "/api/opentickets",
+            "/api/unskippedtickets",
+            "/livequeue",
+        ]:
+            assert test_client.get(path).status_code == 200
+
+    # Only the logged-in user is loaded (for the page header); no ticket reads.
+    assert [s for s in statements if "tickets" in s or "skipped" in s] == []
+    stats = snapshot.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == warm_hits + 4
+    assert stats["size"] == 1
+
+
+def test_snapshot_is_updated_by_ticket_mutations(test_client):
+    """Create, claim, requeue and flush should all be reflected in the snapshot."""
+    user = _login(test_client)
+    assert test_client.get("/api/livequeuetickets").get_json() == []
+
+    created = test_client.post(
+        "/api/tickets",
+        json={"student_name": "Write", "class_name": "Ph 211", "table_number": "T1"},
+    ).get_json()
+    live = test_client.get("/api/livequeuetickets").get_json()
+    assert [t["id"] for t in live] == [created["id"]]
+
+    test_client.get(f"/getnewticket/{user.username}")
+    live = test_client.get("/api/livequeuetickets").get_json()
+    assert live[0]["status"] == "in_progress"
+    # The public API leaves the assistant's name to staff views.
+    assert "assistant_name" not in live[0]
+    assert get_queue_snapshot().active_tickets()[0]["assistant_name"] == user.username
+
+    test_client.post(
+        f"/api/resolveticket/{created['id']}", data={"resolve": "return_to_queue"}
+    )
+    assert test_client.get("/api/opentickets").get_json()[0]["status"] == "live"
+    # The requeueing assistant skipped the ticket, so it is hidden for them.
+    assert test_client.get("/api/unskippedtickets").get_json() == []
+
+    flush_open_tickets()
+    assert test_client.get("/api/livequeuetickets").get_json() == []
+    assert get_queue_snapshot().stats()["invalidations"] == 1
+
+
+def test_queue_endpoints_answer_304_until_the_queue_changes(test_client):
+    """A matching If-None-Match gets 304; any ticket mutation changes the ETag."""
+    first = test_client.get("/api/livequeuetickets")
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    cached = test_client.get("/api/livequeuetickets", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.data == b""
+    assert cached.headers["ETag"] == etag
+
+    test_client.post(
+        "/api/tickets",
+        json={"student_name": "Tag", "class_name": "Ph 211", "table_number": "T1"},
+    )
+    changed = test_client.get("/api/livequeuetickets", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert [t["student_name"] for t in changed.get_json()] == ["Tag"]
@@ -1,12 +1,16 @@
 # tests/test_routes.py
 import csv
+import gzip
 from datetime import datetime, timedelta, timezone
 from io import StringIO
 from pathlib import Path
 from uuid import uuid4
 from zoneinfo import ZoneInfo
 
+import app.archive_store as archive_store
+import app.archive_utils as archive_utils
 from app import db
+from app.archive_utils import compress_archive, remove_archive
 from app.models import SiteContent, Ticket, User
 from app.time_utils import pacific_day_bounds_to_utc
 
@@ -309,8 +313,19 @@ def test_clear_queue_route_resets_ticket_index(test_client):
     assert new_ticket.id == 1
 
 
-def test_export_archive(test_client):
+def _use_tmp_archive_dir(monkeypatch, tmp_path):
+    """Write exports, their gzip copies and partitions under ``tmp_path``."""
+
+    def tmp_archive_dir(root_path):
+        return tmp_path
+
+    monkeypatch.setattr(archive_utils, "archive_dir", tmp_archive_dir)
+    monkeypatch.setattr(archive_store, "archive_dir", tmp_archive_dir)
+
+
+def test_export_archive(test_client, tmp_path, monkeypatch):
     """Test archive export generates CSV with correct content."""
+    _use_tmp_archive_dir(monkeypatch, tmp_path)
     admin = User(username="admin_arch", email="arch@test.com", is_admin=True)
     admin.set_password("pass")
     db.session.add(admin)
@@ -402,6 +417,89 @@ def test_download_archive_serves_csv_file(test_client, test_app):
             file_path.unlink()
 
 
+def test_download_archive_serves_gzip_copy_with_ranges(test_client, test_app):
+    """Clients accepting gzip get the stored compressed copy, range by range."""
+    _login_as_admin(test_client)
+    archive_dir = Path(test_app.root_path) / "data" / "archives"
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    file_path = archive_dir / "wormhole_archive_test_gzip.csv"
+    file_path.write_text("Ticket ID,Student Name\n1,Zipped\n" * 200, encoding="utf-8")
+    gz_path = compress_archive(file_path)
+
+    try:
+        headers = {"Accept-Encoding": "gzip"}
+        response = test_client.get(
+            f"/archive/download/{file_path.name}", headers=headers
+        )
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert (
+            "filename=wormhole_archive_test_gzip.csv"
+            in (response.headers["Content-Disposition"])
+        )
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert gzip.decompress(response.data) == file_path.read_bytes()
+        response.close()
+
+        headers["Range"] = "bytes=0-9"
+        partial = test_client.get(
+            f"/archive/download/{file_path.name}", headers=headers
+        )
+        assert partial.status_code == 206
+        assert partial.data == gz_path.read_bytes()[:10]
+        partial.close()
+    finally:
+        remove_archive(file_path)
+
+
+def test_search_archive_lists_matching_tickets(test_client):
+    """Archive search shows closed tickets matching the text in the date range."""
+    _login_as_admin(test_client)
+    pacific = ZoneInfo("America/Los_Angeles")
+    for name, course in (("Searched", "Ph 213"), ("Other", "Ph 211")):
+        ticket = Ticket(
+            student_name=name, table="T1", physics_course=course, status="closed"
+        )
+        ticket.closed_at = datetime(2026, 4, 20, 12, tzinfo=pacific).astimezone(
+            timezone.utc
+        )
+        db.session.add(ticket)
+    db.session.commit()
+
+    response = test_client.get(
+        "/archive/search?start_date=2026-04-20&end_date=2026-04-20&query=ph+213"
+    )
+
+    assert response.status_code == 200
+    assert b"Searched" in response.data
+    assert b"Other" not in response.data
+
+
+def test_stream_archive_compresses_on_the_fly(test_client):
+    """A date-range export can be streamed as gzip without saving a file."""
+    _login_as_admin(test_client)
+    pacific = ZoneInfo("America/Los_Angeles")
+    closed_local = datetime(2026, 4, 20, 12, tzinfo=pacific)
+    ticket = Ticket(
+        student_name="Streamed", table="T1", physics_course="Ph 211", status="closed"
+    )
+    ticket.closed_at = closed_local.astimezone(timezone.utc)
+    db.session.add(ticket)
+    db.session.commit()
+
+    response = test_client.get(
+        "/archive/stream?start_date=2026-04-20&end_date=2026-04-20",
+        headers={"Accept-Encoding": "gzip"},
+    )
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert (
+        "attachment; filename=wormhole_archive_"
+        in (response.headers["Content-Disposition"])
+    )
+    rows = list(csv.DictReader(StringIO(gzip.decompress(response.data).decode())))
+    assert [row["Student Name"] for row in rows] == ["Streamed"]
+
+
 def test_delete_archives_removes_selected_file(test_client, test_app):
     """Archive delete route should remove selected CSV file(s)."""
     admin = User(username="admin_delete", email="delete@test.com", is_admin=True)
@@ -806,7 +904,9 @@ def test_queue_closed_history_displays_pacific_opened_and_closed_times(test_clie
     assert b"Closed: 08:30 PM" not in response.data
 
 
-def test_export_archive_uses_pacific_date_boundaries(test_client, test_app):
+def test_export_archive_uses_pacific_date_boundaries(
+    test_client, tmp_path, monkeypatch
+):
     """Archive export should treat submitted dates as Pacific local dates, not UTC dates."""
     admin = User(username="admin_tz", email="admin_tz@test.com", is_admin=True)
     admin.set_password("pass")
@@ -830,17 +930,15 @@ def test_export_archive_uses_pacific_date_boundaries(test_client, test_app):
         sess["user_id"] = admin.id
         sess["is_admin"] = True
 
-    archive_dir = Path(test_app.root_path) / "data" / "archives"
-    archive_dir.mkdir(parents=True, exist_ok=True)
+    _use_tmp_archive_dir(monkeypatch, tmp_path)
 
     request_day = datetime.fromisoformat("2026-04-02").date()
     start_dt, _ = pacific_day_bounds_to_utc(request_day)
     _, end_dt = pacific_day_bounds_to_utc(request_day)
     expected_file = (
-        archive_dir
+        tmp_path
         / f"wormhole_archive_{start_dt.date().isoformat()}_to_{end_dt.date().isoformat()}.csv"
     )
-    existed_before = expected_file.exists()
 
     response = test_client.post(
         "/archive/export",
@@ -855,9 +953,6 @@ def test_export_archive_uses_pacific_date_boundaries(test_client, test_app):
     csv_content = expected_file.read_text(encoding="utf-8")
     assert "LateLocalTicket" in csv_content
 
-    if not existed_before:
-        expected_file.unlink()
-
 
 def test_site_content_editor_rejects_google_sheets_edit_url(test_client):
     _login_as_admin(test_client)
@@ -0,0 +1,47 @@
+from app import db
+from app.models import SiteContent
+from app.site_content import (
+    SiteContentCache,
+    get_site_content_cache,
+    save_site_content_bulk,
+)
+from app.version_stamps import SITE_CONTENT_STAMP, bump_version
+
+
+def test_warm_homepage_makes_no_queries(test_client, capture_queries):
+    """After the first hit, the homepage is rendered entirely from memory."""
+    assert test_client.get("/").status_code == 200
+
+    with capture_queries() as statements:
+        for _ in range(3):
+            assert test_client.get("/").status_code == 200
+
+    assert statements == []
+    assert get_site_content_cache().misses == 1
+
+
+def test_bulk_save_refreshes_the_cache(test_client):
+    """Saving content drops the cached copy and bumps the shared stamp."""
+    test_client.get("/")
+    cache = get_site_content_cache()
+    version = cache.version
+
+    save_site_content_bulk({"homepage_banner": "Closed for finals"})
+
+    assert b"Closed for finals" in test_client.get("/").data
+    assert cache.version == version + 1
+
+
+def test_other_workers_notice_the_stamp_after_the_check_interval(test_app):
+    """A worker holding old content reloads once the shared stamp moves."""
+    other_worker = SiteContentCache(check_seconds=0)
+    assert other_worker.get()["homepage_banner"] == ""
+
+    # Another process edits the content and bumps the stamp.
+    db.session.add(SiteContent(key="homepage_banner", value="Snow day"))
+    db.session.commit()
+    assert other_worker.get()["homepage_banner"] == ""
+    bump_version(SITE_CONTENT_STAMP)
+
+    assert other_worker.get()["homepage_banner"] == "Snow day"
+    assert other_worker.misses == 2
@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import create_app, db
+from app.models import Skipped, Ticket, User
+from app.ticket_claims import claim_next_ticket
+
+
+def _make_assistant(username):
+    user = User(username=username, email=f"{username}@test.com")
+    user.set_password("pass")
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def test_claim_next_ticket_is_fifo_by_created_at(test_app):
+    """Claims should take the oldest live ticket even if it has a higher ID."""
+    assistant = _make_assistant("fifo_wa")
+    base = datetime.now(timezone.utc)
+    newer = Ticket(student_name="Newer", table="T1", physics_course="Ph 211")
+    newer.created_at = base
+    older = Ticket(student_name="Older", table="T2", physics_course="Ph 211")
+    older.created_at = base - timedelta(minutes=5)
+    db.session.add_all([newer, older])
+    db.session.commit()
+
+    claimed = claim_next_ticket(assistant.id)
+
+    assert claimed is not None
+    assert claimed.student_name == "Older"
+    assert claimed.status == "in_progress"
+    assert claimed.wa_id == assistant.id
+
+
+def test_claim_next_ticket_excludes_skipped_and_returns_none_when_empty(test_app):
+    """Tickets skipped by the claimer are ignored; an empty queue claims nothing."""
+    assistant = _make_assistant("skip_wa")
+    ticket = Ticket(student_name="Skipped", table="T1", physics_course="Ph 211")
+    db.session.add(ticket)
+    db.session.commit()
+    db.session.add(Skipped(wa_id=assistant.id, tkt_id=ticket.id))
+    db.session.commit()
+
+    assert claim_next_ticket(assistant.id, skipped_by_id=assistant.id) is None
+
+    claimed = claim_next_ticket(assistant.id)
+    assert claimed is not None
+    assert claimed.id == ticket.id
+    assert claim_next_ticket(assistant.id) is None
+
+
+def test_getnewticket_route_claims_ticket(test_client):
+    """The getnewticket route should redirect to the atomically claimed ticket."""
+    assistant = _make_assistant("route_wa")
+    ticket = Ticket(student_name="RouteClaim", table="T1", physics_course="Ph 211")
+    db.session.add(ticket)
+    db.session.commit()
+
+    with test_client.session_transaction() as sess:
+        sess["user_id"] = assistant.id
+        sess["is_admin"] = False
+
+    response = test_client.get(f"/getnewticket/{assistant.username}")
+
+    assert response.status_code == 302
+    assert f"/currentticket/{ticket.id}" in response.headers["Location"]
+    db.session.refresh(ticket)
+    assert ticket.wa_id == assistant.id
+    assert ticket.status == "in_progress"
+
+
+@pytest.fixture()
+def file_backed_app(tmp_path):
+    """App backed by a SQLite file so worker threads use separate connections."""
+    app = create_app(
+        testing=True,
+        test_config={
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'claims.db'}",
+            "SQLALCHEMY_ENGINE_OPTIONS": {"connect_args": {"timeout": 30}},
+        },
+    )
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_concurrent_claimers_never_double_assign(file_backed_app, record_property):
+    """
+    Benchmark dozens of simultaneous claimers draining one queue.
+
+    Every ticket must be claimed exactly once; claim throughput is recorded as
+    a test property so it can be compared across runs with ``--junitxml``.
+    """
+    claimer_count = 32
+    ticket_count = 200
+
+    assistant_ids = [_make_assistant(f"racer{i}").id for i in range(claimer_count)]
+    base = datetime.now(timezone.utc)
+    for i in range(ticket_count):
+        ticket = Ticket(student_name=f"S{i}", table="T1", physics_course="Ph 211")
+        ticket.created_at = base + timedelta(seconds=i)
+        db.session.add(ticket)
+    db.session.commit()
+
+    claims: dict[int, list[int]] = {wa_id: [] for wa_id in assistant_ids}
+    errors: list[BaseException] = []
+    start_barrier = threading.Barrier(claimer_count)
+
+    def claimer(wa_id):
+        with file_backed_app.app_context():
+            try:
+                start_barrier.wait()
+                while True:
+                    ticket = claim_next_ticket(wa_id)
+                    if ticket is None:
+                        break
+                    claims[wa_id].append(ticket.id)
+            except BaseException as exc:  # surfaced in the main thread below
+                errors.append(exc)
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=claimer, args=(i,)) for i in assistant_ids]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    assert not errors, errors
+
+    claimed_ids = Counter(tid for ids in claims.values() for tid in ids)
+    assert len(claimed_ids) == ticket_count
+    assert all(count == 1 for count in claimed_ids.values())
+
+    db.session.expire_all()
+    owners = dict(db.session.execute(db.select(Ticket.id, Ticket.wa_id)).all())
+    for wa_id, ticket_ids in claims.items():
+        for ticket_id in ticket_ids:
+            assert owners[ticket_id] == wa_id
+
+    record_property("claim seconds", round(elapsed, 3))
+    record_property("claims per second", round(ticket_count / elapsed))
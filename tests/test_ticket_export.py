@@ -0,0 +1,67 @@
+import json
+
+from app import db
+from app.models import Ticket, User
+from app.ticket_export import MAX_PAGE_SIZE
+
+
+def _add_tickets(count):
+    db.session.add_all(
+        [
+            Ticket(student_name=f"Export{i}", table="T1", physics_course="Ph 211")
+            for i in range(count)
+        ]
+    )
+    db.session.commit()
+
+
+def test_api_tickets_paginates_by_after_id(test_client):
+    """GET /api/tickets returns id-ordered pages linked with rel=next."""
+    _add_tickets(5)
+
+    first = test_client.get("/api/tickets?limit=2")
+    assert [t["id"] for t in first.get_json()] == [1, 2]
+    assert 'after_id=2&limit=2>; rel="next"' in first.headers["Link"]
+
+    last = test_client.get("/api/tickets?after_id=4&limit=2")
+    assert [t["id"] for t in last.get_json()] == [5]
+    assert "Link" not in last.headers
+
+    assert test_client.get("/api/tickets?limit=abc").status_code == 400
+
+
+def test_api_tickets_limit_is_capped(test_client):
+    """Clients cannot request more than MAX_PAGE_SIZE rows in one page."""
+    _add_tickets(MAX_PAGE_SIZE + 1)
+
+    response = test_client.get(f"/api/tickets?limit={MAX_PAGE_SIZE * 10}")
+    assert len(response.get_json()) == MAX_PAGE_SIZE
+
+
+def test_api_tickets_ndjson_streams_every_row(test_client):
+    """The NDJSON mode streams all tickets after the cursor, one per line."""
+    _add_tickets(3)
+
+    response = test_client.get("/api/tickets?format=ndjson&after_id=1")
+    assert response.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert [row["student_name"] for row in rows] == ["Export1", "Export2"]
+
+
+def test_debug_tickets_requires_admin_and_paginates(test_client):
+    """The debug listing is admin-only and reports the next cursor."""
+    _add_tickets(3)
+    assert test_client.get("/debug/tickets").status_code == 401
+
+    admin = User(username="debug_admin", email="debug_admin@test.com", is_admin=True)
+    admin.set_password("pass")
+    db.session.add(admin)
+    db.session.commit()
+    with test_client.session_transaction() as sess:
+        sess["user_id"] = admin.id
+        sess["is_admin"] = True
+
+    data = test_client.get("/debug/tickets?limit=2").get_json()
+    assert data["total"] == 3
+    assert data["next_after_id"] == 2
+    assert [t["name"] for t in data["tickets"]] == ["Export0", "Export1"]
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import db
+from app.models import Ticket, User
+from app.ticket_history import closed_tickets_page
+
+
+def _closed_ticket(name, closed_at, status="closed"):
+    ticket = Ticket(
+        student_name=name,
+        table="T1",
+        physics_course="Ph 211",
+        status=status,
+        closed_reason="helped",
+    )
+    ticket.closed_at = closed_at
+    return ticket
+
+
+@pytest.mark.parametrize("limit", [2, 3])
+def test_closed_tickets_page_walks_history_without_gaps(test_app, limit):
+    """Keyset pages cover every closed row once, newest first, ties and NULLs included."""
+    base = datetime(2026, 4, 2, 18, 0, tzinfo=timezone.utc)
+    tickets = [_closed_ticket(f"S{i}", base + timedelta(minutes=i)) for i in range(5)]
+    # Two rows sharing a closed_at must be split by id, not skipped.
+    tickets.append(_closed_ticket("Tie", base + timedelta(minutes=4)))
+    tickets.append(_closed_ticket("Legacy", None, status="resolved"))
+    tickets.append(_closed_ticket("Legacy 2", None, status="resolved"))
+    tickets.append(Ticket(student_name="Live", table="T2", physics_course="Ph 211"))
+    db.session.add_all(tickets)
+    db.session.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = closed_tickets_page(cursor=cursor, limit=limit)
+        seen.extend(t.student_name for t in page)
+        if cursor is None:
+            break
+
+    assert seen == ["Tie", "S4", "S3", "S2", "S1", "S0", "Legacy 2", "Legacy"]
+
+
+def test_closedtickets_api_and_queue_page_paginate(test_client):
+    """The dashboard renders the first page; the API serves later pages."""
+    user = User(username="history_wa", email="history_wa@test.com")
+    user.set_password("pass")
+    db.session.add(user)
+    base = datetime(2026, 4, 2, 18, 0, tzinfo=timezone.utc)
+    db.session.add_all(
+        [_closed_ticket(f"Hist{i:03d}", base + timedelta(minutes=i)) for i in range(60)]
+    )
+    db.session.commit()
+
+    assert test_client.get("/api/closedtickets").status_code == 401
+
+    with test_client.session_transaction() as sess:
+        sess["user_id"] = user.id
+        sess["is_admin"] = False
+
+    page = test_client.get("/queue")
+    assert b"Hist059" in page.data
+    assert b"Hist009" not in page.data
+    assert b'id="closed-tickets-more"' in page.data
+
+    first = test_client.get("/api/closedtickets?limit=50").get_json()
+    second = test_client.get(
+        "/api/closedtickets", query_string={"cursor": first["next_cursor"]}
+    ).get_json()
+    assert [t["student_name"] for t in second["tickets"]][:2] == ["Hist009", "Hist008"]
+    assert len(second["tickets"]) == 10
+    assert second["next_cursor"] is None
+
+    assert test_client.get("/api/closedtickets?cursor=bogus").status_code == 400
@@ -0,0 +1,118 @@
+import pytest
+
+import app.ticket_resolution as ticket_resolution
+from app import db, socketio
+from app.models import Skipped, Ticket, TicketDailyRollup, User
+from app.routes.queue_events import PUBLIC_ROOM, QUEUE_NAMESPACE, STAFF_ROOMS
+
+
+@pytest.fixture()
+def emitted(monkeypatch):
+    received = []
+
+    def fake_emit(event, data=None, namespace=None, to=None, **kwargs):
+        if namespace == QUEUE_NAMESPACE:
+            received.append((event, to, data))
+
+    monkeypatch.setattr(socketio, "emit", fake_emit)
+    return received
+
+
+@pytest.fixture()
+def shift_end(test_client):
+    admin = User(username="bulk_admin", email="bulk_admin@test.com", is_admin=True)
+    admin.set_password("pass")
+    db.session.add(admin)
+    tickets = [
+        Ticket(student_name=name, table="T1", physics_course="Ph 211")
+        for name in ["Helped", "Gone", "Back", "Extra"]
+    ]
+    db.session.add_all(tickets)
+    db.session.commit()
+    with test_client.session_transaction() as sess:
+        sess["user_id"] = admin.id
+        sess["is_admin"] = True
+    return admin, [ticket.id for ticket in tickets]
+
+
+def _bulk_request(helped, gone, back):
+    return {
+        "tickets": [
+            {"id": helped, "resolve": "helped", "numstudents": 2},
+            {"id": gone, "resolve": "no_show"},
+            {"id": back, "resolve": "return_to_queue"},
+            {"id": 9999, "resolve": "no_show"},
+            {"id": gone, "resolve": "duplicate"},
+            {"id": helped, "resolve": "vanished"},
+        ]
+    }
+
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_bulk_resolution_applies_each_outcome_in_one_update(
+    test_client, shift_end, emitted, capture_queries, monkeypatch, returning
+):
+    """Per-ticket reasons land in one UPDATE, and clients get one batch."""
+    monkeypatch.setattr(
+        ticket_resolution, "supports_update_returning", lambda: returning
+    )
+    admin, (helped, gone, back, extra) = shift_end
+
+    with capture_queries() as statements:
+        response = test_client.post(
+            "/api/resolvetickets", json=_bulk_request(helped, gone, back)
+        )
+
+    assert response.status_code == 200
+    outcomes = [(r["id"], r["outcome"]) for r in response.get_json()["results"]]
+    assert outcomes == [
+        (helped, "resolved"),
+        (gone, "resolved"),
+        (back, "requeued"),
+        (9999, "not_found"),
+        (gone, "invalid"),
+        (helped, "invalid"),
+    ]
+    ticket_updates = [s for s in statements if s.startswith("UPDATE tickets")]
+    assert len(ticket_updates) == 1
+
+    db.session.expire_all()
+    states = {
+        t.id: (t.status, t.closed_reason, t.number_of_students)
+        for t in db.session.scalars(db.select(Ticket))
+    }
+    assert states[helped] == ("resolved", "helped", 2)
+    assert states[gone] == ("resolved", "no_show", 0)
+    assert states[back][0] == states[extra][0] == "live"
+    assert db.session.scalars(db.select(Skipped.tkt_id)).all() == [back]
+    assert (
+        sum(row.tickets for row in db.session.scalars(db.select(TicketDailyRollup)))
+        == 2
+    )
+
+    assert [(name, to) for name, to, _ in emitted] == [
+        ("ticket_batch", STAFF_ROOMS),
+        ("ticket_batch", PUBLIC_ROOM),
+    ]
+    batch = emitted[0][2]
+    assert [(e["type"], e["ticket"]["id"]) for e in batch["events"]] == [
+        ("ticket_resolved", helped),
+        ("ticket_resolved", gone),
+        ("ticket_requeued", back),
+    ]
+    assert batch["version"] == response.get_json()["version"]
+
+
+def test_bulk_resolution_rejects_bad_requests(test_client, shift_end):
+    assert test_client.post("/api/resolvetickets", json={}).status_code == 400
+    assert (
+        test_client.post("/api/resolvetickets", json={"tickets": "all"}).status_code
+        == 400
+    )
+
+    with test_client.session_transaction() as sess:
+        sess.clear()
+    response = test_client.post(
+        "/api/resolvetickets", json={"tickets": [{"id": 1, "resolve": "no_show"}]}
+    )
+    assert response.status_code == 401
@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta, timezone
+
+import sqlalchemy as sa
+
+from app import db
+from app.models import Ticket, TicketDailyRollup, User
+from app.queue_maintenance import flush_open_tickets
+from app.ticket_rollup import rebuild_rollup, ticket_stats
+from app.time_utils import to_pacific
+
+CREATED = datetime.now(timezone.utc) - timedelta(hours=1)
+DAY = to_pacific(CREATED).date()
+
+
+def _ticket(name, course="Ph 211", table="T1", claimed_after=None):
+    ticket = Ticket(
+        student_name=name, table=table, physics_course=course, status="live"
+    )
+    ticket.created_at = CREATED
+    if claimed_after is not None:
+        ticket.status = "in_progress"
+        ticket.claimed_at = CREATED + claimed_after
+    db.session.add(ticket)
+    db.session.commit()
+    return ticket
+
+
+def _rollup_rows():
+    return [
+        (row.course, row.location, row.closed_reason, row.tickets, row.students)
+        for row in db.session.scalars(
+            sa.select(TicketDailyRollup).order_by(
+                TicketDailyRollup.course, TicketDailyRollup.closed_reason
+            )
+        )
+    ]
+
+
+def _login(test_client, username, is_admin=False):
+    user = User(username=username, email=f"{username}@test.com", is_admin=is_admin)
+    user.set_password("pass")
+    db.session.add(user)
+    db.session.commit()
+    with test_client.session_transaction() as sess:
+        sess["user_id"] = user.id
+        sess["is_admin"] = is_admin
+    return user
+
+
+def test_resolving_tickets_updates_the_rollup(test_client):
+    """Each resolution lands in the created-hour row with wait and handle time."""
+    _login(test_client, "rollup_wa")
+    helped = _ticket("Helped", claimed_after=timedelta(minutes=4))
+    no_show = _ticket("No Show", table="Zoom", claimed_after=timedelta(minutes=6))
+
+    test_client.post(
+        f"/api/resolveticket/{helped.id}",
+        data={"resolve": "helped", "numstudents": "3"},
+    )
+    test_client.post(f"/api/resolveticket/{no_show.id}", data={"resolve": "no_show"})
+
+    assert _rollup_rows() == [
+        ("Ph 211", "Box", "helped", 1, 3),
+        ("Ph 211", "Zoom", "no_show", 1, 0),
+    ]
+    key = (DAY, to_pacific(CREATED).hour, "Ph 211", "Box", "helped")
+    row = db.session.get(TicketDailyRollup, key)
+    assert (row.claimed, row.wait_seconds) == (1, 240)
+    # CREATED is fixed at import, so the handle time grows with suite runtime.
+    handled = datetime.now(timezone.utc) - (CREATED + timedelta(minutes=4))
+    assert handled.total_seconds() - 60 <= row.handle_seconds
+    assert row.handle_seconds <= handled.total_seconds() + 1
+
+
+def test_reclosing_or_requeueing_does_not_double_count(test_client):
+    """A ticket moves between rows when re-resolved and leaves when requeued."""
+    _login(test_client, "rollup_requeue_wa")
+    ticket = _ticket("Twice", claimed_after=timedelta(minutes=2))
+
+    ticket.close_ticket("helped", 2)
+    ticket.close_ticket("duplicate", 0)
+    assert [r for r in _rollup_rows() if r[3]] == [("Ph 211", "Box", "duplicate", 1, 0)]
+
+    test_client.post(
+        f"/api/resolveticket/{ticket.id}", data={"resolve": "return_to_queue"}
+    )
+    assert not any(r[3] for r in _rollup_rows())
+
+
+def test_flush_and_rebuild_agree_with_incremental_updates(test_app):
+    """Flushed tickets are counted, and a rebuild reproduces the same totals."""
+    _ticket("Helped", claimed_after=timedelta(minutes=5)).close_ticket("helped", 2)
+    _ticket("Waiting")
+    _ticket("Claimed", course="Ph 212", claimed_after=timedelta(minutes=1))
+
+    assert flush_open_tickets(reason="Queue Flushed") == 2
+    incremental = ticket_stats(DAY, DAY, ["course"])
+    assert [(s["course"], s["tickets"], s["claimed"]) for s in incremental] == [
+        ("Ph 211", 2, 1),
+        ("Ph 212", 1, 1),
+    ]
+
+    db.session.execute(sa.delete(TicketDailyRollup))
+    db.session.commit()
+    result = test_app.test_cli_runner().invoke(args=["rebuild-ticket-rollup"])
+    assert "3 row(s)" in result.output
+    assert ticket_stats(DAY, DAY, ["course"]) == incremental
+    assert rebuild_rollup() == 3
+
+
+def test_stats_api_reads_only_the_rollup(test_client, capture_queries):
+    created = datetime(2026, 3, 10, 17, 0, tzinfo=timezone.utc)
+    day = to_pacific(created).date()
+    for name, reason, claimed_after in [
+        ("Helped", "helped", timedelta(minutes=4)),
+        ("Gone", "no_show", None),
+    ]:
+        db.session.add(
+            Ticket(
+                student_name=name,
+                table="T1",
+                physics_course="Ph 211",
+                status="closed",
+                closed_reason=reason,
+                created_at=created,
+                claimed_at=created + claimed_after if claimed_after else None,
+                closed_at=created + timedelta(hours=1),
+            )
+        )
+    db.session.commit()
+    rebuild_rollup()
+    _login(test_client, "rollup_admin", is_admin=True)
+
+    with capture_queries() as statements:
+        response = test_client.get(f"/api/stats/tickets?start={day}&end={day}")
+
+    assert response.status_code == 200
+    [row] = response.get_json()
+    assert row["day"] == day.isoformat()
+    assert (row["tickets"], row["no_shows"], row["no_show_rate"]) == (2, 1, 0.5)
+    # The unclaimed no-show waited the full hour; the other was claimed at 4m.
+    assert row["wait_seconds"] == 3600 + 240
+    assert (row["claimed"], row["handle_seconds"]) == (1, 56 * 60)
+    assert [s for s in statements if "ticket_daily_rollup" in s]
+    assert not [s for s in statements if "FROM tickets" in s]
+
+    bad = test_client.get(f"/api/stats/tickets?start={day}&end={day}&by=wa")
+    assert bad.status_code == 400
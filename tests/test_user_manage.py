@@ -1,5 +1,7 @@
 import io
 
+from werkzeug.security import generate_password_hash
+
 from app import db
 from app.models import User
 
@@ -170,3 +172,59 @@ def test_users_add_batch_blocks_non_admin(test_client, test_app):
     with test_app.app_context():
         created = User.query.filter_by(username="slee").first()
         assert created is None
+
+
+def test_users_add_batch_checks_and_inserts_in_bulk(
+    test_client, assert_max_queries, monkeypatch
+):
+    """A roster costs a fixed number of queries and a single password hash."""
+    from app.routes import users
+
+    admin = User(username="admin_bulk", email="admin_bulk@test.com", is_admin=True)
+    taken = User(username="taken", email="taken@test.com")
+    taken_email = User(username="other", email="clash@oregonstate.edu")
+    db.session.add_all([admin, taken, taken_email])
+    db.session.commit()
+    with test_client.session_transaction() as sess:
+        sess["user_id"] = admin.id
+        sess["is_admin"] = True
+
+    hashes = []
+
+    def counting_hash(password):
+        hashes.append(password)
+        return generate_password_hash(password)
+
+    monkeypatch.setattr(users, "generate_password_hash", counting_hash)
+
+    roster = ["first name,last name,ONID"]
+    roster += [f"Student,{i},student{i}" for i in range(50)]
+    roster += ["Taken,User,taken", "Clash,Email,clash", "Dup,Row,student0", "Bad,Row"]
+
+    with assert_max_queries(4):
+        response = test_client.post(
+            "/api/users_add_batch",
+            data={"user_csv": (io.BytesIO("\n".join(roster).encode("utf-8")), "u.csv")},
+            content_type="multipart/form-data",
+        )
+
+    assert response.status_code == 302
+    assert hashes == ["wormhole"]
+    with test_client.session_transaction() as sess:
+        messages = [message for _, message in sess["_flashes"]]
+    assert messages == [
+        "Row 52 skipped: user taken already exists.",
+        "Row 53 skipped: user clash already exists.",
+        "Row 54 skipped: user student0 already exists.",
+        "Row 55 skipped: expected 3 columns (first name, last name, ONID).",
+        "Batch registration complete: created 50 users, skipped 4 rows.",
+    ]
+
+    created = User.query.filter(User.username.like("student%")).all()
+    assert len(created) == 50
+    assert created[7].check_password("wormhole")
+    assert {u.email for u in created} == {
+        f"student{i}@oregonstate.edu" for i in range(50)
+    }
+    assert not any(u.is_admin for u in created)
+    assert all(u.is_active and u.created_at for u in created)
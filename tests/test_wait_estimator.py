@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from app.models import Ticket, User
+from app.wait_estimator import WaitTimeEstimator, get_wait_estimator
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _seeded(**kwargs):
+    estimator = WaitTimeEstimator(**kwargs)
+    estimator.estimates(0)  # load the (empty) history up front
+    return estimator
+
+
+def test_service_time_and_assistants_drive_estimates(test_app):
+    """Estimates follow the rolling handle time and the assistants on shift."""
+    clock = FakeClock()
+    estimator = _seeded(smoothing=0.5, assistant_idle_seconds=600, clock=clock)
+    claimed = datetime(2026, 4, 15, 17, tzinfo=timezone.utc)
+
+    assert estimator.estimates(2) == [300, 600]  # default service time
+
+    estimator.record_close(1, claimed, claimed + timedelta(minutes=4))
+    estimator.record_close(2, claimed, claimed + timedelta(minutes=8))
+    # 240s, then halfway to 480s; two assistants share the line.
+    assert estimator.estimates(3) == [180, 360, 540]
+
+    clock.now += 300
+    estimator.record_claim(2)
+    clock.now += 301
+    revision = estimator.current_revision()
+    assert estimator.stats()["active_assistants"] == 1
+    assert estimator.estimates(1) == [360]
+    assert estimator.current_revision() == revision
+
+
+def test_arrival_rate_uses_gaps_between_tickets(test_app):
+    estimator = _seeded(smoothing=1.0)
+    start = datetime(2026, 4, 15, 17, tzinfo=timezone.utc)
+    for minutes in (0, 2, 4):
+        estimator.record_arrival(start + timedelta(minutes=minutes))
+
+    assert estimator.stats()["arrivals_per_hour"] == 30.0
+
+
+def test_first_use_loads_recent_history(test_app):
+    """A fresh worker starts from recently handled tickets, not the default."""
+    assistant = User(username="seed_wa", email="seed_wa@test.com")
+    assistant.set_password("pass")
+    db.session.add(assistant)
+    now = datetime.now(timezone.utc)
+    db.session.add_all(
+        [
+            Ticket(
+                student_name="Done",
+                table="T1",
+                physics_course="Ph 211",
+                status="resolved",
+                wormhole_assistant=assistant,
+                claimed_at=now - timedelta(minutes=12),
+                closed_at=now - timedelta(minutes=2),
+            ),
+            Ticket(student_name="Waiting", table="T2", physics_course="Ph 211"),
+            # Closed by a queue flush hours after the claim; not a service time.
+            Ticket(
+                student_name="Flushed",
+                table="T3",
+                physics_course="Ph 211",
+                status="closed",
+                closed_reason="Queue Flushed",
+                claimed_at=now - timedelta(hours=6),
+                closed_at=now - timedelta(minutes=1),
+            ),
+        ]
+    )
+    db.session.commit()
+
+    stats = WaitTimeEstimator().stats()
+
+    assert (stats["service_seconds"], stats["active_assistants"]) == (600.0, 1)
+
+
+def test_failed_history_load_is_retried(test_app, monkeypatch):
+    """A query error while seeding leaves the estimator to seed on next use."""
+    now = datetime.now(timezone.utc)
+    db.session.add(
+        Ticket(
+            student_name="Done",
+            table="T1",
+            physics_course="Ph 211",
+            status="resolved",
+            claimed_at=now - timedelta(minutes=12),
+            closed_at=now - timedelta(minutes=2),
+        )
+    )
+    db.session.commit()
+    estimator = WaitTimeEstimator()
+
+    error = OperationalError("SELECT", {}, Exception("database is locked"))
+    with monkeypatch.context() as patch:
+        patch.setattr(db.session, "scalars", Mock(side_effect=error))
+        with pytest.raises(OperationalError):
+            estimator.stats()
+
+    assert estimator.stats()["service_seconds"] == 600.0
+
+
+def test_live_queue_api_carries_estimates(test_client):
+    for name in ["First", "Second"]:
+        test_client.post(
+            "/api/tickets",
+            json={"student_name": name, "class_name": "Ph 211", "table_number": "T1"},
+        )
+
+    response = test_client.get("/api/livequeuetickets")
+    waits = [t["estimated_wait_seconds"] for t in response.get_json()]
+    assert waits == [300, 600]
+
+    claimed = datetime.now(timezone.utc) - timedelta(minutes=2)
+    get_wait_estimator().record_close(None, claimed, claimed + timedelta(seconds=90))
+    again = test_client.get(
+        "/api/livequeuetickets", headers={"If-None-Match": response.headers["ETag"]}
+    )
+    assert again.status_code == 200
+    assert [t["estimated_wait_seconds"] for t in again.get_json()] == [90, 180]